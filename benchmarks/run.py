@@ -0,0 +1,350 @@
+"""Mesures de performance des fonctions d'analyse à 10², 10⁴ et 10⁶ zones ou valeurs.
+
+Utilisation :
+    python benchmarks/run.py                         # toutes les fonctions, toutes les échelles
+    python benchmarks/run.py --scales 100 10000 -k whipple -k indices
+    python benchmarks/run.py --compare benchmarks/resultats/ancien.json --check
+
+Les données âge × sexe sont synthétiques (structure par âge décroissante avec
+attraction des âges ronds) et générées par blocs de CHUNK_AREAS zones : à
+10⁶ zones, un même bloc est traité plusieurs fois, si bien que la mémoire ne
+dépend pas de l'échelle et que la génération n'est pas chronométrée.
+
+Les résultats sont écrits en JSON (par défaut benchmarks/resultats/<commit>.json).
+Avec --check, chaque mesure est comparée aux budgets de benchmarks/budgets.json
+(secondes, par cas et par échelle) et le code de retour vaut 1 en cas de
+dépassement ; --compare affiche le rapport de durée avec un fichier antérieur.
+Les budgets valent environ trois fois les durées mesurées sur une machine à un
+cœur, et jamais moins de 10 ms : en deçà, le bruit de l'horloge et de
+l'ordonnanceur domine. Ils détectent les régressions d'un ordre de grandeur,
+pas le bruit.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from indice_demo import (  # noqa: E402 (le paquet est importé depuis la racine du dépôt)
+    AgeIndex,
+    OnlineAccumulator,
+    bin_ages,
+    benford_statistics,
+    calculate_bachi,
+    calculate_indices_batch,
+    calculate_myers,
+    calculate_whipple,
+    extract_first_digits,
+    first_digit_counts,
+    get_first_digit,
+    graduate_dense,
+    iter_area_results,
+    moving_average,
+    moving_average_2,
+    nigrini_battery,
+    wilcoxon_batch,
+    write_excel_report,
+)
+from indice_demo.batch import score_areas  # noqa: E402
+
+SCALES = (100, 10_000, 1_000_000)
+CHUNK_AREAS = 10_000
+N_AGES = 101
+PYRAMID_EDGES = np.arange(0, N_AGES + 5, 5)
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+RESULTS_DIR = Path(__file__).with_name("resultats")
+LONG_RUN = 10.0
+
+
+def synthetic_counts(n_areas, seed=0):
+    """Effectifs (zones × 2 × âges) : pyramide décroissante, tailles de zones variées, âges ronds attractifs."""
+    rng = np.random.default_rng(seed)
+    ages = np.arange(N_AGES)
+    profile = np.exp(-ages / 35.0) * (1 + 0.6 * (ages % 10 == 0) + 0.3 * (ages % 10 == 5))
+    profile /= profile.sum()
+    sizes = rng.lognormal(8, 1.2, size=(n_areas, 2, 1))
+    return rng.poisson(sizes * profile).astype(np.int64)
+
+
+def synthetic_values(n_values, seed=0):
+    """Valeurs positives étalées sur plusieurs ordres de grandeur, pour les premiers chiffres."""
+    return np.random.default_rng(seed).lognormal(6, 3, size=n_values)
+
+
+def _chunks(scale, size=CHUNK_AREAS):
+    """Tailles successives des blocs couvrant scale éléments."""
+    full, rest = divmod(scale, size)
+    return [size] * full + ([rest] if rest else [])
+
+
+def _groups(counts):
+    """Hommes, Femmes, Total : forme (zones × 3 × âges)."""
+    return np.concatenate([counts, counts.sum(axis=1, keepdims=True)], axis=1).astype(float)
+
+
+# Chaque cas reçoit l'échelle et retourne une fonction sans argument à chronométrer.
+def _scalar_index(function):
+    def setup(scale):
+        total = _groups(synthetic_counts(min(scale, CHUNK_AREAS)))[:, 2]
+        ages = np.arange(N_AGES)
+
+        def run():
+            for size in _chunks(scale):
+                for row in total[:size]:
+                    function(ages, row)
+        return run
+    return setup
+
+
+def _batched(function):
+    def setup(scale):
+        groups = _groups(synthetic_counts(min(scale, CHUNK_AREAS)))
+
+        def run():
+            for size in _chunks(scale):
+                function(groups[:size])
+        return run
+    return setup
+
+
+def _get_first_digit(scale):
+    values = synthetic_values(min(scale, CHUNK_AREAS)).tolist()
+
+    def run():
+        for size in _chunks(scale):
+            for value in values[:size]:
+                get_first_digit(value)
+    return run
+
+
+def _extract_first_digits(scale):
+    values = synthetic_values(scale)
+    return lambda: extract_first_digits(values)
+
+
+def _moving_average_2(scale):
+    groups = _groups(synthetic_counts(min(scale, CHUNK_AREAS)))[:, 2]
+
+    def run():
+        for size in _chunks(scale):
+            for row in groups[:size]:
+                moving_average_2(row)
+    return run
+
+
+def _pyramid_loop(scale):
+    """Référence : boucle d'origine de l'onglet Pyramide, un masque booléen par tranche et par zone."""
+    counts = synthetic_counts(min(scale, CHUNK_AREAS))
+    ages = np.arange(N_AGES)
+
+    def run():
+        for size in _chunks(scale):
+            for homme, femme in counts[:size]:
+                homme_counts, femme_counts = [], []
+                for start, end in zip(PYRAMID_EDGES[:-1], PYRAMID_EDGES[1:]):
+                    mask = (ages >= start) & (ages < end)
+                    homme_counts.append(homme[mask].sum())
+                    femme_counts.append(femme[mask].sum())
+    return run
+
+
+def _benford_batch(groups):
+    benford_statistics(first_digit_counts(groups.reshape(len(groups), -1)))
+
+
+def _wilcoxon_batch(groups):
+    wilcoxon_batch(groups, moving_average(groups, 2))
+
+
+def _score_areas(scale):
+    counts = synthetic_counts(min(scale, CHUNK_AREAS))
+    names = [f"Z{i}" for i in range(len(counts))]
+
+    def run():
+        for size in _chunks(scale):
+            score_areas(names[:size], counts[:size])
+    return run
+
+
+def _online_update(scale):
+    rng = np.random.default_rng(0)
+    records = list(zip(rng.integers(0, 100, scale).tolist(),
+                       rng.choice(["1", "2"], scale).tolist(),
+                       rng.integers(0, N_AGES, scale).tolist()))
+
+    def run():
+        accumulator = OnlineAccumulator(max_age=N_AGES - 1)
+        for record in records:
+            accumulator.update(record)
+    return run
+
+
+def _excel_export(scale):
+    counts = synthetic_counts(scale)
+    names = [f"Z{i}" for i in range(scale)]
+    ages = np.arange(N_AGES)
+
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            write_excel_report(Path(directory) / "rapport.xlsx", iter_area_results(names, ages, counts))
+    return run
+
+
+# nom : (préparation, unité, échelle maximale ou None)
+CASES = {
+    "calculate_whipple": (_scalar_index(calculate_whipple), "zones", None),
+    "calculate_myers": (_scalar_index(calculate_myers), "zones", None),
+    "calculate_bachi": (_scalar_index(calculate_bachi), "zones", None),
+    "calculate_indices_batch": (_batched(lambda groups: calculate_indices_batch(np.arange(N_AGES), groups)),
+                                "zones", None),
+    "get_first_digit": (_get_first_digit, "valeurs", None),
+    "extract_first_digits": (_extract_first_digits, "valeurs", None),
+    "benford_batch": (_batched(_benford_batch), "zones", None),
+    "nigrini_battery": (_batched(lambda groups: nigrini_battery(groups.reshape(len(groups), -1))), "zones", None),
+    "moving_average_2": (_moving_average_2, "zones", None),
+    "moving_average": (_batched(lambda groups: moving_average(groups, 2)), "zones", None),
+    "wilcoxon_batch": (_batched(_wilcoxon_batch), "zones", None),
+    "pyramid_loop": (_pyramid_loop, "zones", None),
+    "pyramid_bin_sums": (_batched(lambda groups: AgeIndex(np.arange(N_AGES), groups).bin_sums(PYRAMID_EDGES)),
+                         "zones", None),
+    "pyramid_bin_ages": (_batched(lambda groups: bin_ages(np.arange(N_AGES), groups, PYRAMID_EDGES[:-4], True)),
+                         "zones", None),
+    "graduate": (_batched(lambda groups: graduate_dense(groups, "sprague", open_ended=True)), "zones", None),
+    "score_areas": (_score_areas, "zones", None),
+    "online_update": (_online_update, "enregistrements", None),
+    # 10⁶ zones représenteraient environ 1,3 × 10⁸ lignes Excel, soit plusieurs heures
+    "excel_export": (_excel_export, "zones", 10_000),
+}
+
+
+def measure(run, repeat):
+    """Durées (secondes) de repeat exécutions après une exécution d'échauffement.
+
+    Une exécution de plus de LONG_RUN secondes n'est pas répétée : sa durée est
+    la seule mesure retenue.
+    """
+    start = time.perf_counter()
+    run()
+    warmup = time.perf_counter() - start
+    if warmup > LONG_RUN:
+        return [warmup]
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def run_benchmarks(names, scales, repeat=3, log=print):
+    """Exécute les cas demandés et retourne une entrée par (cas, échelle)."""
+    results = []
+    for name in names:
+        setup, unit, max_scale = CASES[name]
+        for scale in scales:
+            entry = {"case": name, "scale": scale, "unit": unit}
+            if max_scale is not None and scale > max_scale:
+                entry["skipped"] = f"échelle limitée à {max_scale}"
+                log(f"{name:<26} {scale:>9}  ignoré ({entry['skipped']})")
+                results.append(entry)
+                continue
+            durations = measure(setup(scale), repeat)
+            best = min(durations)
+            entry.update({
+                "seconds": best,
+                "seconds_median": statistics.median(durations),
+                "repeat": len(durations),
+                "us_per_item": best / scale * 1e6,
+            })
+            log(f"{name:<26} {scale:>9}  {best:10.4f} s  {entry['us_per_item']:9.3f} µs/{unit}")
+            results.append(entry)
+    return results
+
+
+def check_budgets(results, budgets):
+    """Mesures dépassant leur budget, clé "cas@échelle" de budgets.json."""
+    failures = []
+    for entry in results:
+        budget = budgets.get(f"{entry['case']}@{entry['scale']}")
+        if budget is not None and entry.get("seconds", 0) > budget:
+            failures.append((entry["case"], entry["scale"], entry["seconds"], budget))
+    return failures
+
+
+def compare(results, previous):
+    """Rapport de durée (actuel / précédent) pour chaque cas mesuré dans les deux fichiers."""
+    before = {(entry["case"], entry["scale"]): entry.get("seconds") for entry in previous["results"]}
+    rows = []
+    for entry in results:
+        old = before.get((entry["case"], entry["scale"]))
+        if old and entry.get("seconds"):
+            rows.append((entry["case"], entry["scale"], old, entry["seconds"], entry["seconds"] / old))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--case", action="append", default=None,
+                        help="sous-chaîne du nom des cas à exécuter (répétable)")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES), help="échelles à mesurer")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions (meilleure durée retenue)")
+    parser.add_argument("-o", "--output", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--compare", default=None, metavar="JSON", help="résultats antérieurs à comparer")
+    parser.add_argument("--check", action="store_true", help="échoue si un budget est dépassé")
+    parser.add_argument("--list", action="store_true", help="liste les cas disponibles")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+    names = [name for name in CASES if args.case is None or any(key in name for key in args.case)]
+
+    results = run_benchmarks(names, args.scales, args.repeat)
+    commit = git_commit()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "results": results,
+    }, indent=2, ensure_ascii=False))
+    print(f"Résultats écrits dans {output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        print(f"\nComparaison avec {previous.get('commit', args.compare)} :")
+        for name, scale, old, new, ratio in compare(results, previous):
+            print(f"{name:<26} {scale:>9}  {old:10.4f} s → {new:10.4f} s  ×{ratio:.2f}")
+
+    if args.check:
+        failures = check_budgets(results, json.loads(BUDGETS_PATH.read_text()))
+        for name, scale, seconds, budget in failures:
+            print(f"Budget dépassé : {name}@{scale} {seconds:.4f} s > {budget} s", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
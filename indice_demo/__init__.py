@@ -0,0 +1,80 @@
+"""Bibliothèque d'analyse de la qualité des données démographiques.
+
+Ce paquet ne dépend ni de Streamlit ni de Plotly : il peut être importé par
+des traitements par lots. L'interface se trouve dans remove.py.
+"""
+
+from .accuracy import UN_ACCURACY_EDGES, UN_ACCURACY_THRESHOLDS, un_age_sex_accuracy
+from .age_index import AgeIndex
+from .analysis import GROUPS, AnalysisResults, analyze, moving_average_tests
+from .benford import (
+    benford_law,
+    benford_monte_carlo,
+    benford_null_distribution,
+    benford_statistics,
+    benford_test,
+    first_digit_counts,
+)
+from .bootstrap import bootstrap_indices
+from .data import Age, Femme, Homme, content_hash
+from .decimation import decimate_minmax, point_budgets
+from .digits import (
+    extract_first_digits,
+    extract_first_two_digits,
+    extract_leading_digits,
+    extract_second_digits,
+    get_first_digit,
+)
+from .graduation import (
+    GRADUATION_METHODS,
+    graduate,
+    graduate_dense,
+    graduation_matrix,
+)
+from .indices import (
+    DIGIT_RANGES,
+    calculate_bachi,
+    calculate_indices_batch,
+    calculate_myers,
+    calculate_un_index,
+    calculate_whipple,
+    indices_from_age_index,
+    indices_from_digit_table,
+    terminal_digit_counts,
+    terminal_digit_table,
+    whipple_sensitivity,
+)
+from .ingest import read_microdata_histograms
+from .nigrini import (
+    NIGRINI_CONFORMITY,
+    NIGRINI_MAD_BANDS,
+    NIGRINI_TESTS,
+    conformity_labels,
+    first_two_law,
+    nigrini_battery,
+    nigrini_columns,
+    nigrini_conformity,
+    second_digit_law,
+)
+from .online import OnlineAccumulator
+from .profiling import StageTimer
+from .pyramid import bin_ages, bin_labels, bin_shares, parse_edges, regular_edges
+from .quality import evaluate_quality, quality_score
+from .report import excel_report_bytes, iter_area_results, write_excel_report
+from .sex_ratio import (
+    SEX_RATIO_METHODS,
+    calculate_sex_ratio,
+    sex_ratio_analysis,
+    sex_ratio_intervals,
+    smoothed_sex_ratio,
+)
+from .smoothing import (
+    DEMOGRAPHIC_SMOOTHERS,
+    age_groups,
+    moving_average,
+    moving_average_2,
+    smooth_age_groups,
+    test_moving_average_diff,
+    wilcoxon_batch,
+)
+from .store import read_age_sex_store, store_index, write_age_sex_store
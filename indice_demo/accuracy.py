@@ -0,0 +1,54 @@
+"""Indice d'exactitude âge-sexe des Nations Unies (indice conjoint), sur groupes quinquennaux.
+
+Les effectifs sont regroupés en groupes 0-4, 5-9, ..., 70-74 (voir
+indice_demo.pyramid). Pour chaque sexe, le rapport d'âge d'un groupe est
+2·P(x) / (P(x-5) + P(x+5)) × 100 et le score de rapports d'âge est la moyenne
+des écarts |rapport - 100| des groupes 5-9 à 65-69. Le score de rapports de
+masculinité est la moyenne des écarts absolus entre rapports de masculinité
+de groupes successifs, de 0-4 à 70-74. L'indice conjoint vaut
+score_hommes + score_femmes + 3 × score_masculinité.
+
+Toutes les fonctions opèrent sur le dernier axe : des matrices (zones × âges)
+d'hommes et de femmes sont traitées en une seule opération.
+"""
+
+import numpy as np
+
+from .pyramid import bin_ages, regular_edges
+
+# Groupes 0-4 à 70-74
+UN_ACCURACY_EDGES = regular_edges(5, 75)
+
+# Seuils usuels : exact (< 20), inexact (20-40), très inexact (> 40)
+UN_ACCURACY_THRESHOLDS = (20, 40)
+
+
+def un_age_sex_accuracy(ages, homme, femme):
+    """Indice d'exactitude âge-sexe des Nations Unies et ses composantes.
+
+    homme et femme sont de forme (..., âges). Retourne un dictionnaire avec
+    "age_ratios" (..., 2, 13) pour les groupes 5-9 à 65-69, "sex_ratios"
+    (..., 15), "age_ratio_score_h", "age_ratio_score_f", "sex_ratio_score" et
+    "index" (forme (...)). Un groupe vide rend l'indice indéfini (NaN).
+    """
+    homme = np.asarray(homme, dtype=float)
+    femme = np.asarray(femme, dtype=float)
+    groups = bin_ages(ages, np.stack([homme, femme], axis=-2), UN_ACCURACY_EDGES)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        age_ratios = 2 * groups[..., 1:-1] / (groups[..., :-2] + groups[..., 2:]) * 100
+        age_ratio_scores = np.abs(age_ratios - 100).mean(axis=-1)
+        sex_ratios = groups[..., 0, :] / groups[..., 1, :] * 100
+        sex_ratio_score = np.abs(np.diff(sex_ratios, axis=-1)).mean(axis=-1)
+    age_ratio_scores = np.where(np.isfinite(age_ratio_scores), age_ratio_scores, np.nan)
+    sex_ratio_score = np.where(np.isfinite(sex_ratio_score), sex_ratio_score, np.nan)
+
+    # [()] : scalaires NumPy (et non tableaux 0-d) pour une seule zone, comme calculate_whipple
+    return {
+        "age_ratios": age_ratios,
+        "sex_ratios": sex_ratios,
+        "age_ratio_score_h": age_ratio_scores[..., 0][()],
+        "age_ratio_score_f": age_ratio_scores[..., 1][()],
+        "sex_ratio_score": sex_ratio_score[()],
+        "index": (age_ratio_scores[..., 0] + age_ratio_scores[..., 1] + 3 * sex_ratio_score)[()],
+    }
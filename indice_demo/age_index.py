@@ -0,0 +1,81 @@
+"""Index de sommes cumulées par âge pour des requêtes de plages d'âge en O(1)."""
+
+import numpy as np
+
+
+class AgeIndex:
+    """Sommes cumulées d'effectifs sur un axe d'âges dense 0..n-1.
+
+    populations est de forme (..., âges) et peut contenir autant d'axes de tête
+    que nécessaire (zones, sexes). L'index conserve deux tableaux cumulés :
+
+    - cumsum[..., a] = somme des effectifs des âges < a ;
+    - digit_cumsum[..., 10 + a] = somme des effectifs des âges ≤ a ayant le même
+      chiffre terminal que a (cumul de pas 10, précédé de 10 zéros).
+
+    Toute somme sur une plage d'âges, par tranche ou par chiffre terminal, est
+    alors une différence de deux valeurs, quel que soit le nombre de zones.
+    """
+
+    def __init__(self, ages, populations):
+        ages = np.asarray(ages)
+        populations = np.asarray(populations)
+        dense_ages = np.rint(ages).astype(np.int64)
+        if np.any(dense_ages < 0) or np.any(dense_ages != ages):
+            raise ValueError("Les âges doivent être des entiers positifs ou nuls.")
+
+        # Axe dense 0..n-1 arrondi à la dizaine supérieure (âges manquants à zéro)
+        n_decades = dense_ages.max() // 10 + 1
+        dtype = np.int64 if np.issubdtype(populations.dtype, np.integer) else float
+        dense = np.zeros(populations.shape[:-1] + (n_decades * 10,), dtype=dtype)
+        if np.unique(dense_ages).size == dense_ages.size:
+            dense[..., dense_ages] = populations
+        else:
+            np.add.at(dense, (..., dense_ages), populations)
+
+        self.n_ages = dense.shape[-1]
+        self.populations = dense
+
+        self.cumsum = np.zeros(dense.shape[:-1] + (self.n_ages + 1,), dtype=dtype)
+        np.cumsum(dense, axis=-1, out=self.cumsum[..., 1:])
+
+        by_decade = dense.reshape(dense.shape[:-1] + (n_decades, 10))
+        self.digit_cumsum = np.zeros(dense.shape[:-1] + (self.n_ages + 10,), dtype=dtype)
+        self.digit_cumsum[..., 10:] = np.cumsum(by_decade, axis=-2).reshape(dense.shape)
+
+    @property
+    def ages(self):
+        return np.arange(self.n_ages)
+
+    def _bounds(self, age_min, age_max):
+        """Bornes [lo, hi) sur l'axe dense ; age_min et age_max peuvent être des tableaux."""
+        lo = np.clip(np.ceil(age_min), 0, self.n_ages).astype(np.int64)
+        hi = np.clip(np.floor(age_max) + 1, 0, self.n_ages).astype(np.int64)
+        return lo, np.maximum(hi, lo)
+
+    def range_sum(self, age_min, age_max):
+        """Effectif des âges compris entre age_min et age_max (inclus).
+
+        age_min et age_max peuvent être des tableaux compatibles par diffusion :
+        le résultat est alors de forme (..., *forme des bornes).
+        """
+        lo, hi = self._bounds(age_min, age_max)
+        return self.cumsum[..., hi] - self.cumsum[..., lo]
+
+    def digit_sums(self, age_min, age_max):
+        """Effectifs par chiffre terminal (0-9) des âges entre age_min et age_max, forme (..., 10).
+
+        Comme pour range_sum, les bornes peuvent être des tableaux : forme (..., *bornes, 10).
+        """
+        lo, hi = self._bounds(age_min, age_max)
+        lo, hi = np.broadcast_arrays(lo[..., None], hi[..., None])
+        digits = np.arange(10)
+        # Dernier âge ≤ hi - 1 (resp. ≤ lo - 1) se terminant par chaque chiffre
+        last_in = hi - 1 - (hi - 1 - digits) % 10
+        last_before = lo - 1 - (lo - 1 - digits) % 10
+        return self.digit_cumsum[..., last_in + 10] - self.digit_cumsum[..., last_before + 10]
+
+    def bin_sums(self, edges):
+        """Effectifs par tranche [edges[i], edges[i+1]), forme (..., len(edges) - 1)."""
+        edges = np.clip(np.asarray(edges, dtype=np.int64), 0, self.n_ages)
+        return self.cumsum[..., edges[1:]] - self.cumsum[..., edges[:-1]]
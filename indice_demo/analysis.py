@@ -0,0 +1,109 @@
+"""Analyse complète d'un tableau âge × sexe, indépendante de l'interface."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .accuracy import un_age_sex_accuracy
+from .age_index import AgeIndex
+from .benford import benford_test
+from .indices import DIGIT_RANGES, indices_from_digit_table, terminal_digit_table
+from .sex_ratio import calculate_sex_ratio
+from .smoothing import moving_average, wilcoxon_batch
+
+GROUPS = ("Hommes", "Femmes", "Total")
+
+
+@dataclass
+class AnalysisResults:
+    """Résultats d'une analyse : indices, tests, chiffres terminaux et rapports de masculinité.
+
+    Les tableaux indexés par groupe suivent l'ordre de GROUPS (Hommes, Femmes, Total) ;
+    age_index (Hommes, Femmes) sert les sommes par plage d'âge (tranches de la
+    pyramide, etc.) ; digit_counts est la ligne « tous âges » de la table des
+    chiffres terminaux dont sont tirés les indices ; un_accuracy est l'indice
+    d'exactitude âge-sexe des Nations Unies (voir un_age_sex_accuracy).
+    """
+    ages: np.ndarray
+    homme: np.ndarray
+    femme: np.ndarray
+    indices: dict
+    benford: dict
+    moving_averages: np.ndarray
+    ma_tests: list
+    digit_counts: np.ndarray
+    sex_ratio: np.ndarray
+    age_index: AgeIndex
+    un_accuracy: dict
+
+    @property
+    def total(self):
+        return self.homme + self.femme
+
+    @property
+    def total_pop(self):
+        return self.total.sum()
+
+    @property
+    def pourcentage_h(self):
+        return self.homme.sum() / self.total_pop * 100
+
+    @property
+    def pourcentage_f(self):
+        return self.femme.sum() / self.total_pop * 100
+
+    @property
+    def rapport_global(self):
+        return self.homme.sum() / self.femme.sum() * 100
+
+    @property
+    def digit_percent(self):
+        """Répartition (%) des chiffres terminaux par groupe, nulle si le groupe est vide."""
+        totals = self.digit_counts.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, self.digit_counts / totals * 100, 0.0)
+
+    def indices_table(self):
+        """Indices par groupe sous forme de dictionnaire {groupe: {indice: valeur}}."""
+        return {
+            groupe: {name: values[i] for name, values in self.indices.items()}
+            for i, groupe in enumerate(GROUPS)
+        }
+
+
+def moving_average_tests(groups, alpha=0.05, k=2, weights=None, centered=False):
+    """Moyennes mobiles de chaque ligne de groups (MA(2) par défaut) et tests de Wilcoxon associés."""
+    moving_averages = moving_average(groups, k, weights, centered)
+    tests = wilcoxon_batch(groups, moving_averages, alpha)
+    ma_tests = [
+        {key: tests[key][i] for key in ("statistic", "p_value", "significant", "error")}
+        for i in range(len(groups))
+    ]
+    return moving_averages, ma_tests
+
+
+def analyze(ages, homme, femme, age_min_whipple=23, age_max_whipple=62, alpha_ma=0.05):
+    """Calcule l'ensemble des indicateurs de qualité pour un tableau âge × sexe."""
+    homme = np.asarray(homme)
+    femme = np.asarray(femme)
+    groups = np.stack([homme, femme, homme + femme])
+    # Un seul index sur les deux sexes : le Total des chiffres terminaux en est la somme
+    age_index = AgeIndex(ages, groups[:2])
+    digit_table = terminal_digit_table(age_index, age_min_whipple, age_max_whipple, with_total=True)
+
+    indices = indices_from_digit_table(digit_table)
+    moving_averages, ma_tests = moving_average_tests(groups, alpha_ma)
+
+    return AnalysisResults(
+        ages=np.asarray(ages),
+        homme=homme,
+        femme=femme,
+        indices=indices,
+        benford=benford_test(groups.ravel()),
+        moving_averages=moving_averages,
+        ma_tests=ma_tests,
+        digit_counts=digit_table[:, DIGIT_RANGES.index("all")],
+        sex_ratio=calculate_sex_ratio(homme, femme),
+        age_index=age_index,
+        un_accuracy=un_age_sex_accuracy(ages, homme, femme),
+    )
@@ -0,0 +1,457 @@
+"""Audit de qualité par lots : score de chaque zone d'un recensement.
+
+Utilisation :
+    python -m indice_demo.batch tableaux/ -o classement.csv --workers 8
+    python -m indice_demo.batch individus.csv --microdata --area-col commune
+    python -m indice_demo.batch recensements.parquet --store --year 2023
+    python -m indice_demo.batch quinquennaux/ --graduation sprague --open-ended
+
+La première forme lit un répertoire de tableaux âge × sexe au format de
+l'export CSV de l'application (colonnes Age, Hommes, Femmes) ; la deuxième
+agrège un fichier de microdonnées par zone (--save-store l'enregistre en
+Parquet/Arrow) ; la troisième lit une base en colonnes (indice_demo.store). Avec --graduation,
+des effectifs par groupe quinquennal (âge = premier âge du groupe) sont
+d'abord ramenés en âges simples (indice_demo.graduation). Les zones sont réparties par blocs
+sur un pool de processus et les résultats sont écrits dans une seule table,
+classée de la plus mauvaise à la meilleure qualité.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .accuracy import un_age_sex_accuracy
+from .benford import benford_monte_carlo, benford_statistics
+from .bootstrap import bootstrap_indices
+from .age_index import AgeIndex
+from .graduation import GRADUATION_METHODS, graduate_dense
+from .indices import indices_from_age_index, whipple_sensitivity
+from .nigrini import NIGRINI_MAD_BANDS, conformity_labels, nigrini_battery
+from .sex_ratio import sex_ratio_analysis
+from .smoothing import moving_average, wilcoxon_batch
+
+GROUP_SUFFIXES = ("h", "f", "t")
+
+
+def read_age_sex_table(path, age_col="Age", male_col="Hommes", female_col="Femmes"):
+    """Lit un tableau âge × sexe CSV et le ramène sur un axe d'âges dense (0..âge max).
+
+    Retourne (effectifs 2 × âges, âges observés) : les âges absents du tableau
+    sont comptés à zéro, et le masque les distingue des âges d'effectif nul.
+    """
+    import pandas as pd  # import différé : pandas ralentit le démarrage des processus
+
+    table = pd.read_csv(path, usecols=[age_col, male_col, female_col])
+    ages = table[age_col].to_numpy(dtype=float).astype(np.int64)
+    counts = np.zeros((2, ages.max() + 1))
+    np.add.at(counts[0], ages, table[male_col].to_numpy(dtype=float))
+    np.add.at(counts[1], ages, table[female_col].to_numpy(dtype=float))
+    observed = np.zeros(counts.shape[-1], dtype=bool)
+    observed[ages] = True
+    return counts, observed
+
+
+def _observed_first(groups, observed):
+    """Effectifs des seuls âges observés de chaque zone, en tête de l'axe des âges (NaN ensuite).
+
+    groups est de forme (zones × groupes × âges) et observed (zones × âges).
+    Les âges observés se suivent comme les lignes du tableau lu par l'application.
+    """
+    order = np.argsort(~observed, axis=-1, kind="stable")
+    packed = np.take_along_axis(groups, order[:, None, :], axis=-1)
+    padding = np.arange(observed.shape[-1]) >= observed.sum(axis=-1, keepdims=True)
+    packed[np.broadcast_to(padding[:, None, :], packed.shape)] = np.nan
+    return packed
+
+
+def score_areas(names, counts, age_min=23, age_max=62, alpha=0.05, sensitivity=False,
+                n_boot=0, seed=None, benford_sims=0, open_ended=False, observed=None):
+    """Calcule les indicateurs de qualité d'un bloc de zones.
+
+    counts est de forme (zones × 2 × âges) sur l'axe d'âges dense 0..n-1.
+    Avec sensitivity, ajoute l'étendue de l'indice de Whipple (Total) sur les
+    plages 20-30 × 55-70 ; avec n_boot > 0, les intervalles de confiance
+    bootstrap à 95 % des indices (Total) ; avec benford_sims > 0, les p-values
+    Monte Carlo du test de Benford. Avec open_ended, le dernier âge est un groupe
+    ouvert (80+) : compté dans la population, il est exclu de tous les autres
+    indicateurs, où son effectif passerait pour une attraction de l'âge rond.
+    observed (zones × âges) marque les âges présents dans les données sources
+    (tous par défaut) : MA(2) et tests de Wilcoxon ne portent que sur eux, les
+    âges manquants comptés à zéro n'étant pas des paires (observé, lissé).
+    Retourne une liste de dictionnaires, un par zone.
+    """
+    from scipy import stats
+    counts = np.asarray(counts, dtype=float)
+    populations = counts.sum(axis=(1, 2))
+    if observed is None:
+        observed = np.ones((len(names), counts.shape[-1]), dtype=bool)
+    if open_ended:
+        counts, observed = counts[..., :-1], observed[..., :-1]
+    ages = np.arange(counts.shape[-1])
+    groups = np.concatenate([counts, counts.sum(axis=1, keepdims=True)], axis=1)
+    # Index des deux sexes seulement : les chiffres terminaux du Total en sont la somme
+    age_index = AgeIndex(ages, counts)
+    indices = indices_from_age_index(age_index, age_min, age_max, with_total=True)
+    if sensitivity:
+        sweep = whipple_sensitivity(age_index, with_total=True)[:, 2].reshape(len(names), -1)
+        with np.errstate(all='ignore'):
+            sweep_min, sweep_max = np.nanmin(sweep, axis=-1), np.nanmax(sweep, axis=-1)
+
+    # Batterie de Nigrini sur les effectifs des trois groupes de chaque zone, en une seule
+    # opération ; ses effectifs de premiers chiffres alimentent aussi le test de Benford
+    nigrini = nigrini_battery(groups.reshape(len(names), -1))
+    benford_counts = nigrini["first"]["counts"]
+    conformity = {test: conformity_labels(nigrini[test]["conformity"]) for test in NIGRINI_MAD_BANDS}
+    benford_chi2, benford_mad = benford_statistics(benford_counts)
+    benford_p = stats.chi2.sf(benford_chi2, 8)
+    if benford_sims:
+        benford_mc = benford_monte_carlo(benford_counts, benford_sims, seed=0)
+
+    if n_boot:
+        intervals = bootstrap_indices(ages, groups[:, 2], n_boot=n_boot, age_min=age_min,
+                                      age_max=age_max, seed=seed)
+
+    # Indice d'exactitude âge-sexe des Nations Unies, toutes zones à la fois
+    accuracy = un_age_sex_accuracy(ages, counts[:, 0], counts[:, 1])
+
+    # Rapports de masculinité hors de leur intervalle de confiance, toutes zones à la fois
+    sex_ratio_anomalies = sex_ratio_analysis(counts[:, 0], counts[:, 1])["n_anomalies"]
+
+    # MA(2) et tests de Wilcoxon de toutes les zones et de tous les groupes en une opération,
+    # sur les âges observés de chaque zone (wilcoxon_batch ignore les paires NaN)
+    series = groups if observed.all() else _observed_first(groups, observed)
+    tests = wilcoxon_batch(series, moving_average(series, 2), alpha)
+
+    rows = []
+    for i, name in enumerate(names):
+        row = {"zone": name, "population": populations[i]}
+        for name_index, values in indices.items():
+            for j, suffix in enumerate(GROUP_SUFFIXES):
+                row[f"{name_index}_{suffix}"] = values[i, j]
+
+        if n_boot:
+            for name_index, interval in intervals.items():
+                row[f"{name_index}_t_low"] = interval["low"][i]
+                row[f"{name_index}_t_high"] = interval["high"][i]
+        if sensitivity:
+            row["whipple_t_sweep_min"] = sweep_min[i]
+            row["whipple_t_sweep_max"] = sweep_max[i]
+
+        row["benford_chi2"] = benford_chi2[i]
+        row["benford_p"] = benford_p[i]
+        row["benford_mad"] = benford_mad[i]
+        if benford_sims:
+            row["benford_p_mc"] = benford_mc["p_value"][i]
+            row["benford_p_mad"] = benford_mc["p_value_mad"][i]
+        row["nigrini_conformity_1"] = conformity["first"][i]
+        row["nigrini_mad_2"] = nigrini["second"]["mad"][i]
+        row["nigrini_conformity_2"] = conformity["second"][i]
+        row["nigrini_mad_12"] = nigrini["first_two"]["mad"][i]
+        row["nigrini_conformity_12"] = conformity["first_two"][i]
+        row["nigrini_p_last2"] = nigrini["last_two"]["p_value"][i]
+        row["nigrini_summation_mad"] = nigrini["summation"]["mad"][i]
+
+        row["un_ars_h"] = accuracy["age_ratio_score_h"][i]
+        row["un_ars_f"] = accuracy["age_ratio_score_f"][i]
+        row["un_srs"] = accuracy["sex_ratio_score"][i]
+        row["un_age_sex_index"] = accuracy["index"][i]
+        row["sex_ratio_anomalies"] = sex_ratio_anomalies[i]
+
+        for j, suffix in enumerate(GROUP_SUFFIXES):
+            row[f"wilcoxon_w_{suffix}"] = tests["statistic"][i, j]
+            row[f"wilcoxon_p_{suffix}"] = tests["p_value"][i, j]
+        row["wilcoxon_erreurs"] = "; ".join(
+            f"{suffix} : {tests['error'][i, j]}"
+            for j, suffix in enumerate(GROUP_SUFFIXES) if tests["error"][i, j] is not None
+        )
+        rows.append(row)
+    return rows
+
+
+def _length_groups(tables):
+    """Positions des tableaux regroupées par longueur de leur axe d'âges, dans l'ordre de lecture."""
+    groups = {}
+    for i, (table, _) in enumerate(tables):
+        groups.setdefault(table.shape[-1], []).append(i)
+    return list(groups.values())
+
+
+def _stack_tables(tables, graduation=None):
+    """Effectifs (tableaux × 2 × âges) et âges observés (tableaux × âges) de tableaux lus.
+
+    Les âges ajoutés au-delà d'un tableau plus court ne sont pas observés ; après
+    passage aux âges simples, tous les âges le sont.
+    """
+    n_ages = max(table.shape[-1] for table, _ in tables)
+    counts = np.zeros((len(tables), 2, n_ages))
+    observed = np.zeros((len(tables), n_ages), dtype=bool)
+    for i, (table, table_observed) in enumerate(tables):
+        counts[i, :, :table.shape[-1]] = table
+        observed[i, :table.shape[-1]] = table_observed
+    if graduation:
+        counts = graduate_dense(counts, *graduation)
+        observed = np.ones(counts.shape[::2], dtype=bool)
+    return counts, observed
+
+
+def read_table_block(paths, columns, graduation=None):
+    """Effectifs (fichiers × 2 × âges) et âges observés d'un bloc de tableaux, sur un axe commun.
+
+    graduation = (méthode, groupe ouvert) : les tableaux sont en groupes
+    quinquennaux et tout le bloc est ramené en âges simples en un seul produit.
+    Les multiplicateurs des derniers groupes et la place du groupe ouvert
+    dépendent du nombre de groupes : les tableaux doivent alors avoir la même
+    longueur (ValueError sinon ; score_table_files les sépare d'elle-même).
+    """
+    tables = [read_age_sex_table(path, *columns) for path in paths]
+    if graduation and len(_length_groups(tables)) > 1:
+        raise ValueError("Tableaux quinquennaux de longueurs différentes : "
+                         "à ramener en âges simples séparément.")
+    return _stack_tables(tables, graduation)
+
+
+def score_table_files(paths, columns, age_min=23, age_max=62, alpha=0.05, sensitivity=False,
+                      n_boot=0, seed=None, benford_sims=0, graduation=None):
+    """Lit puis évalue un bloc de fichiers de tableaux âge × sexe (exécuté dans un processus).
+
+    Avec graduation, le bloc est évalué par sous-blocs de tableaux de même
+    longueur : chacun est ramené en âges simples sur son propre axe, son groupe
+    ouvert restant au dernier âge. Les lignes suivent l'ordre de paths.
+    """
+    tables = [read_age_sex_table(path, *columns) for path in paths]
+    names = [Path(path).stem for path in paths]
+    blocks = _length_groups(tables) if graduation else [list(range(len(tables)))]
+    rows = [None] * len(tables)
+    for members in blocks:
+        counts, observed = _stack_tables([tables[i] for i in members], graduation)
+        block_rows = score_areas([names[i] for i in members], counts, age_min, age_max, alpha,
+                                 sensitivity, n_boot, seed, benford_sims, open_group(graduation),
+                                 observed)
+        for i, row in zip(members, block_rows):
+            rows[i] = row
+    return rows
+
+
+def _score_chunk(task):
+    """Point d'entrée des processus : task = (fonction, arguments)."""
+    function, args = task
+    return function(*args)
+
+
+def run_batch(tasks, workers=None, progress=None):
+    """Exécute les tâches (fonction, arguments) sur un pool de processus et concatène les lignes."""
+    rows = []
+    with contextlib.ExitStack() as stack:
+        mapper = map
+        if workers != 1:
+            mapper = stack.enter_context(ProcessPoolExecutor(max_workers=workers)).map
+        for chunk_rows in mapper(_score_chunk, tasks):
+            rows.extend(chunk_rows)
+            if progress:
+                progress(len(rows))
+    return rows
+
+
+def rank_results(rows, sort_by="un_index_t"):
+    """Table des résultats classée par ordre décroissant de sort_by (les pires zones en tête)."""
+    import pandas as pd
+
+    results = pd.DataFrame(rows)
+    results = results.sort_values(sort_by, ascending=False, na_position="last", kind="stable")
+    results.insert(0, "rang", np.arange(1, len(results) + 1))
+    return results.reset_index(drop=True)
+
+
+def graduation_params(args):
+    """(méthode, groupe ouvert) de --graduation, ou None pour des âges simples."""
+    return (args.graduation, args.open_ended) if args.graduation else None
+
+
+def open_group(graduation):
+    """Vrai si le dernier âge des effectifs ramenés en âges simples est un groupe ouvert."""
+    return bool(graduation and graduation[1])
+
+
+def load_area_counts(args):
+    """Noms et effectifs (zones × 2 × âges) d'une entrée microdonnées ou base en colonnes."""
+    if args.microdata:
+        from .ingest import read_microdata_histograms
+
+        microdata = read_microdata_histograms(
+            args.input, age_col=args.age_col, sex_col=args.sex_col,
+            area_col=args.area_col, sex_codes=(args.male_code, args.female_code),
+            max_age=args.max_age
+        )
+        names, counts = microdata["areas"], microdata["counts"]
+        if args.save_store:
+            from .store import write_age_sex_store
+
+            write_age_sex_store(args.save_store, names, [args.year or 0], counts[:, None])
+        return names, counts
+
+    from .store import read_age_sex_store
+
+    store = read_age_sex_store(args.input, years=None if args.year is None else [args.year])
+    if len(store["years"]) > 1:
+        raise SystemExit("La base contient plusieurs années : préciser --year.")
+    # Une seule année : l'axe des années est réduit
+    counts = store["counts"].sum(axis=1)
+    if args.graduation:
+        counts = graduate_dense(counts, *graduation_params(args))
+    return store["areas"], counts
+
+
+def table_paths(args):
+    return sorted(str(path) for path in Path(args.input).glob(args.pattern))
+
+
+def build_tasks(args, area_counts=None):
+    """Découpe l'entrée en tâches de args.chunk_size zones.
+
+    area_counts, déjà chargé par load_area_counts, évite de relire une entrée
+    microdonnées ou base en colonnes.
+    """
+    params = (args.age_min, args.age_max, args.alpha, args.sensitivity, args.bootstrap)
+    chunk_size = args.chunk_size
+
+    if args.microdata or args.store:
+        names, counts = area_counts or load_area_counts(args)
+        chunks = [
+            (score_areas, (names[start:start + chunk_size], counts[start:start + chunk_size]))
+            for start in range(0, len(names), chunk_size)
+        ]
+    else:
+        paths = table_paths(args)
+        columns = (args.age_col, args.male_col, args.female_col)
+        chunks = [
+            (score_table_files, (paths[start:start + chunk_size], columns))
+            for start in range(0, len(paths), chunk_size)
+        ]
+
+    # Une graine par bloc, dérivée de --seed : résultats reproductibles quel que soit --workers
+    seeds = np.random.SeedSequence(args.seed).spawn(len(chunks))
+    # Les tableaux sont ramenés en âges simples dans les processus, à la lecture
+    if args.microdata or args.store:
+        extra = (open_group(graduation_params(args)),)
+    else:
+        extra = (graduation_params(args),)
+    return [
+        (function, chunk + params + (seed, args.benford_sims) + extra)
+        for (function, chunk), seed in zip(chunks, seeds)
+    ]
+
+
+def iter_report_areas(args, area_counts=None):
+    """(nom, AnalysisResults) de chaque zone, calculés à la demande pour le rapport Excel."""
+    from .report import iter_area_results
+
+    params = (args.age_min, args.age_max, args.alpha)
+    # Le groupe ouvert (dernier âge) reste à l'écart de l'analyse, comme dans score_areas
+    closed = slice(None, -1) if open_group(graduation_params(args)) else slice(None)
+    if args.microdata or args.store:
+        names, counts = area_counts or load_area_counts(args)
+        counts = counts[..., closed]
+        yield from iter_area_results(names, np.arange(counts.shape[-1]), counts, *params)
+        return
+
+    columns = (args.age_col, args.male_col, args.female_col)
+    for path in table_paths(args):
+        counts, observed = read_table_block([path], columns, graduation_params(args))
+        # Seuls les âges du tableau sont analysés, comme dans l'application
+        ages = np.flatnonzero(observed[0][closed])
+        yield from iter_area_results([Path(path).stem], ages, counts[:, :, ages], *params)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m indice_demo.batch",
+        description="Audit de qualité des données démographiques zone par zone."
+    )
+    parser.add_argument("input", help="répertoire de tableaux âge × sexe, fichier de microdonnées "
+                                      "ou base en colonnes")
+    parser.add_argument("-o", "--output", default="classement_qualite.csv",
+                        help="table des résultats (CSV)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="nombre de processus (1 = exécution dans le processus courant)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="nombre de zones par tâche")
+    parser.add_argument("--excel", default=None, metavar="CHEMIN",
+                        help="écrit aussi un rapport Excel avec un bloc par zone")
+    parser.add_argument("--pattern", default="*.csv", help="motif des fichiers de tableaux")
+    parser.add_argument("--sort-by", default="un_index_t", help="colonne de classement")
+    parser.add_argument("--age-min", type=int, default=23, help="âge minimum (Whipple)")
+    parser.add_argument("--age-max", type=int, default=62, help="âge maximum (Whipple)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="seuil du test de Wilcoxon")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="N",
+                        help="ajoute les IC bootstrap à 95 %% (N réplications)")
+    parser.add_argument("--seed", type=int, default=None, help="graine du bootstrap")
+    parser.add_argument("--benford-sims", type=int, default=0, metavar="N",
+                        help="ajoute les p-values Monte Carlo de Benford (N tirages)")
+    parser.add_argument("--sensitivity", action="store_true",
+                        help="ajoute l'étendue de Whipple sur les plages 20-30 × 55-70")
+
+    columns = parser.add_argument_group("colonnes")
+    columns.add_argument("--age-col", default=None, help="colonne âge (Age / age)")
+    columns.add_argument("--male-col", default="Hommes", help="colonne hommes (tableaux)")
+    columns.add_argument("--female-col", default="Femmes", help="colonne femmes (tableaux)")
+
+    micro = parser.add_argument_group("microdonnées")
+    micro.add_argument("--microdata", action="store_true", help="l'entrée est un fichier d'individus")
+    micro.add_argument("--sex-col", default="sexe", help="colonne sexe")
+    micro.add_argument("--area-col", default=None, help="colonne zone")
+    micro.add_argument("--male-code", default="1", help="code hommes")
+    micro.add_argument("--female-code", default="2", help="code femmes")
+    micro.add_argument("--max-age", type=int, default=110, help="âge maximum retenu")
+
+    grouped = parser.add_argument_group("groupes quinquennaux (tableaux, base en colonnes)")
+    grouped.add_argument("--graduation", choices=GRADUATION_METHODS, default=None,
+                         help="les âges sont les débuts de groupes de 5 ans : passage aux âges "
+                              "simples par les multiplicateurs de Sprague ou de Beers")
+    grouped.add_argument("--open-ended", action="store_true",
+                         help="le dernier groupe est ouvert (80+) : compté dans la population, "
+                              "exclu des indices et des tests")
+
+    stored = parser.add_argument_group("base en colonnes (Parquet / Arrow IPC)")
+    stored.add_argument("--store", action="store_true", help="l'entrée est une base indice_demo.store")
+    stored.add_argument("--year", type=int, default=None, help="année de recensement lue ou enregistrée")
+    stored.add_argument("--save-store", default=None, metavar="CHEMIN",
+                        help="enregistre les effectifs agrégés des microdonnées (.parquet, .arrow)")
+
+    args = parser.parse_args(argv)
+    if args.graduation and args.microdata:
+        parser.error("--graduation s'applique aux tableaux et aux bases en colonnes, pas aux microdonnées.")
+    if args.age_col is None:
+        args.age_col = "age" if args.microdata else "Age"
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    area_counts = load_area_counts(args) if args.microdata or args.store else None
+    tasks = build_tasks(args, area_counts)
+    if not tasks:
+        print(f"Aucune zone trouvée dans {args.input}", file=sys.stderr)
+        return 1
+
+    def progress(n_done):
+        print(f"\r{n_done} zones évaluées", end="", file=sys.stderr)
+
+    rows = run_batch(tasks, workers=args.workers, progress=progress)
+    print(file=sys.stderr)
+    rank_results(rows, args.sort_by).to_csv(args.output, index=False)
+    print(f"{len(rows)} zones classées dans {args.output}", file=sys.stderr)
+
+    if args.excel:
+        from .report import write_excel_report
+
+        n_areas = write_excel_report(args.excel, iter_report_areas(args, area_counts))
+        print(f"Rapport Excel de {n_areas} zones écrit dans {args.excel}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
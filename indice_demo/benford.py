@@ -0,0 +1,104 @@
+"""Test d'adéquation à la loi de Benford."""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .digits import extract_first_digits
+
+benford_law = np.array([np.log10(1 + 1/d) for d in range(1, 10)])
+
+
+def first_digit_counts(values, axis=-1):
+    """Effectifs des premiers chiffres 1-9 le long de axis, forme (..., 9) ; 0, NaN et inf ignorés."""
+    first_digits = np.moveaxis(extract_first_digits(values), axis, -1)
+    one_hot = first_digits[..., None] == np.arange(1, 10)
+    return one_hot.sum(axis=-2)
+
+
+def benford_statistics(counts):
+    """Chi-deux et écart absolu moyen (MAD) d'effectifs (..., 9) à la loi de Benford."""
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = n * benford_law
+        chi2 = ((counts - expected) ** 2 / expected).sum(axis=-1)
+        mad = np.abs(counts / n - benford_law).mean(axis=-1)
+    return chi2, mad
+
+
+@lru_cache(maxsize=256)
+def benford_null_distribution(n, n_sim=10_000, seed=0):
+    """Distributions simulées (triées) du chi-deux et du MAD pour un échantillon de taille n.
+
+    Les n_sim tirages multinomiaux sont mis en cache par (n, n_sim, seed) et
+    partagés par toutes les zones de même effectif. La graine est combinée à n :
+    la distribution d'une taille donnée ne dépend pas des autres tailles demandées.
+    """
+    rng = np.random.default_rng([seed, n])
+    draws = rng.multinomial(n, benford_law, size=n_sim)
+    chi2, mad = benford_statistics(draws)
+    chi2.sort()
+    mad.sort()
+    chi2.flags.writeable = False
+    mad.flags.writeable = False
+    return {"chi2": chi2, "mad": mad}
+
+
+def benford_monte_carlo(counts, n_sim=10_000, seed=0):
+    """p-values Monte Carlo du chi-deux et du MAD pour des effectifs de premiers chiffres (..., 9).
+
+    Chaque ligne est comparée à la distribution simulée sous la loi de Benford
+    pour son effectif total ; p = (1 + nb de tirages ≥ observé) / (n_sim + 1).
+    Retourne chi2, mad, p_value, p_value_mad et mad_critical (quantile à 95 %
+    du MAD simulé), de forme counts.shape[:-1] ; NaN pour les lignes vides.
+    """
+    counts = np.asarray(counts)
+    chi2, mad = benford_statistics(counts)
+    totals = counts.sum(axis=-1)
+    p_value = np.full(totals.shape, np.nan)
+    p_value_mad = np.full(totals.shape, np.nan)
+    mad_critical = np.full(totals.shape, np.nan)
+
+    for n in np.unique(totals[totals > 0]):
+        rows = totals == n
+        null = benford_null_distribution(int(n), n_sim, seed)
+        # Nombre de tirages strictement inférieurs → nombre de tirages ≥ observé
+        p_value[rows] = (1 + n_sim - np.searchsorted(null["chi2"], chi2[rows])) / (n_sim + 1)
+        p_value_mad[rows] = (1 + n_sim - np.searchsorted(null["mad"], mad[rows])) / (n_sim + 1)
+        mad_critical[rows] = np.quantile(null["mad"], 0.95)
+
+    return {
+        "chi2": chi2,
+        "mad": mad,
+        "p_value": p_value,
+        "p_value_mad": p_value_mad,
+        "mad_critical": mad_critical,
+    }
+
+
+def benford_test(values, n_sim=0, seed=0):
+    """Test du chi-deux des premiers chiffres significatifs de values contre la loi de Benford.
+
+    Avec n_sim > 0, ajoute les p-values Monte Carlo (p_value_mc, p_value_mad),
+    plus fiables que l'approximation asymptotique sur quelques centaines de valeurs.
+    """
+    from scipy import stats  # import différé : scipy ralentit le démarrage des processus
+
+    first_digits = extract_first_digits(values)
+    observed_counts = np.bincount(first_digits[first_digits > 0], minlength=10)[1:10]
+    observed_freq = observed_counts / observed_counts.sum()
+    chi2_stat, p_value = stats.chisquare(observed_counts, f_exp=benford_law * observed_counts.sum())
+    result = {
+        "observed_counts": observed_counts,
+        "observed_freq": observed_freq,
+        "chi2": chi2_stat,
+        "p_value": p_value,
+        "mad": benford_statistics(observed_counts)[1],
+    }
+    if n_sim:
+        simulation = benford_monte_carlo(observed_counts, n_sim, seed)
+        result["p_value_mc"] = float(simulation["p_value"])
+        result["p_value_mad"] = float(simulation["p_value_mad"])
+        result["mad_critical"] = float(simulation["mad_critical"])
+    return result
@@ -0,0 +1,89 @@
+"""Intervalles de confiance bootstrap des indices de préférence des chiffres terminaux."""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .indices import calculate_indices_batch
+
+# Nombre maximal d'effectifs simulés simultanément en mémoire (≈ 8 octets chacun)
+MAX_BLOCK_CELLS = 2_000_000
+
+
+def _bootstrap_rows(ages, rows, n_boot, confidence, age_min, age_max, seed):
+    """Bootstrap multinomial d'un bloc de lignes (lignes × âges) ; retourne (bas, haut) par indice."""
+    rng = np.random.default_rng(seed)
+    # Effectifs négatifs ou NaN (lissage, passage aux âges simples) : probabilité nulle
+    rows = np.where(rows > 0, rows, 0.0)
+    totals = np.rint(rows.sum(axis=-1)).astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pvals = np.where(totals[:, None] > 0, rows / rows.sum(axis=-1, keepdims=True), 1 / rows.shape[-1])
+
+    tail = (1 - confidence) / 2
+    bounds = {}
+    rows_per_block = max(1, MAX_BLOCK_CELLS // (n_boot * rows.shape[-1]))
+    for start in range(0, len(rows), rows_per_block):
+        block = slice(start, start + rows_per_block)
+        # Toutes les réplications du bloc en un seul tirage : (réplications × lignes × âges)
+        draws = rng.multinomial(totals[block], pvals[block], size=(n_boot, len(totals[block])))
+        replicates = calculate_indices_batch(ages, draws, age_min, age_max)
+        for name, values in replicates.items():
+            with warnings.catch_warnings():
+                # Lignes sans effectif : toutes les réplications sont NaN
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low, high = np.nanquantile(values, [tail, 1 - tail], axis=0)
+            low = np.where(totals[block] > 0, low, np.nan)
+            high = np.where(totals[block] > 0, high, np.nan)
+            bounds.setdefault(name, ([], []))
+            bounds[name][0].append(low)
+            bounds[name][1].append(high)
+    return {name: (np.concatenate(low), np.concatenate(high)) for name, (low, high) in bounds.items()}
+
+
+def _bootstrap_task(task):
+    return _bootstrap_rows(*task)
+
+
+def bootstrap_indices(ages, populations, n_boot=1000, confidence=0.95, age_min=23, age_max=62,
+                      seed=None, workers=1, chunk_size=256):
+    """Intervalles de confiance bootstrap de Whipple, Myers, Bachi et de l'indice ONU.
+
+    Chaque ligne de populations (..., âges) est rééchantillonnée selon une loi
+    multinomiale de même effectif total ; les n_boot réplications sont tirées et
+    évaluées en une seule opération sur tableaux. Les lignes sont découpées en
+    blocs de chunk_size, répartis sur `workers` processus. Chaque bloc reçoit sa
+    propre graine dérivée de seed (entier ou SeedSequence) : pour seed et chunk_size
+    donnés, le résultat ne dépend pas du nombre de processus.
+
+    Retourne {indice: {"estimate", "low", "high"}} avec des tableaux de forme
+    populations.shape[:-1].
+    """
+    ages = np.asarray(ages)
+    populations = np.asarray(populations, dtype=float)
+    shape = populations.shape[:-1]
+    rows = populations.reshape(-1, populations.shape[-1])
+
+    starts = range(0, len(rows), chunk_size)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(starts))
+    tasks = [
+        (ages, rows[start:start + chunk_size], n_boot, confidence, age_min, age_max, child)
+        for start, child in zip(starts, seeds)
+    ]
+    if workers == 1:
+        chunks = list(map(_bootstrap_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_bootstrap_task, tasks))
+
+    estimates = calculate_indices_batch(ages, populations, age_min, age_max)
+    return {
+        name: {
+            "estimate": estimates[name],
+            "low": np.concatenate([chunk[name][0] for chunk in chunks]).reshape(shape),
+            "high": np.concatenate([chunk[name][1] for chunk in chunks]).reshape(shape),
+        }
+        for name in estimates
+    }
@@ -0,0 +1,59 @@
+"""Données démographiques de référence (effectifs par âge et par sexe)."""
+
+import hashlib
+
+import numpy as np
+
+Age = np.array([
+    0.00, 1.00, 2.00, 3.00, 4.00, 5.00, 6.00, 7.00, 8.00, 9.00,
+    10.00, 11.00, 12.00, 13.00, 14.00, 15.00, 16.00, 17.00, 18.00, 19.00,
+    20.00, 21.00, 22.00, 23.00, 24.00, 25.00, 26.00, 27.00, 28.00, 29.00,
+    30.00, 31.00, 32.00, 33.00, 34.00, 35.00, 36.00, 37.00, 38.00, 39.00,
+    40.00, 41.00, 42.00, 43.00, 44.00, 45.00, 46.00, 47.00, 48.00, 49.00,
+    50.00, 51.00, 52.00, 53.00, 54.00, 55.00, 56.00, 57.00, 58.00, 59.00,
+    60.00, 61.00, 62.00, 63.00, 64.00, 65.00, 66.00, 67.00, 68.00, 69.00,
+    70.00, 71.00, 72.00, 73.00, 74.00, 75.00, 76.00, 77.00, 78.00, 79.00,
+    80.00, 81.00, 82.00, 83.00, 84.00, 85.00, 86.00, 87.00, 88.00, 89.00,
+    90.00, 91.00, 92.00, 93.00, 94.00, 95.00, 96.00, 97.00, 98.00, 99.00,
+    100.00, 101.00, 102.00, 103.00, 107.00, 108.00, 109.00, 110.00
+])
+
+Homme = np.array([
+    2637, 2258, 2575, 2830, 2884, 2856, 2940, 3028, 3199, 2582,
+    3323, 2474, 3064, 2955, 2650, 3020, 2395, 2408, 2631, 2047,
+    2793, 1552, 2106, 1821, 1690, 2174, 1509, 1402, 1534, 1097,
+    2276, 923, 1455, 1208, 1129, 1691, 1135, 1119, 1129, 825,
+    1532, 717, 1073, 747, 662, 1131, 681, 674, 690, 520,
+    1066, 439, 626, 512, 473, 568, 431, 443, 410, 344,
+    709, 303, 475, 394, 300, 403, 281, 272, 242, 195,
+    445, 183, 254, 163, 135, 171, 100, 120, 98, 49,
+    151, 52, 85, 55, 40, 38, 33, 29, 19, 19,
+    34, 8, 18, 12, 9, 12, 10, 5, 3, 43,
+    6, 1, 1, 0, 1, 1, 1, 1
+])
+
+Femme = np.array([
+    2552, 2136, 2381, 2735, 2651, 2674, 2692, 2802, 2707, 2234,
+    2984, 2083, 2727, 2518, 2432, 2604, 2372, 2257, 2575, 2106,
+    2908, 1629, 2275, 1911, 1842, 2422, 1602, 1514, 1604, 1158,
+    2441, 965, 1372, 1316, 1090, 1863, 1181, 1125, 1042, 914,
+    1579, 653, 999, 734, 636, 1009, 618, 685, 681, 591,
+    1125, 535, 656, 533, 465, 641, 450, 434, 406, 323,
+    817, 376, 506, 370, 290, 423, 271, 252, 251, 212,
+    512, 205, 267, 149, 98, 189, 101, 129, 88, 65,
+    200, 73, 89, 56, 42, 59, 19, 25, 24, 27,
+    54, 11, 26, 10, 8, 10, 4, 5, 6, 23,
+    7, 0, 3, 2, 1, 0, 0, 1
+])
+
+Total = Homme + Femme
+
+
+def content_hash(*arrays):
+    """Empreinte du contenu (type, forme et valeurs) d'un ou plusieurs tableaux."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
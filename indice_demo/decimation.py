@@ -0,0 +1,54 @@
+"""Décimation des séries longues pour l'affichage.
+
+Un graphique dispose d'un budget de points : il est partagé entre ses courbes
+(point_budgets), puis chaque courbe trop longue est réduite par tranches
+consécutives dont on ne garde que le minimum et le maximum (decimate_minmax),
+ce qui conserve l'enveloppe visible de la courbe. Le module ne dépend pas de
+Plotly : l'interface l'applique aux traces de ses figures.
+"""
+
+import numpy as np
+
+
+def decimate_minmax(y, max_points):
+    """Indices triés d'au plus max_points points de y conservant son enveloppe.
+
+    La série est découpée en (max_points - 2) // 2 tranches consécutives : chaque
+    tranche garde son minimum et son maximum, et le premier et le dernier point
+    sont toujours conservés. Un NaN est classé comme maximum de sa tranche, ce qui
+    garde la coupure de la courbe.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 2:
+        raise ValueError("Une courbe décimée garde au moins ses deux extrémités.")
+
+    n_buckets = (max_points - 2) // 2
+    if n_buckets == 0:
+        return np.array([0, n - 1])
+    buckets = np.arange(n) * n_buckets // n
+    # Tri par tranche puis par valeur : premier = minimum, dernier = maximum
+    order = np.lexsort((y, buckets))
+    starts = np.searchsorted(buckets[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
+
+
+def point_budgets(lengths, max_points):
+    """Nombre de points attribué à chaque courbe d'un graphique de budget max_points.
+
+    Les courbes plus courtes que leur part gardent tous leurs points ; ce qu'elles
+    laissent est partagé à parts égales entre les plus longues. La somme ne
+    dépasse pas max_points, sauf s'il y a plus de max_points / 2 courbes : chacune
+    garde alors au moins ses deux extrémités.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    budgets = np.empty_like(lengths)
+    remaining = max_points
+    for rank, i in enumerate(np.argsort(lengths, kind="stable")):
+        share = max(remaining // (len(lengths) - rank), 2)
+        budgets[i] = min(lengths[i], share)
+        remaining -= budgets[i]
+    return budgets
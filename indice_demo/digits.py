@@ -0,0 +1,97 @@
+"""Extraction vectorisée des chiffres significatifs."""
+
+import functools
+import math
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def leading_digit_thresholds():
+    """Table des flottants j·10^e (j = 10..100, e = -325..308) servant de bornes exactes."""
+    return np.array([[float(f"{j}e{e}") for j in range(10, 101)] for e in range(-325, 309)])
+
+
+def extract_leading_digits(values):
+    """Deux premiers chiffres significatifs (10-99) de |values|, -1 pour 0, NaN ou ±inf.
+
+    Une première estimation est obtenue par log10 ; elle est ensuite corrigée
+    d'une unité au plus en comparant la valeur aux bornes j·10^e exactes, ce qui
+    donne les mêmes chiffres que l'écriture décimale de la valeur (0.3 → 30 et
+    non 29, 9.999999999999998 → 99 et non 10).
+    """
+    x = np.abs(np.asarray(values, dtype=float)).ravel()
+    valid = np.isfinite(x) & (x > 0)
+    x = np.where(valid, x, 1.0)
+
+    # Estimation : exposant de la paire de chiffres et mantisse dans [10, 100)
+    shift = np.where(x < 1e-290, 300, 0)
+    scaled = x * 10.0 ** shift
+    exponent = np.floor(np.log10(scaled)) - 1
+    estimate = np.where(exponent >= 0, scaled / 10.0 ** np.maximum(exponent, 0),
+                        scaled * 10.0 ** np.maximum(-exponent, 0))
+    row = (exponent - shift).astype(np.int64) + 325
+    col = np.clip(np.floor(estimate).astype(np.int64), 10, 99) - 10
+
+    # Correction de l'exposant puis des chiffres à partir des bornes exactes
+    thresholds = leading_digit_thresholds()
+    below = x < thresholds[row, 0]
+    row -= below
+    above = x >= thresholds[row, 90]
+    row += above
+    col = np.where(below, 89, np.where(above, 0, col))
+    col -= x < thresholds[row, col]
+    col += x >= thresholds[row, col + 1]
+
+    digits = np.where(valid, col + 10, -1)
+    return digits.reshape(np.shape(values))
+
+
+def extract_first_digits(values):
+    """Premier chiffre significatif (1-9) de chaque valeur, -1 si non défini."""
+    digits = extract_leading_digits(values)
+    return np.where(digits < 0, -1, digits // 10)
+
+
+def extract_first_two_digits(values):
+    """Deux premiers chiffres significatifs (10-99) de chaque valeur, -1 si non définis."""
+    return extract_leading_digits(values)
+
+
+def extract_second_digits(values):
+    """Deuxième chiffre significatif (0-9) de chaque valeur, -1 si non défini."""
+    digits = extract_leading_digits(values)
+    return np.where(digits < 0, -1, digits % 10)
+
+
+@functools.lru_cache(maxsize=None)
+def _threshold_rows():
+    """leading_digit_thresholds en listes Python, pour la version scalaire."""
+    return leading_digit_thresholds().tolist()
+
+
+def get_first_digit(number):
+    """Extrait le premier chiffre significatif.
+
+    Reprend pas à pas l'estimation et la correction d'extract_leading_digits
+    sur un flottant Python, sans construire de tableau pour une seule valeur.
+    """
+    x = abs(float(number))
+    if not math.isfinite(x) or x == 0:
+        return None
+
+    shift = 300 if x < 1e-290 else 0
+    scaled = x * 10.0 ** shift
+    exponent = math.floor(math.log10(scaled)) - 1
+    estimate = scaled / 10.0 ** exponent if exponent >= 0 else scaled * 10.0 ** -exponent
+    row = exponent - shift + 325
+    col = min(max(math.floor(estimate), 10), 99) - 10
+
+    thresholds = _threshold_rows()
+    if x < thresholds[row][0]:
+        row, col = row - 1, 89
+    elif x >= thresholds[row][90]:
+        row, col = row + 1, 0
+    col -= x < thresholds[row][col]
+    col += x >= thresholds[row][col + 1]
+    return (col + 10) // 10
@@ -0,0 +1,116 @@
+"""Passage de groupes quinquennaux à des âges simples : multiplicateurs de Sprague et de Beers.
+
+Chaque groupe de 5 ans est réparti entre ses 5 âges à partir des effectifs du
+groupe et de ses voisins : panneaux F1 et F2 pour les deux premiers groupes,
+panneau central M (groupes i-2 à i+2) ensuite, panneaux F2 et F1 retournés pour
+les deux derniers. Les panneaux sont assemblés une fois pour toutes en une
+matrice (5n × n) ; le passage aux âges simples de toutes les zones est alors un
+seul produit matriciel le long du dernier axe, et le résultat suit le même
+chemin que les tableaux par âge simple (indices, Benford, moyennes mobiles).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+GRADUATION_WIDTH = 5
+
+# Panneaux (5 âges × 5 groupes) : premier groupe, deuxième groupe, groupes centraux
+_PANELS = {
+    "sprague": (
+        np.array([[0.3616, -0.2768, 0.1488, -0.0336, 0.0000],
+                  [0.2640, -0.0960, 0.0400, -0.0080, 0.0000],
+                  [0.1840, 0.0400, -0.0320, 0.0080, 0.0000],
+                  [0.1200, 0.1360, -0.0720, 0.0160, 0.0000],
+                  [0.0704, 0.1968, -0.0848, 0.0176, 0.0000]]),
+        np.array([[0.0336, 0.2272, -0.0752, 0.0144, 0.0000],
+                  [0.0080, 0.2320, -0.0480, 0.0080, 0.0000],
+                  [-0.0080, 0.2160, -0.0080, 0.0000, 0.0000],
+                  [-0.0160, 0.1840, 0.0400, -0.0080, 0.0000],
+                  [-0.0176, 0.1408, 0.0912, -0.0144, 0.0000]]),
+        np.array([[-0.0128, 0.0848, 0.1504, -0.0240, 0.0016],
+                  [-0.0016, 0.0144, 0.2224, -0.0416, 0.0064],
+                  [0.0064, -0.0336, 0.2544, -0.0336, 0.0064],
+                  [0.0064, -0.0416, 0.2224, 0.0144, -0.0016],
+                  [0.0016, -0.0240, 0.1504, 0.0848, -0.0128]]),
+    ),
+    "beers": (
+        np.array([[0.3333, -0.1636, -0.0210, 0.0796, -0.0283],
+                  [0.2595, -0.0780, 0.0130, 0.0100, -0.0045],
+                  [0.1924, 0.0064, 0.0184, -0.0256, 0.0084],
+                  [0.1329, 0.0844, 0.0054, -0.0356, 0.0129],
+                  [0.0819, 0.1508, -0.0158, -0.0284, 0.0115]]),
+        np.array([[0.0404, 0.2000, -0.0344, -0.0128, 0.0068],
+                  [0.0093, 0.2268, -0.0402, 0.0028, 0.0013],
+                  [-0.0108, 0.2272, -0.0248, 0.0112, -0.0028],
+                  [-0.0198, 0.1992, 0.0172, 0.0072, -0.0038],
+                  [-0.0191, 0.1468, 0.0822, -0.0084, -0.0015]]),
+        np.array([[-0.0117, 0.0804, 0.1570, -0.0284, 0.0027],
+                  [-0.0020, 0.0160, 0.2200, -0.0400, 0.0060],
+                  [0.0050, -0.0280, 0.2460, -0.0280, 0.0050],
+                  [0.0060, -0.0400, 0.2200, 0.0160, -0.0020],
+                  [0.0027, -0.0284, 0.1570, 0.0804, -0.0117]]),
+    ),
+}
+
+GRADUATION_METHODS = tuple(_PANELS)
+
+
+@lru_cache(maxsize=None)
+def graduation_matrix(n_groups, method="sprague"):
+    """Matrice (5·n_groups × n_groups) des multiplicateurs, en lecture seule (mise en cache).
+
+    Il faut au moins 5 groupes pour que chaque panneau trouve ses voisins.
+    """
+    if method not in _PANELS:
+        raise ValueError(f"Méthode de passage aux âges simples inconnue : {method}")
+    if n_groups < 5:
+        raise ValueError("Au moins 5 groupes quinquennaux sont nécessaires.")
+    first, second, middle = _PANELS[method]
+    width = GRADUATION_WIDTH
+
+    matrix = np.zeros((width * n_groups, n_groups))
+    matrix[:width, :5] = first
+    matrix[width:2 * width, :5] = second
+    for i in range(2, n_groups - 2):
+        matrix[i * width:(i + 1) * width, i - 2:i + 3] = middle
+    # Les deux derniers groupes utilisent les premiers panneaux lus à rebours
+    matrix[(n_groups - 2) * width:(n_groups - 1) * width, -5:] = second[::-1, ::-1]
+    matrix[(n_groups - 1) * width:, -5:] = first[::-1, ::-1]
+    matrix.setflags(write=False)
+    return matrix
+
+
+def graduate(groups, method="sprague", open_ended=False, clip=True):
+    """Effectifs par âge simple à partir d'effectifs par groupe quinquennal (..., groupes).
+
+    Les groupes commencent à 0 (0-4, 5-9, ...). Les multiplicateurs conservent
+    le total de chaque groupe mais peuvent produire des effectifs négatifs aux
+    âges peu peuplés : avec clip (par défaut), ils sont ramenés à 0 et les âges
+    du groupe remis à l'échelle de son total. Avec open_ended, le dernier groupe
+    (80+, par exemple) n'est pas réparti : il est recopié comme dernier âge du
+    résultat, qu'il faut tenir à l'écart des indices de chiffres terminaux.
+    Forme du résultat : groups.shape[:-1] + (5 × groupes fermés [+ 1],).
+    """
+    groups = np.asarray(groups, dtype=float)
+    closed = groups[..., :-1] if open_ended else groups
+    single = closed @ graduation_matrix(closed.shape[-1], method).T
+    if clip:
+        blocks = np.maximum(single, 0).reshape(closed.shape + (GRADUATION_WIDTH,))
+        sums = blocks.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            blocks = np.where(sums > 0, blocks * (closed[..., None] / sums), 0.0)
+        single = blocks.reshape(single.shape)
+    if open_ended:
+        single = np.concatenate([single, groups[..., -1:]], axis=-1)
+    return single
+
+
+def graduate_dense(counts, method="sprague", open_ended=False, clip=True):
+    """graduate pour des effectifs déjà posés sur un axe d'âges dense, au début de chaque groupe.
+
+    C'est la forme des effectifs lus par read_age_sex_table ou dans une base en colonnes
+    quand la colonne âge porte le premier âge de chaque groupe (0, 5, 10, ...).
+    """
+    counts = np.asarray(counts, dtype=float)
+    return graduate(counts[..., ::GRADUATION_WIDTH], method, open_ended, clip)
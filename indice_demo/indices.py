@@ -0,0 +1,202 @@
+"""Indices de préférence des chiffres terminaux : Whipple, Myers, Bachi, ONU.
+
+Tous les indices sont calculés à partir d'effectifs par chiffre terminal
+(..., 10) sur leur plage d'âges. terminal_digit_table lit en une seule
+opération les quatre histogrammes utiles (plage de Whipple, de Myers, de Bachi
+et tous les âges) dans un AgeIndex ; la ligne Total y est la somme des deux
+sexes plutôt qu'un nouveau passage sur les données.
+
+Les sommes cumulées de l'AgeIndex sont exactes pour des effectifs entiers.
+Pour des effectifs réels (lissés ou ramenés en âges simples), leurs
+différences s'arrondissent autrement que la boucle scalaire d'origine :
+calculate_indices_batch et les fonctions scalaires somment alors chaque
+chiffre par une réduction dans l'ordre des âges, comme cette boucle, et
+donnent les mêmes valeurs au bit près. Les tables lues dans un AgeIndex
+(terminal_digit_table) ne sont égales à la boucle qu'aux arrondis près pour
+des effectifs réels.
+"""
+
+import numpy as np
+
+from .age_index import AgeIndex
+
+# Plages fixes de Myers et de Bachi ; celle de Whipple est un paramètre
+MYERS_AGES = (10, 89)
+BACHI_AGES = (20, 89)
+
+# Lignes de terminal_digit_table
+DIGIT_RANGES = ("whipple", "myers", "bachi", "all")
+
+
+def _row_sums(populations, selected):
+    """Somme de chaque ligne sur les âges sélectionnés, par la même réduction qu'un tableau 1-D.
+
+    L'indexation par masque du dernier axe rend un tableau en ordre Fortran,
+    que NumPy réduit colonne par colonne ; une copie contiguë garde la
+    sommation par paires de ndarray.sum sur chaque ligne.
+    """
+    return np.ascontiguousarray(populations[..., selected]).sum(axis=-1)
+
+
+def _digit_sums(ages, populations, age_min, age_max):
+    """Effectifs par chiffre terminal des âges entre age_min et age_max, forme (..., 10).
+
+    Chaque chiffre est une réduction sur ses âges pris dans l'ordre, comme dans
+    la boucle scalaire d'origine, d'où des sommes identiques au bit près.
+    """
+    in_range = np.flatnonzero((ages >= age_min) & (ages <= age_max))
+    digits = ages[in_range] % 10
+    # Tri stable par chiffre : les âges de chaque chiffre, dans leur ordre, forment
+    # une tranche contiguë de chaque ligne d'une seule copie
+    order = np.argsort(digits, kind="stable")
+    grouped = np.ascontiguousarray(populations[..., in_range[order]])
+    bounds = np.searchsorted(digits[order], np.arange(11))
+    sums = np.empty(populations.shape[:-1] + (10,))
+    for digit in range(10):
+        sums[..., digit] = grouped[..., bounds[digit]:bounds[digit + 1]].sum(axis=-1)
+    return sums
+
+
+def _whipple_sums(ages, populations, age_min, age_max):
+    """Effectifs des âges terminés par 0 ou 5 et effectif total de la plage, dans l'ordre scalaire."""
+    in_range = (ages >= age_min) & (ages <= age_max)
+    subset = np.ascontiguousarray(populations[..., in_range])
+    last_digit = ages[in_range] % 10
+    return _row_sums(subset, (last_digit == 0) | (last_digit == 5)), subset.sum(axis=-1)
+
+
+def _whipple_ratio(pop_0_5, pop_total):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(pop_total > 0, pop_0_5 / pop_total * 100, np.nan)
+
+
+def _whipple(digits):
+    return _whipple_ratio(digits[..., 0] + digits[..., 5], digits.sum(axis=-1))
+
+
+def _sequential_sum(terms):
+    """Somme des termes du dernier axe de gauche à droite, comme sum() ou une boucle +=."""
+    return np.cumsum(terms, axis=-1)[..., -1]
+
+
+def _myers(digits):
+    # Termes chiffre par chiffre, accumulés dans l'ordre de la formule
+    total = _sequential_sum(digits)
+    weights = digits + np.roll(digits, -1, axis=-1)
+    myers = _sequential_sum(np.abs(weights - total[..., None] / 10))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return myers / (2 * total) * 100
+
+
+def _bachi(digits):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digit_percent = digits / digits.sum(axis=-1, keepdims=True) * 100
+    # float_power suit l'arrondi de `deviation ** 2` du calcul scalaire
+    return np.sqrt(_sequential_sum(np.float_power((digit_percent - 10) / 10, 2))) * 100
+
+
+def calculate_whipple(ages, populations, age_min=23, age_max=62):
+    """Calcule l'indice de Whipple."""
+    ages, populations = np.asarray(ages), np.asarray(populations)
+    return _whipple_ratio(*_whipple_sums(ages, populations, age_min, age_max))[()]
+
+
+def calculate_myers(ages, populations):
+    """Calcule l'indice de Myers."""
+    ages, populations = np.asarray(ages), np.asarray(populations)
+    return _myers(_digit_sums(ages, populations, *MYERS_AGES))[()]
+
+
+def calculate_bachi(ages, populations):
+    """Calcule l'indice de Bachi."""
+    ages, populations = np.asarray(ages), np.asarray(populations)
+    return _bachi(_digit_sums(ages, populations, *BACHI_AGES))[()]
+
+
+def calculate_un_index(whipple, myers, bachi):
+    """Calcule l'indice combiné des Nations Unies."""
+    if np.isnan(whipple) or np.isnan(myers) or np.isnan(bachi):
+        return np.nan
+    # Normalisation des indices
+    whipple_norm = min(whipple / 100, 2.0)  # Limité à 2.0
+    myers_norm = min(myers / 100, 2.0)
+    bachi_norm = min(bachi / 100, 2.0)
+    return (whipple_norm + myers_norm + bachi_norm) / 3 * 100
+
+
+def _un_index(whipple, myers, bachi):
+    """Indice combiné des Nations Unies, tableau par tableau."""
+    return (np.minimum(whipple / 100, 2.0)
+            + np.minimum(myers / 100, 2.0)
+            + np.minimum(bachi / 100, 2.0)) / 3 * 100
+
+
+def calculate_indices_batch(ages, populations, age_min=23, age_max=62):
+    """Calcule Whipple, Myers, Bachi et l'indice ONU pour chaque ligne de populations.
+
+    populations est de forme (..., âges) : une ligne par zone, et éventuellement
+    un axe pour le sexe, par exemple (zones × 3 × âges) pour Hommes/Femmes/Total.
+    Les résultats sont des tableaux de forme populations.shape[:-1].
+    """
+    ages, populations = np.asarray(ages), np.asarray(populations)
+    if np.issubdtype(populations.dtype, np.integer):
+        return indices_from_age_index(AgeIndex(ages, populations), age_min, age_max)
+
+    # Effectifs réels : sommes dans l'ordre de la boucle scalaire (voir _digit_sums)
+    whipple = _whipple_ratio(*_whipple_sums(ages, populations, age_min, age_max))
+    myers = _myers(_digit_sums(ages, populations, *MYERS_AGES))
+    bachi = _bachi(_digit_sums(ages, populations, *BACHI_AGES))
+    return {"whipple": whipple, "myers": myers, "bachi": bachi, "un_index": _un_index(whipple, myers, bachi)}
+
+
+def _with_total(digits):
+    """Ajoute une ligne Total, somme des deux sexes de l'avant-dernier axe de tête."""
+    return np.concatenate([digits, digits.sum(axis=-3, keepdims=True)], axis=-3)
+
+
+def terminal_digit_table(age_index, age_min=23, age_max=62, with_total=False):
+    """Effectifs par chiffre terminal sur les plages de DIGIT_RANGES, forme (..., 4, 10).
+
+    Les quatre plages sont lues en une seule opération dans l'AgeIndex. Avec
+    with_total, l'index porte les effectifs (..., 2, âges) des deux sexes et une
+    ligne Total (somme des deux) est ajoutée : forme (..., 3, 4, 10), lignes
+    dans l'ordre Hommes, Femmes, Total.
+    """
+    lo = np.array([age_min, MYERS_AGES[0], BACHI_AGES[0], -np.inf])
+    hi = np.array([age_max, MYERS_AGES[1], BACHI_AGES[1], np.inf])
+    table = age_index.digit_sums(lo, hi).astype(float)
+    return _with_total(table) if with_total else table
+
+
+def indices_from_digit_table(table):
+    """Whipple, Myers, Bachi et indice ONU d'une table (..., 4, 10) de terminal_digit_table."""
+    whipple = _whipple(table[..., 0, :])
+    myers = _myers(table[..., 1, :])
+    bachi = _bachi(table[..., 2, :])
+
+    return {"whipple": whipple, "myers": myers, "bachi": bachi, "un_index": _un_index(whipple, myers, bachi)}
+
+
+def indices_from_age_index(age_index, age_min=23, age_max=62, with_total=False):
+    """Calcule Whipple, Myers, Bachi et l'indice ONU à partir d'un AgeIndex déjà construit."""
+    return indices_from_digit_table(terminal_digit_table(age_index, age_min, age_max, with_total))
+
+
+def whipple_sensitivity(age_index, age_mins=range(20, 31), age_maxs=range(55, 71), with_total=False):
+    """Indice de Whipple pour chaque couple (âge minimum, âge maximum).
+
+    Toutes les combinaisons sont lues en une seule opération dans l'AgeIndex :
+    le résultat est de forme (..., len(age_mins), len(age_maxs)), les axes de
+    tête étant ceux de l'index (zones, sexes). Avec with_total, comme pour
+    terminal_digit_table, une ligne Total est ajoutée à l'axe des sexes.
+    """
+    digits = age_index.digit_sums(np.asarray(age_mins)[:, None], np.asarray(age_maxs)[None, :])
+    digits = digits.astype(float)
+    if with_total:
+        digits = np.concatenate([digits, digits.sum(axis=-4, keepdims=True)], axis=-4)
+    return _whipple(digits)
+
+
+def terminal_digit_counts(ages, populations):
+    """Effectifs par chiffre terminal d'âge (0-9) sur l'ensemble des âges, pour chaque ligne."""
+    return AgeIndex(ages, populations).digit_sums(-np.inf, np.inf).astype(float)
@@ -0,0 +1,63 @@
+"""Lecture en flux des microdonnées de recensement."""
+
+import numpy as np
+
+
+def read_microdata_histograms(source, age_col="age", sex_col="sexe", area_col=None,
+                              sex_codes=("1", "2"), max_age=110, chunksize=1_000_000):
+    """Construit les effectifs âge × sexe (× zone) à partir de microdonnées CSV.
+
+    Le fichier est lu par blocs de `chunksize` enregistrements : chaque bloc est
+    réduit par un `np.bincount` sur la clé combinée (zone, sexe, âge), si bien que
+    la mémoire ne dépend que du nombre de zones et non du nombre d'enregistrements.
+    sex_codes donne les codes (Hommes, Femmes) de la colonne sexe. Les âges sont
+    tronqués à l'année révolue ; les enregistrements hors de [0, max_age] ou de
+    sexe inconnu sont comptés dans "rejected".
+
+    Retourne un dictionnaire avec "ages" (0..max_age), "areas" (codes de zone),
+    "counts" de forme (zones × 2 × âges) et "rejected".
+    """
+    import pandas as pd  # import différé : pandas ralentit le démarrage des processus
+
+    n_ages = max_age + 1
+    sex_codes = [str(code) for code in sex_codes]
+    usecols = [age_col, sex_col] + ([area_col] if area_col else [])
+    dtype = {sex_col: str} | ({area_col: str} if area_col else {})
+
+    area_index = {}
+    counts = np.zeros(0, dtype=np.int64)
+    rejected = 0
+
+    for chunk in pd.read_csv(source, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        ages = np.floor(pd.to_numeric(chunk[age_col], errors="coerce").to_numpy(dtype=float))
+        sexes = chunk[sex_col].str.strip().to_numpy()
+        sex_idx = np.where(sexes == sex_codes[0], 0, np.where(sexes == sex_codes[1], 1, -1))
+
+        if area_col:
+            # Codes de zone locaux au bloc, ramenés à l'index global
+            local_codes, uniques = pd.factorize(chunk[area_col], use_na_sentinel=True)
+            for code in uniques:
+                area_index.setdefault(code, len(area_index))
+            # Code -1 (zone manquante) en dernière position : lu par global_codes[-1],
+            # y compris pour un bloc sans aucune zone renseignée
+            global_codes = np.array([area_index[code] for code in uniques] + [-1], dtype=np.int64)
+            area_idx = global_codes[local_codes]
+        else:
+            area_index.setdefault("Ensemble", 0)
+            area_idx = np.zeros(len(chunk), dtype=np.int64)
+
+        valid = (ages >= 0) & (ages <= max_age) & (sex_idx >= 0) & (area_idx >= 0)
+        rejected += int((~valid).sum())
+
+        key = (area_idx[valid] * 2 + sex_idx[valid]) * n_ages + ages[valid].astype(np.int64)
+        size = len(area_index) * 2 * n_ages
+        if counts.size < size:
+            counts = np.concatenate([counts, np.zeros(size - counts.size, dtype=np.int64)])
+        counts += np.bincount(key, minlength=size)
+
+    return {
+        "ages": np.arange(n_ages),
+        "areas": list(area_index),
+        "counts": counts.reshape(len(area_index), 2, n_ages),
+        "rejected": rejected,
+    }
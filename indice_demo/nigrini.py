@@ -0,0 +1,171 @@
+"""Batterie de tests de Benford de Nigrini : chiffres significatifs, derniers chiffres, sommes.
+
+Tests du premier chiffre, du deuxième chiffre, des deux premiers chiffres et
+des deux derniers chiffres (chi-deux, MAD et, pour les trois premiers, bandes
+de conformité de Nigrini), et test des sommes par deux premiers chiffres.
+Comme le recommande Nigrini, les tests à deux chiffres ne retiennent que les
+valeurs ≥ 10 ; les deux derniers chiffres sont ceux de la partie entière.
+
+Les chiffres de toutes les valeurs sont extraits en une seule fois, puis
+comptés par np.bincount sur un numéro de ligne (zone, colonne, ...) : la
+batterie complète d'un jeu de données entier coûte quelques passages
+vectorisés, sans boucle sur les tests, les colonnes ni les zones.
+"""
+
+import numpy as np
+
+from .benford import benford_law
+from .digits import extract_leading_digits
+
+NIGRINI_TESTS = ("first", "second", "first_two", "last_two")
+
+# Loi de Benford des deux premiers chiffres (10-99) ; celle du deuxième chiffre en est la marge
+first_two_law = np.log10(1 + 1 / np.arange(10, 100))
+second_digit_law = first_two_law.reshape(9, 10).sum(axis=0)
+
+# Bornes supérieures du MAD : conformité étroite, acceptable, marginale (Nigrini, 2012)
+NIGRINI_MAD_BANDS = {
+    "first": (0.006, 0.012, 0.015),
+    "second": (0.008, 0.010, 0.012),
+    "first_two": (0.0012, 0.0018, 0.0022),
+}
+NIGRINI_CONFORMITY = ("Conformité étroite", "Conformité acceptable", "Conformité marginale", "Non-conformité")
+
+
+def nigrini_conformity(mad, test="first"):
+    """Classe de conformité (indice dans NIGRINI_CONFORMITY) d'un MAD, -1 si le MAD n'est pas défini."""
+    mad = np.asarray(mad, dtype=float)
+    # Chaque borne appartient à la classe inférieure : 0.006 est encore une conformité étroite
+    classes = np.digitize(mad, NIGRINI_MAD_BANDS[test], right=True)
+    return np.where(np.isnan(mad), -1, classes)
+
+
+def conformity_labels(classes):
+    """Libellés de NIGRINI_CONFORMITY pour des classes de nigrini_conformity ("" si non définie)."""
+    labels = np.array(NIGRINI_CONFORMITY + ("",), dtype=object)
+    return labels[np.asarray(classes)]
+
+
+def _row_counts(rows, codes, n_bins, n_rows, weights=None):
+    """Effectifs (ou sommes de weights) (n_rows × n_bins) des codes 0..n_bins-1 de chaque ligne."""
+    flat = np.bincount(rows * n_bins + codes, weights=weights, minlength=n_rows * n_bins)
+    return flat.reshape(n_rows, n_bins)
+
+
+def _digit_test(counts, law):
+    """Chi-deux, p-value, MAD et proportions d'effectifs (lignes × chiffres) contre la loi law."""
+    from scipy import stats  # import différé : scipy ralentit le démarrage des processus
+
+    counts = counts.astype(float)
+    n = counts.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proportions = counts / n[:, None]
+        chi2 = ((counts - n[:, None] * law) ** 2 / (n[:, None] * law)).sum(axis=-1)
+        mad = np.abs(proportions - law).mean(axis=-1)
+    return {
+        "n": n,
+        "counts": counts,
+        "proportions": proportions,
+        "chi2": chi2,
+        "p_value": stats.chi2.sf(chi2, len(law) - 1),
+        "mad": mad,
+    }
+
+
+def _battery(values, rows, n_rows):
+    """Batterie sur des valeurs à plat, chacune rattachée à sa ligne de résultat par rows."""
+    x = np.abs(np.asarray(values, dtype=float))
+    valid = np.isfinite(x) & (x > 0)
+    x, rows = x[valid], rows[valid]
+    leading = extract_leading_digits(x)
+    two = x >= 10
+    x2, rows2, leading2 = x[two], rows[two], leading[two]
+
+    results = {
+        "first": _digit_test(_row_counts(rows, leading // 10 - 1, 9, n_rows), benford_law),
+        "second": _digit_test(_row_counts(rows2, leading2 % 10, 10, n_rows), second_digit_law),
+        "first_two": _digit_test(_row_counts(rows2, leading2 - 10, 90, n_rows), first_two_law),
+        "last_two": _digit_test(_row_counts(rows2, (np.floor(x2) % 100).astype(np.int64), 100, n_rows),
+                                np.full(100, 0.01)),
+    }
+    for test in NIGRINI_MAD_BANDS:
+        results[test]["conformity"] = nigrini_conformity(results[test]["mad"], test)
+
+    # Test des sommes : sous la loi de Benford, chaque paire 10..99 porte la même somme
+    sums = _row_counts(rows2, leading2 - 10, 90, n_rows, weights=x2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = sums / sums.sum(axis=-1, keepdims=True)
+        summation_mad = np.abs(shares - 1 / 90).mean(axis=-1)
+    results["summation"] = {
+        "sums": sums,
+        "shares": shares,
+        "mad": summation_mad,
+        # Paire de chiffres à la plus forte somme (montants anormalement élevés ou répétés)
+        "peak": np.where(np.isnan(summation_mad), -1, np.argmax(sums, axis=-1) + 10),
+    }
+    return results
+
+
+def _reshape_results(results, shape):
+    return {
+        test: {key: value.reshape(shape + value.shape[1:]) for key, value in test_results.items()}
+        for test, test_results in results.items()
+    }
+
+
+def nigrini_battery(values, axis=-1):
+    """Batterie de Nigrini le long de axis, pour chaque ligne de values (zones, colonnes, ...).
+
+    Les valeurs nulles, NaN ou infinies sont ignorées : des séries de longueurs
+    différentes peuvent être complétées par NaN. Retourne un dictionnaire par
+    test de NIGRINI_TESTS (n, counts, proportions, chi2, p_value, mad et, sauf
+    pour last_two, conformity) et "summation" (sums, shares, mad, peak), de
+    forme values.shape privée de axis (plus l'axe des chiffres).
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    shape = values.shape[:-1]
+    n_rows = int(np.prod(shape))
+    rows = np.repeat(np.arange(n_rows), values.shape[-1])
+    return _reshape_results(_battery(values.ravel(), rows, n_rows), shape)
+
+
+def nigrini_columns(frame, columns=None, by=None):
+    """Batterie de Nigrini de plusieurs colonnes numériques d'un DataFrame, par groupe de by.
+
+    Toutes les colonnes et tous les groupes sont traités en un seul appel,
+    sans remplissage des groupes de tailles différentes. Retourne un DataFrame
+    avec une ligne par (groupe, colonne) : effectifs, MAD et classes de
+    conformité, p-values du chi-deux, MAD et paire dominante du test des sommes.
+    """
+    import pandas as pd  # import différé : pandas ralentit le démarrage des processus
+
+    if columns is None:
+        columns = list(frame.select_dtypes("number").columns.drop(by, errors="ignore"))
+    columns = list(columns)
+    if by is None:
+        codes, groups = np.zeros(len(frame), dtype=np.int64), np.array([None])
+    else:
+        # Les lignes sans groupe (code -1) sont écartées
+        codes, groups = pd.factorize(frame[by], sort=True)
+    values = frame[columns].to_numpy(dtype=float)
+    keep = codes >= 0
+    n_cols = len(columns)
+    rows = (codes[keep, None] * n_cols + np.arange(n_cols)).ravel()
+    results = _reshape_results(_battery(values[keep].ravel(), rows, len(groups) * n_cols),
+                               (len(groups), n_cols))
+
+    summary = {
+        "groupe": np.repeat(np.asarray(groups, dtype=object), n_cols),
+        "colonne": np.tile(np.asarray(columns, dtype=object), len(groups)),
+        "n": results["first"]["n"].ravel(),
+        "n_deux_chiffres": results["first_two"]["n"].ravel(),
+    }
+    for test in NIGRINI_TESTS:
+        summary[f"mad_{test}"] = results[test]["mad"].ravel()
+        if test in NIGRINI_MAD_BANDS:
+            summary[f"conformite_{test}"] = conformity_labels(results[test]["conformity"].ravel())
+        summary[f"p_{test}"] = results[test]["p_value"].ravel()
+    summary["mad_summation"] = results["summation"]["mad"].ravel()
+    summary["pic_summation"] = results["summation"]["peak"].ravel()
+    result = pd.DataFrame(summary)
+    return result.drop(columns="groupe") if by is None else result.rename(columns={"groupe": by})
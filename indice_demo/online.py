@@ -0,0 +1,153 @@
+"""Accumulateur incrémental pour le suivi en continu de la collecte.
+
+Les enregistrements (zone, sexe, âge) arrivent un à un : chaque mise à jour
+incrémente une cellule zone × sexe × âge et tient à jour, en O(1), les effectifs
+des premiers chiffres (1-9) de ces cellules pour Hommes, Femmes et Total. Les
+indices de Whipple, Myers, Bachi et le test de Benford sont ensuite calculés à
+partir de cet état, sans relire l'historique des enregistrements.
+"""
+
+import numpy as np
+
+from .age_index import AgeIndex
+from .analysis import GROUPS
+from .benford import benford_statistics, first_digit_counts
+from .indices import indices_from_age_index
+
+
+def _first_digit(value):
+    """Premier chiffre d'un entier strictement positif."""
+    while value >= 10:
+        value //= 10
+    return value
+
+
+class OnlineAccumulator:
+    """Effectifs âge × sexe et premiers chiffres par zone, mis à jour enregistrement par enregistrement.
+
+    counts est de forme (zones × 2 × âges) comme dans read_microdata_histograms ;
+    first_digits est de forme (zones × 3 × 9) et compte, pour Hommes, Femmes et
+    Total, les cellules d'âge dont l'effectif commence par 1..9 (cellules vides
+    exclues, comme dans first_digit_counts). Les enregistrements de sexe inconnu
+    ou d'âge hors de [0, max_age] sont comptés dans rejected.
+    """
+
+    def __init__(self, sex_codes=("1", "2"), max_age=110):
+        self.sex_codes = tuple(str(code) for code in sex_codes)
+        self.max_age = max_age
+        self.area_index = {}
+        self.rejected = 0
+        self._counts = np.zeros((0, 2, max_age + 1), dtype=np.int64)
+        self._first_digits = np.zeros((0, len(GROUPS), 9), dtype=np.int64)
+
+    @property
+    def ages(self):
+        return np.arange(self.max_age + 1)
+
+    @property
+    def areas(self):
+        return list(self.area_index)
+
+    @property
+    def counts(self):
+        return self._counts[:len(self.area_index)]
+
+    @property
+    def first_digits(self):
+        return self._first_digits[:len(self.area_index)]
+
+    def _area(self, area):
+        """Indice de la zone, avec agrandissement par doublement de la capacité (coût amorti O(1))."""
+        idx = self.area_index.get(area)
+        if idx is None:
+            idx = self.area_index[area] = len(self.area_index)
+            if idx >= len(self._counts):
+                capacity = max(2 * len(self._counts), 16)
+                for name in ("_counts", "_first_digits"):
+                    old = getattr(self, name)
+                    grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                    grown[:len(old)] = old
+                    setattr(self, name, grown)
+        return idx
+
+    def _increment(self, idx, group, before, step):
+        """Déplace une cellule de l'effectif before à before + step dans les premiers chiffres."""
+        if before > 0:
+            self._first_digits[idx, group, _first_digit(before) - 1] -= 1
+        self._first_digits[idx, group, _first_digit(before + step) - 1] += 1
+
+    def update(self, record, weight=1):
+        """Ajoute un enregistrement (zone, sexe, âge), en O(1). Retourne False s'il est rejeté.
+
+        weight doit être un entier strictement positif : un poids nul ou négatif
+        désynchroniserait les effectifs et les premiers chiffres (ValueError).
+        """
+        if isinstance(weight, bool) or not weight > 0 or int(weight) != weight:
+            raise ValueError(f"Poids invalide : {weight!r} (entier strictement positif attendu).")
+        weight = int(weight)
+        area, sex, age = record
+        sex = str(sex).strip()
+        try:
+            age = int(np.floor(float(age)))
+        except (TypeError, ValueError):
+            age = -1
+        if area is None or sex not in self.sex_codes or not 0 <= age <= self.max_age:
+            self.rejected += weight
+            return False
+
+        idx = self._area(area)
+        sex_idx = self.sex_codes.index(sex)
+        cell = int(self._counts[idx, sex_idx, age])
+        other = int(self._counts[idx, 1 - sex_idx, age])
+        self._increment(idx, sex_idx, cell, weight)
+        self._increment(idx, 2, cell + other, weight)
+        self._counts[idx, sex_idx, age] = cell + weight
+        return True
+
+    def merge(self, other):
+        """Ajoute l'état d'un autre accumulateur (autre flux, autre processus) à celui-ci.
+
+        Le coût dépend du nombre de zones de other, pas du nombre d'enregistrements :
+        les premiers chiffres des zones fusionnées sont recalculés sur leurs effectifs.
+        """
+        if other.sex_codes != self.sex_codes or other.max_age != self.max_age:
+            raise ValueError("Accumulateurs incompatibles (codes de sexe ou âge maximal différents).")
+        rows = np.array([self._area(area) for area in other.area_index], dtype=np.int64)
+        self.rejected += other.rejected
+        if rows.size:
+            self._counts[rows] += other.counts
+            counts = self._counts[rows]
+            groups = np.concatenate([counts, counts.sum(axis=1, keepdims=True)], axis=1)
+            self._first_digits[rows] = first_digit_counts(groups)
+        return self
+
+    def indices(self, age_min_whipple=23, age_max_whipple=62):
+        """Whipple, Myers, Bachi et indice ONU, tableaux de forme (zones × 3) dans l'ordre de GROUPS."""
+        return indices_from_age_index(AgeIndex(self.ages, self.counts), age_min_whipple, age_max_whipple,
+                                      with_total=True)
+
+    def benford(self):
+        """Test de Benford sur les effectifs par âge (Hommes, Femmes et Total réunis) de chaque zone.
+
+        Retourne observed_counts (zones × 9), chi2, p_value et mad (zones), comme
+        les colonnes benford_* de score_areas.
+        """
+        from scipy import stats  # import différé : scipy ralentit le démarrage des processus
+
+        observed_counts = self.first_digits.sum(axis=1)
+        chi2, mad = benford_statistics(observed_counts)
+        return {
+            "observed_counts": observed_counts,
+            "chi2": chi2,
+            "p_value": stats.chi2.sf(chi2, 8),
+            "mad": mad,
+        }
+
+    def histograms(self):
+        """État courant au format de read_microdata_histograms (utilisable par score_areas)."""
+        return {
+            "ages": self.ages,
+            "areas": self.areas,
+            "counts": self.counts.copy(),
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,81 @@
+"""Chronométrage par étape (calcul, construction des figures, rendu).
+
+StageTimer mesure des blocs imbriqués : chaque étape connaît son parent et sa
+durée propre (hors sous-étapes), ce qui sépare par exemple le temps de
+construction d'une figure de celui de sa sérialisation. Désactivé, il ne
+mesure rien. Avec log_path, chaque étape terminée est ajoutée en JSON Lines
+au fichier, pour une analyse ultérieure.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+
+class StageTimer:
+    """Durées des étapes d'une exécution ; context est recopié dans chaque ligne du journal."""
+
+    def __init__(self, enabled=True, log_path=None, context=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.context = context or {}
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name, kind="calcul"):
+        """Chronomètre le bloc ; kind vaut "calcul", "figure" ou "rendu"."""
+        if not self.enabled:
+            yield
+            return
+        parent = self._stack[-1] if self._stack else None
+        frame = {"name": name, "children": 0.0}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            if parent is not None:
+                parent["children"] += seconds
+            self.record(name, kind, seconds, seconds - frame["children"],
+                        parent=parent["name"] if parent else None)
+
+    def timed(self, name, kind="figure"):
+        """Décorateur : chaque appel de la fonction est une étape."""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name, kind):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, kind, seconds, self_seconds=None, parent=None):
+        """Enregistre une durée mesurée ailleurs (ou par stage) et l'ajoute au journal."""
+        if not self.enabled:
+            return
+        entry = {
+            "name": name,
+            "kind": kind,
+            "parent": parent,
+            "seconds": seconds,
+            "self_seconds": seconds if self_seconds is None else self_seconds,
+        }
+        self.records.append(entry)
+        if self.log_path:
+            line = {"time": datetime.now(timezone.utc).isoformat(timespec="milliseconds")}
+            line.update(self.context)
+            line.update(entry)
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def totals_by_kind(self):
+        """Somme des durées propres par type d'étape : aucune durée n'est comptée deux fois."""
+        totals = {}
+        for entry in self.records:
+            totals[entry["kind"]] = totals.get(entry["kind"], 0.0) + entry["self_seconds"]
+        return totals
@@ -0,0 +1,65 @@
+"""Regroupement des effectifs par tranches d'âges pour les pyramides.
+
+Les tranches sont définies par des bornes quelconques (1, 5 ou 10 ans,
+découpage personnalisé) avec, au besoin, un dernier groupe ouvert (80+, 100+).
+Les sommes sont calculées par np.add.reduceat le long du dernier axe : une
+table (2 × âges) et une matrice (zones × 2 × âges) se traitent de la même façon.
+"""
+
+import numpy as np
+
+
+def regular_edges(width=5, max_age=100):
+    """Bornes 0, width, 2·width, ... jusqu'à max_age (inclus s'il tombe sur une borne)."""
+    return np.arange(0, max_age + width, width)
+
+
+def parse_edges(text):
+    """Bornes saisies sous la forme "0, 1, 5, 15, 65" ; ValueError si elles ne sont pas croissantes."""
+    edges = np.array([int(value) for value in text.replace(";", ",").split(",") if value.strip()])
+    if len(edges) < 2 or np.any(np.diff(edges) <= 0):
+        raise ValueError("Les bornes doivent être au moins deux entiers strictement croissants.")
+    return edges
+
+
+def bin_labels(edges, open_ended=False):
+    """Libellés "0-4", "5-9", ... et, pour un dernier groupe ouvert, "80+"."""
+    edges = [int(edge) for edge in edges]
+    labels = [f"{start}-{end - 1}" if end - start > 1 else f"{start}" for start, end in zip(edges[:-1], edges[1:])]
+    if open_ended:
+        labels.append(f"{edges[-1]}+")
+    return labels
+
+
+def bin_ages(ages, populations, edges, open_ended=False):
+    """Effectifs par tranche [edges[i], edges[i+1]) le long du dernier axe de populations.
+
+    Avec open_ended, un dernier groupe réunit tous les âges ≥ edges[-1]. Les
+    âges inférieurs à edges[0] sont exclus. Forme du résultat :
+    populations.shape[:-1] + (nombre de tranches,).
+    """
+    ages = np.asarray(ages)
+    populations = np.asarray(populations)
+    edges = np.asarray(edges, dtype=float)
+    if open_ended:
+        edges = np.append(edges, np.inf)
+
+    order = np.argsort(ages, kind="stable")
+    if np.any(order != np.arange(len(order))):
+        ages, populations = ages[order], populations[..., order]
+
+    # Première colonne de chaque tranche ; une colonne nulle en fin de tableau
+    # rend valide l'indice len(ages) d'une tranche vide ou de la borne finale
+    starts = np.searchsorted(ages, edges, side="left")
+    padded = np.concatenate([populations, np.zeros(populations.shape[:-1] + (1,), populations.dtype)], axis=-1)
+    sums = np.add.reduceat(padded, starts, axis=-1)[..., :-1]
+    # reduceat renvoie la valeur de la colonne de départ pour une tranche vide
+    sums[..., starts[:-1] == starts[1:]] = 0
+    return sums
+
+
+def bin_shares(binned):
+    """Parts (%) de chaque tranche dans le total de sa ligne ; lignes vides laissées à 0."""
+    totals = binned.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, binned / totals * 100, 0.0)
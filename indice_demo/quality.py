@@ -0,0 +1,77 @@
+"""Évaluation qualitative des indices."""
+
+
+def evaluate_quality(value, method, seuil_bon):
+    """Évalue la qualité selon la méthode."""
+    if method == "whipple":
+        if value < seuil_bon:
+            return "Excellent", "#10B981"  # Vert
+        elif value < 110:
+            return "Bon", "#3B82F6"  # Bleu
+        elif value < 125:
+            return "Acceptable", "#F59E0B"  # Orange
+        elif value < 175:
+            return "Médiocre", "#EF4444"  # Rouge
+        else:
+            return "Très médiocre", "#7F1D1D"  # Rouge foncé
+    elif method == "un_index":
+        if value < 1.5:
+            return "Très haute qualité", "#10B981"
+        elif value < 2.5:
+            return "Bonne qualité", "#3B82F6"
+        elif value < 5.0:
+            return "Qualité acceptable", "#F59E0B"
+        else:
+            return "Mauvaise qualité", "#EF4444"
+    elif method == "un_age_sex":
+        # Seuils des Nations Unies pour l'indice d'exactitude âge-sexe
+        if value < 20:
+            return "Exact", "#10B981"
+        elif value <= 40:
+            return "Inexact", "#F59E0B"
+        else:
+            return "Très inexact", "#EF4444"
+    else:  # myers ou bachi
+        if value < seuil_bon:
+            return "Excellent", "#10B981"
+        elif value < 2 * seuil_bon:
+            return "Bon", "#3B82F6"
+        elif value < 3 * seuil_bon:
+            return "Acceptable", "#F59E0B"
+        else:
+            return "Mauvais", "#EF4444"
+
+
+def quality_score(p_value_benford, whipple, myers, bachi, seuil_benford=0.05,
+                  seuil_whipple_bon=105, seuil_myers_bon=2.0, seuil_bachi_bon=3.0):
+    """Score global de qualité : composantes (Benford, Whipple, Myers, Bachi) sur 7 points."""
+    score_components = []
+
+    # Benford
+    score_components.append(1 if p_value_benford >= seuil_benford else 0)
+
+    # Whipple
+    if whipple < seuil_whipple_bon:
+        score_components.append(2)
+    elif whipple < 110:
+        score_components.append(1)
+    else:
+        score_components.append(0)
+
+    # Myers
+    if myers < seuil_myers_bon:
+        score_components.append(2)
+    elif myers < 2 * seuil_myers_bon:
+        score_components.append(1)
+    else:
+        score_components.append(0)
+
+    # Bachi
+    if bachi < seuil_bachi_bon:
+        score_components.append(2)
+    elif bachi < 2 * seuil_bachi_bon:
+        score_components.append(1)
+    else:
+        score_components.append(0)
+
+    return score_components
@@ -0,0 +1,217 @@
+"""Rapport Excel multi-zones écrit en flux (xlsxwriter, mode constant_memory).
+
+Les zones sont consommées une à une depuis un itérable de (nom, AnalysisResults) :
+chaque zone ajoute une ligne à la feuille Synthèse et un bloc (données, indices,
+chiffres terminaux) à la feuille Zones. En mode constant_memory, xlsxwriter
+écrit chaque ligne terminée sur disque : la mémoire ne dépend pas du nombre de
+zones. Quand une feuille Zones est pleine, la suivante prend le relais.
+
+Un rapport d'une seule zone garde la présentation de l'export d'origine : une
+feuille par table (Synthèse verticale, Données, Indices, Tests, Chiffres
+terminaux, Formules).
+"""
+
+import itertools
+from io import BytesIO
+
+import numpy as np
+
+from .analysis import GROUPS, analyze
+from .quality import quality_score
+
+# Nombre maximal de lignes d'une feuille Excel
+MAX_SHEET_ROWS = 1_048_576
+
+SUMMARY_HEADER = [
+    "Zone", "Population", "Hommes", "Femmes", "Pourcentage hommes", "Rapport H/F global",
+    "Whipple_H", "Whipple_F", "Whipple_T", "Myers_H", "Myers_F", "Myers_T",
+    "Bachi_H", "Bachi_F", "Bachi_T", "Indice_ONU_H", "Indice_ONU_F", "Indice_ONU_T",
+    "Chi2 Benford", "p-value Benford", "p_value_MA_H", "p_value_MA_F", "p_value_MA_T",
+    "Score qualité (/7)", "Rapports_age_H_ONU", "Rapports_age_F_ONU", "Rapports_masculinite_ONU",
+    "Indice_exactitude_ONU",
+]
+DATA_HEADER = ["Age", "Hommes", "Femmes", "Total", "Rapport_HF", "MA_Hommes", "MA_Femmes", "MA_Total"]
+INDICES_HEADER = ["Groupe", "Whipple", "Myers", "Bachi", "Indice_ONU", "Statistique_MA", "p_value_MA",
+                  "Significatif"]
+TESTS_HEADER = ["Test", "Statistique", "p_value", "Significatif"]
+DIGITS_HEADER = ["Chiffre", "Hommes_Nombre", "Femmes_Nombre", "Total_Nombre", "Hommes_%", "Femmes_%",
+                 "Total_%"]
+
+FORMULAS = [
+    ("Loi de Benford", "P(d) = log₁₀(1 + 1/d)"),
+    ("Indice Whipple", "W = (P(0,5)/P) × 100"),
+    ("Indice Myers", "M = [Σ|(Sᵢ+Sᵢ₊₁)-N/5|]/(2N)×100"),
+    ("Indice Bachi", "B = √[Σ((pᵢ-10)/10)²] × 100"),
+    ("Indice ONU", "U = (Wₙ+Mₙ+Bₙ)/3 × 100"),
+    ("Moyenne Mobile", "MA(t) = (xₜ₋₁+xₜ)/2"),
+    ("Test Wilcoxon", "W = min(Σrᵢ⁺, Σrᵢ⁻)"),
+    ("Indice d'exactitude âge-sexe ONU", "I = ARS_H + ARS_F + 3 × SRS (groupes quinquennaux)"),
+]
+
+
+def _cells(values):
+    """Valeurs écrivables par xlsxwriter : scalaires NumPy convertis, NaN et inf laissés vides."""
+    cells = []
+    for value in values:
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            value = None
+        cells.append(value)
+    return cells
+
+
+def iter_area_results(names, ages, counts, age_min_whipple=23, age_max_whipple=62, alpha_ma=0.05):
+    """Analyse les zones à la demande : counts est de forme (zones × 2 × âges)."""
+    for name, (homme, femme) in zip(names, counts):
+        yield name, analyze(ages, homme, femme, age_min_whipple, age_max_whipple, alpha_ma)
+
+
+class _ZoneSheets:
+    """Feuilles Zones successives ; un bloc n'est jamais coupé entre deux feuilles."""
+
+    def __init__(self, workbook, bold):
+        self.workbook = workbook
+        self.bold = bold
+        self.sheet = None
+        self.row = MAX_SHEET_ROWS
+        self.count = 0
+
+    def reserve(self, n_rows):
+        if self.row + n_rows > MAX_SHEET_ROWS:
+            self.count += 1
+            name = "Zones" if self.count == 1 else f"Zones ({self.count})"
+            self.sheet = self.workbook.add_worksheet(name)
+            self.row = 0
+
+    def write(self, values, header=False):
+        self.sheet.write_row(self.row, 0, _cells(values), self.bold if header else None)
+        self.row += 1
+
+    def skip(self, n_rows=1):
+        self.row += n_rows
+
+
+def _write_table(workbook, bold, name, header, rows):
+    sheet = workbook.add_worksheet(name)
+    sheet.write_row(0, 0, header, bold)
+    for row, values in enumerate(rows, start=1):
+        sheet.write_row(row, 0, _cells(values))
+
+
+def _total_score(results, seuils):
+    indices = results.indices
+    return sum(quality_score(results.benford["p_value"], indices["whipple"][2], indices["myers"][2],
+                             indices["bachi"][2], **seuils))
+
+
+def _write_single_area(workbook, bold, results, seuils):
+    """Feuilles de l'export d'une zone : une table par feuille, Synthèse à la verticale."""
+    indices = results.indices
+    un_accuracy = results.un_accuracy["index"]
+    summary = [
+        ("Population totale", results.total_pop), ("Hommes", results.homme.sum()),
+        ("Femmes", results.femme.sum()),
+        ("Pourcentage hommes", f"{results.pourcentage_h:.1f}%"),
+        ("Pourcentage femmes", f"{results.pourcentage_f:.1f}%"),
+        ("Rapport H/F global", f"{results.rapport_global:.1f}"),
+        ("Indice Whipple", f"{indices['whipple'][2]:.1f}"), ("Indice Myers", f"{indices['myers'][2]:.1f}"),
+        ("Indice Bachi", f"{indices['bachi'][2]:.1f}"), ("Indice ONU", f"{indices['un_index'][2]:.2f}"),
+        ("p-value Benford", f"{results.benford['p_value']:.4f}"),
+        ("Score qualité", f"{_total_score(results, seuils)}/7"),
+        ("Indice d'exactitude âge-sexe ONU", f"{un_accuracy:.1f}"),
+    ]
+    _write_table(workbook, bold, "Synthèse", ["Indicateur", "Valeur"], summary)
+    _write_table(workbook, bold, "Données", DATA_HEADER, np.column_stack(
+        [results.ages, results.homme, results.femme, results.total, results.sex_ratio,
+         *results.moving_averages]))
+    _write_table(workbook, bold, "Indices", INDICES_HEADER[:5], [
+        [groupe] + [indices[key][i] for key in ("whipple", "myers", "bachi", "un_index")]
+        for i, groupe in enumerate(GROUPS)])
+    _write_table(workbook, bold, "Tests", TESTS_HEADER, [
+        [groupe, test.get("statistic", np.nan), test.get("p_value", np.nan),
+         bool(test.get("significant", False))]
+        for groupe, test in zip(GROUPS, results.ma_tests)])
+    digit_counts, digit_percent = results.digit_counts, results.digit_percent
+    _write_table(workbook, bold, "Chiffres terminaux", DIGITS_HEADER, [
+        [digit, *digit_counts[:, digit], *digit_percent[:, digit]] for digit in range(10)])
+    _write_table(workbook, bold, "Formules", ["Concept", "Formule"], FORMULAS)
+
+
+def write_excel_report(target, areas, **seuils):
+    """Écrit le rapport de qualité des zones dans target (chemin ou fichier binaire).
+
+    areas est un itérable de (nom, AnalysisResults), par exemple iter_area_results ;
+    il n'est parcouru qu'une fois. Les seuils (seuil_benford, seuil_whipple_bon, ...)
+    sont transmis à quality_score. Une seule zone donne les feuilles de l'export
+    d'origine, plusieurs zones les feuilles Synthèse et Zones. Retourne le nombre
+    de zones écrites.
+    """
+    import xlsxwriter  # import différé : seul l'export en a besoin
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    bold = workbook.add_format({"bold": True})
+
+    # Deux premières zones lues d'avance pour choisir la présentation
+    areas = iter(areas)
+    first = list(itertools.islice(areas, 2))
+    if len(first) == 1:
+        _write_single_area(workbook, bold, first[0][1], seuils)
+        workbook.close()
+        return 1
+
+    summary = workbook.add_worksheet("Synthèse")
+    summary.write_row(0, 0, SUMMARY_HEADER, bold)
+    formulas = workbook.add_worksheet("Formules")
+    formulas.write_row(0, 0, ["Concept", "Formule"], bold)
+    for row, formula in enumerate(FORMULAS, start=1):
+        formulas.write_row(row, 0, formula)
+
+    zones = _ZoneSheets(workbook, bold)
+    n_areas = 0
+    for n_areas, (name, results) in enumerate(itertools.chain(first, areas), start=1):
+        indices = results.indices
+        benford = results.benford
+        p_values = [test.get("p_value", np.nan) for test in results.ma_tests]
+        score = _total_score(results, seuils)
+        summary.write_row(n_areas, 0, _cells(
+            [name, results.total_pop, results.homme.sum(), results.femme.sum(),
+             results.pourcentage_h, results.rapport_global]
+            + [value for key in ("whipple", "myers", "bachi", "un_index") for value in indices[key]]
+            + [benford["chi2"], benford["p_value"]] + p_values + [score]
+            + [results.un_accuracy[key] for key in ("age_ratio_score_h", "age_ratio_score_f",
+                                                    "sex_ratio_score", "index")]
+        ))
+
+        n_ages = len(results.ages)
+        zones.reserve(1 + (1 + n_ages) + 1 + (1 + len(GROUPS)) + 1 + (1 + 10) + 2)
+        zones.write([f"Zone : {name}"], header=True)
+        zones.write(DATA_HEADER, header=True)
+        columns = np.column_stack([results.ages, results.homme, results.femme, results.total,
+                                   results.sex_ratio, *results.moving_averages])
+        for values in columns:
+            zones.write(values)
+
+        zones.skip()
+        zones.write(INDICES_HEADER, header=True)
+        for i, (groupe, test) in enumerate(zip(GROUPS, results.ma_tests)):
+            zones.write([groupe, indices["whipple"][i], indices["myers"][i], indices["bachi"][i],
+                         indices["un_index"][i], test.get("statistic", np.nan),
+                         test.get("p_value", np.nan), bool(test.get("significant", False))])
+
+        zones.skip()
+        zones.write(DIGITS_HEADER, header=True)
+        digit_counts, digit_percent = results.digit_counts, results.digit_percent
+        for digit in range(10):
+            zones.write([digit, *digit_counts[:, digit], *digit_percent[:, digit]])
+        zones.skip(2)
+
+    workbook.close()
+    return n_areas
+
+
+def excel_report_bytes(areas, **seuils):
+    """Rapport Excel en mémoire (octets), pour un téléchargement ou une mise en cache."""
+    output = BytesIO()
+    write_excel_report(output, areas, **seuils)
+    return output.getvalue()
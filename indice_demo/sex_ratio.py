@@ -0,0 +1,92 @@
+"""Rapport de masculinité par âge : intervalles de confiance, lissage et anomalies.
+
+Toutes les fonctions opèrent sur le dernier axe de tableaux (..., âges) : une
+matrice (zones × âges) d'hommes et une de femmes sont traitées en une seule
+opération, sans boucle sur les zones ni sur les âges.
+"""
+
+import numpy as np
+
+from .smoothing import moving_average
+
+SEX_RATIO_METHODS = ("wilson", "log")
+
+
+def calculate_sex_ratio(homme, femme):
+    """Rapport de masculinité (hommes pour 100 femmes) par âge, NaN si aucune femme."""
+    homme = np.asarray(homme, dtype=float)
+    femme = np.asarray(femme, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(femme > 0, homme / femme * 100, np.nan)
+
+
+def sex_ratio_intervals(homme, femme, level=0.95, method="wilson"):
+    """Intervalle de confiance du rapport de masculinité à chaque âge, bornes (low, high).
+
+    "wilson" : intervalle de Wilson de la proportion d'hommes p = H / (H + F),
+    transformé en rapport p / (1 - p) × 100 (la transformation est croissante).
+    "log" : log(H / F) ± z·√(1/H + 1/F), défini seulement si H > 0 et F > 0.
+    Les bornes valent NaN là où le rapport n'est pas défini (aucune femme).
+    """
+    from scipy import special  # import différé : scipy ralentit le démarrage des processus
+
+    homme = np.asarray(homme, dtype=float)
+    femme = np.asarray(femme, dtype=float)
+    z = special.ndtri(0.5 + level / 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == "wilson":
+            n = homme + femme
+            p = homme / n
+            center = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+            half = z / (1 + z ** 2 / n) * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2))
+            p_low, p_high = center - half, center + half
+            low, high = p_low / (1 - p_low) * 100, p_high / (1 - p_high) * 100
+            defined = femme > 0
+        elif method == "log":
+            log_ratio = np.log(homme / femme)
+            half = z * np.sqrt(1 / homme + 1 / femme)
+            low, high = np.exp(log_ratio - half) * 100, np.exp(log_ratio + half) * 100
+            defined = (homme > 0) & (femme > 0)
+        else:
+            raise ValueError(f"Méthode d'intervalle inconnue : {method}")
+
+    return np.where(defined, low, np.nan), np.where(defined, high, np.nan)
+
+
+def smoothed_sex_ratio(homme, femme, window=5):
+    """Rapport des effectifs lissés (moyenne mobile centrée de window âges) des deux sexes.
+
+    Lisser les effectifs plutôt que les rapports évite qu'un âge peu peuplé,
+    au rapport très instable, ne pèse autant que ses voisins.
+    """
+    homme = np.asarray(homme, dtype=float)
+    femme = np.asarray(femme, dtype=float)
+    if window <= 1:
+        return calculate_sex_ratio(homme, femme)
+    return calculate_sex_ratio(moving_average(homme, window, centered=True),
+                               moving_average(femme, window, centered=True))
+
+
+def sex_ratio_analysis(homme, femme, window=5, level=0.95, method="wilson"):
+    """Rapports, intervalles, rapports lissés et anomalies, tableaux de forme (..., âges).
+
+    Un âge est signalé comme anomalie quand son intervalle de confiance exclut
+    le rapport lissé de ses voisins : l'écart au profil local dépasse alors
+    les fluctuations d'échantillonnage (erreurs de déclaration du sexe ou de
+    l'âge, omissions différentielles). Retourne un dictionnaire avec "ratio",
+    "low", "high", "smoothed", "anomaly" et "n_anomalies" (forme (...)).
+    """
+    ratio = calculate_sex_ratio(homme, femme)
+    low, high = sex_ratio_intervals(homme, femme, level, method)
+    smoothed = smoothed_sex_ratio(homme, femme, window)
+    # Les comparaisons avec NaN sont fausses : pas d'anomalie là où rien n'est défini
+    anomaly = (smoothed < low) | (smoothed > high)
+    return {
+        "ratio": ratio,
+        "low": low,
+        "high": high,
+        "smoothed": smoothed,
+        "anomaly": anomaly,
+        "n_anomalies": anomaly.sum(axis=-1),
+    }
@@ -0,0 +1,262 @@
+"""Lissage des effectifs par âge et test de différence avec les données brutes.
+
+Toutes les fonctions opèrent sur le dernier axe de tableaux (..., âges) ou
+(..., groupes quinquennaux) : une matrice zones × âges est lissée en une seule
+opération sur fenêtres glissantes, sans boucle sur les zones ni sur les âges.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .age_index import AgeIndex
+
+
+def _moving_average_2(data):
+    """MA(2) sans fenêtres glissantes : (x[a-1] + x[a]) / 2, première valeur conservée.
+
+    Centrée ou non, la fenêtre de deux termes est la même ; le résultat est celui
+    du calcul général (poids renormalisés au bord).
+    """
+    smoothed = np.empty_like(data)
+    if data.shape[-1] == 0:
+        return smoothed
+    smoothed[..., 0] = data[..., 0]
+    np.add(data[..., :-1], data[..., 1:], out=smoothed[..., 1:])
+    smoothed[..., 1:] /= 2
+    return smoothed
+
+
+def moving_average(data, k=2, weights=None, centered=False):
+    """Moyenne mobile (éventuellement pondérée) de k termes le long du dernier axe.
+
+    Sans centrage, la valeur à l'âge x porte sur les âges x-k+1..x ; centrée,
+    sur la fenêtre de k âges autour de x. Aux bords, les poids sont renormalisés
+    sur les seuls termes disponibles : pour k = 2, la première valeur est
+    conservée, comme dans moving_average_2.
+    """
+    data = np.asarray(data, dtype=float)
+    if weights is None and k == 2:
+        return _moving_average_2(data)
+    weights = np.ones(k) if weights is None else np.asarray(weights, dtype=float)
+    k = len(weights)
+    weights = weights / weights.sum()
+
+    before = k // 2 if centered else k - 1
+    pad = [(0, 0)] * (data.ndim - 1) + [(before, k - 1 - before)]
+    windows = sliding_window_view(np.pad(data, pad), k, axis=-1)
+    available = sliding_window_view(np.pad(np.ones(data.shape[-1]), pad[-1]), k)
+    return (windows * weights).sum(axis=-1) / (available * weights).sum(axis=-1)
+
+
+def age_groups(ages, populations, width=5):
+    """Effectifs par groupes d'âges [0, width), [width, 2·width), ... (dernier groupe incomplet exclu)."""
+    age_index = AgeIndex(ages, populations)
+    n_groups = (int(np.max(ages)) + 1) // width
+    return age_index.bin_sums(np.arange(n_groups + 1) * width)
+
+
+def _split_decades(groups, method):
+    """Redistribue chaque décennie entre ses deux groupes quinquennaux (Carrier-Farrag, KKN, Arriaga).
+
+    Les totaux décennaux sont conservés. Les décennies sans voisins des deux
+    côtés ne sont lissées que par Arriaga (formules des extrémités).
+    """
+    smoothed = groups.copy()
+    n_decades = groups.shape[-1] // 2
+    if n_decades < 3:
+        return smoothed
+    tens = groups[..., :2 * n_decades].reshape(groups.shape[:-1] + (n_decades, 2)).sum(axis=-1)
+    young = smoothed[..., 0:2 * n_decades:2]
+    old = smoothed[..., 1:2 * n_decades:2]
+
+    # Décennies intermédiaires : A (précédente), B (courante), C (suivante)
+    A, B, C = tens[..., :-2], tens[..., 1:-1], tens[..., 2:]
+    if method == "carrier_farrag":
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where((A > 0) & (C > 0), A / C, 1.0)
+        old[..., 1:-1] = B / (1 + ratio ** 0.25)
+        young[..., 1:-1] = B - old[..., 1:-1]
+    elif method == "karup_king":
+        young[..., 1:-1] = B / 2 + (A - C) / 16
+        old[..., 1:-1] = B - young[..., 1:-1]
+    elif method == "arriaga":
+        old[..., 1:-1] = (-A + 11 * B + 2 * C) / 24
+        young[..., 1:-1] = B - old[..., 1:-1]
+        # Première et dernière décennies
+        old[..., 0] = (8 * tens[..., 0] + 5 * tens[..., 1] - tens[..., 2]) / 24
+        young[..., 0] = tens[..., 0] - old[..., 0]
+        young[..., -1] = (-tens[..., -3] + 5 * tens[..., -2] + 8 * tens[..., -1]) / 24
+        old[..., -1] = tens[..., -1] - young[..., -1]
+    return smoothed
+
+
+def _united_nations(groups):
+    """Formule des Nations Unies : (-A'' + 4A + 10B + 4C - C'') / 16 ; deux groupes inchangés à chaque bout."""
+    smoothed = groups.copy()
+    if groups.shape[-1] >= 5:
+        kernel = np.array([-1, 4, 10, 4, -1]) / 16
+        smoothed[..., 2:-2] = (sliding_window_view(groups, 5, axis=-1) * kernel).sum(axis=-1)
+    return smoothed
+
+
+DEMOGRAPHIC_SMOOTHERS = ("carrier_farrag", "karup_king", "arriaga", "united_nations")
+
+
+def smooth_age_groups(groups, method="arriaga"):
+    """Lissage démographique classique d'effectifs quinquennaux (..., groupes), voir age_groups.
+
+    method : "carrier_farrag", "karup_king" (Karup-King-Newton), "arriaga" ou
+    "united_nations". Les trois premières redistribuent chaque décennie entre
+    ses deux moitiés (totaux décennaux conservés) ; la formule des Nations Unies
+    est une convolution sur cinq groupes.
+    """
+    groups = np.asarray(groups, dtype=float)
+    if method == "united_nations":
+        return _united_nations(groups)
+    if method not in DEMOGRAPHIC_SMOOTHERS:
+        raise ValueError(f"Méthode de lissage inconnue : {method}")
+    return _split_decades(groups, method)
+
+
+def moving_average_2(data):
+    """Calcule la moyenne mobile à deux termes."""
+    if len(data) < 2:
+        return data
+    return _moving_average_2(np.asarray(data, dtype=float))
+
+
+# Comme scipy.stats.wilcoxon (method="auto") : loi exacte jusqu'à 50 paires sans
+# ex-aequo ni différence nulle, test de permutation jusqu'à 13 paires sinon.
+EXACT_MAX_N = 50
+PERMUTATION_MAX_N = 13
+
+
+@lru_cache(maxsize=None)
+def _wilcoxon_null_pmf(n):
+    """Loi exacte de la somme des rangs positifs pour n paires sous H0 (programmation dynamique)."""
+    pmf = np.ones(1)
+    for k in range(1, n + 1):
+        previous = pmf
+        pmf = np.zeros(k * (k + 1) // 2 + 1)
+        pmf[:len(previous)] = previous * 0.5
+        pmf[-len(previous):] += previous * 0.5
+    pmf.flags.writeable = False
+    return pmf
+
+
+def _wilcoxon_exact_p_value(r_plus, n):
+    """p-value bilatérale exacte ; la queue la plus courte est sommée, comme dans scipy."""
+    pmf = _wilcoxon_null_pmf(n)
+    mean = n * (n + 1) / 4
+
+    def cdf(k):
+        return pmf[:k + 1].sum() if k <= mean else 1 - pmf[k + 1:].sum()
+
+    def sf(k):
+        return pmf[k:].sum() if k <= mean else 1 - pmf[:k].sum()
+
+    p_value = 2 * min(sf(int(np.floor(r_plus))), cdf(int(np.ceil(r_plus))))
+    return min(max(p_value, 0.0), 1.0)
+
+
+def wilcoxon_batch(original, smoothed, alpha=0.05):
+    """Tests de Wilcoxon des rangs signés appariés, ligne à ligne, sur des tableaux (..., n).
+
+    Les paires contenant un NaN sont ignorées et les différences nulles
+    écartées (zero_method="wilcox"). Rangs moyens, statistique W et p-value
+    de l'approximation normale (avec correction des ex-aequo) sont calculés
+    pour toutes les lignes à la fois ; seules les petites lignes reçoivent une
+    p-value exacte (loi mise en cache par n) ou, avec ex-aequo, un test de
+    permutation. Hors lignes en erreur, les résultats sont ceux de
+    scipy.stats.wilcoxon.
+
+    Retourne un dictionnaire de tableaux de forme (...) : statistic, p_value,
+    significant, n, method et error (None, ou la raison de l'échec de la ligne).
+    """
+    from scipy import special, stats
+
+    d = np.asarray(original, dtype=float) - np.asarray(smoothed, dtype=float)
+    shape = d.shape[:-1]
+    d = d.reshape(-1, d.shape[-1])
+    n_rows, width = d.shape
+
+    valid = ~np.isnan(d)
+    nonzero = valid & (d != 0)
+    n_pairs = valid.sum(axis=-1)
+    count = nonzero.sum(axis=-1).astype(float)
+
+    # Rangs moyens de |d| : tri par ligne, puis bornes de chaque groupe d'ex-aequo
+    abs_d = np.where(nonzero, np.abs(d), np.inf)
+    order = np.argsort(abs_d, axis=-1, kind="stable")
+    sorted_d = np.take_along_axis(abs_d, order, axis=-1)
+    positions = np.broadcast_to(np.arange(width), d.shape)
+    first = np.ones(d.shape, dtype=bool)
+    first[:, 1:] = sorted_d[:, 1:] != sorted_d[:, :-1]
+    last = np.ones(d.shape, dtype=bool)
+    last[:, :-1] = first[:, 1:]
+    start = np.maximum.accumulate(np.where(first, positions, 0), axis=-1)
+    end = np.minimum.accumulate(np.where(last, positions, width - 1)[:, ::-1], axis=-1)[:, ::-1]
+    ranks = np.empty(d.shape)
+    np.put_along_axis(ranks, order, (start + end) / 2 + 1, axis=-1)
+
+    ties = (end - start + 1).astype(float)
+    in_sample = np.isfinite(sorted_d)
+    tie_correct = np.where(first & in_sample, ties ** 3 - ties, 0.0).sum(axis=-1)
+    has_ties = ((ties > 1) & in_sample).any(axis=-1)
+
+    r_plus = np.sum((d > 0) * ranks, axis=-1)
+    r_minus = np.sum((d < 0) * ranks, axis=-1)
+    statistic = np.minimum(r_plus, r_minus)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = count * (count + 1.) * 0.25
+        se = np.sqrt((count * (count + 1.) * (2. * count + 1.) - tie_correct / 2) / 24)
+        p_value = 2 * special.ndtr(-np.abs((r_plus - mean) / se))
+
+    method = np.full(n_rows, "asymptotic", dtype=object)
+    error = np.full(n_rows, None, dtype=object)
+    small = n_pairs <= EXACT_MAX_N
+    exact = small & ~has_ties & (count == n_pairs)
+    method[exact] = "exact"
+    permutation = small & ~exact & (n_pairs <= PERMUTATION_MAX_N)
+    method[permutation] = "permutation"
+
+    for row in np.flatnonzero(exact & (n_pairs >= 3)):
+        p_value[row] = _wilcoxon_exact_p_value(r_plus[row], int(count[row]))
+    for row in np.flatnonzero(permutation & (n_pairs >= 3) & (count > 0)):
+        try:
+            p_value[row] = stats.wilcoxon(d[row][valid[row]]).pvalue
+        except Exception as exception:
+            p_value[row] = np.nan
+            error[row] = f"test de permutation impossible : {exception}"
+
+    error[count == 0] = "toutes les différences sont nulles"
+    error[n_pairs < 3] = "moins de 3 paires valides"
+    failed = error != None  # noqa: E711 (comparaison élément par élément)
+    statistic[failed] = np.nan
+    p_value[failed] = np.nan
+
+    return {
+        "statistic": statistic.reshape(shape),
+        "p_value": p_value.reshape(shape),
+        "significant": (p_value < alpha).reshape(shape),
+        "n": n_pairs.reshape(shape),
+        "method": method.reshape(shape),
+        "error": error.reshape(shape),
+    }
+
+
+def test_moving_average_diff(original, smoothed, alpha=0.05):
+    """Test si la moyenne mobile diffère significativement des données brutes.
+
+    En cas d'échec, statistic et p_value valent NaN et "error" en donne la raison.
+    """
+    if len(original) != len(smoothed):
+        return {"statistic": np.nan, "p_value": np.nan, "significant": False,
+                "error": "séries de longueurs différentes"}
+
+    # Test de Wilcoxon pour données appariées (non paramétrique)
+    result = wilcoxon_batch(original, smoothed, alpha)
+    return {key: result[key][()] for key in ("statistic", "p_value", "significant", "error")}
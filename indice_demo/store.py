@@ -0,0 +1,153 @@
+"""Stockage en colonnes (Parquet ou Arrow IPC) des effectifs âge × sexe × zone × année.
+
+Une table longue (zone, annee, age, hommes, femmes), triée par zone puis par
+année : les statistiques min/max des groupes de lignes Parquet permettent de ne
+lire que les blocs contenant les zones et années demandées. Les fichiers Arrow
+IPC (.arrow, .feather) sont ouverts par projection mémoire et seuls les lots
+dont la plage de zones couvre une zone demandée sont filtrés.
+
+pyarrow est une dépendance optionnelle, importée seulement à l'usage.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+IPC_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+# Environ 600 zones de 111 âges par groupe de lignes Parquet
+ROW_GROUP_SIZE = 65_536
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Le stockage en colonnes nécessite pyarrow (pip install pyarrow)."
+        ) from error
+    return pyarrow
+
+
+def _store_format(path):
+    return "ipc" if Path(path).suffix.lower() in IPC_SUFFIXES else "parquet"
+
+
+def write_age_sex_store(path, areas, years, counts, ages=None, row_group_size=ROW_GROUP_SIZE):
+    """Écrit des effectifs (zones × années × 2 × âges) dans un fichier Parquet ou Arrow IPC.
+
+    Le format est déduit de l'extension (.arrow, .feather, .ipc → Arrow IPC,
+    sinon Parquet). ages vaut par défaut 0..n-1. Les zones sont triées pour que
+    chaque groupe de lignes couvre une plage de codes contiguë.
+    """
+    pa = _require_pyarrow()
+
+    counts = np.asarray(counts)
+    areas = np.asarray([str(area) for area in areas])
+    years = np.asarray(years, dtype=np.int16)
+    ages = np.arange(counts.shape[-1]) if ages is None else np.asarray(ages)
+    if counts.shape[:2] != (len(areas), len(years)) or counts.shape[2] != 2:
+        raise ValueError("counts doit être de forme (zones × années × 2 × âges).")
+
+    order = np.argsort(areas, kind="stable")
+    areas, counts = areas[order], counts[order]
+    n_areas, n_years, _, n_ages = counts.shape
+
+    table = pa.table({
+        "zone": np.repeat(areas, n_years * n_ages),
+        "annee": np.tile(np.repeat(years, n_ages), n_areas),
+        "age": np.tile(ages.astype(np.int16), n_areas * n_years),
+        "hommes": counts[:, :, 0].ravel(),
+        "femmes": counts[:, :, 1].ravel(),
+    })
+
+    if _store_format(path) == "ipc":
+        with pa.ipc.new_file(str(path), table.schema) as writer:
+            writer.write_table(table, max_chunksize=row_group_size)
+    else:
+        pa.parquet.write_table(table, str(path), row_group_size=row_group_size)
+
+
+def _read_ipc(path, areas, condition, columns=None):
+    """Lots Arrow IPC projetés en mémoire dont la plage [première, dernière zone] est utile."""
+    pa = _require_pyarrow()
+    reader = pa.ipc.open_file(pa.memory_map(str(path)))
+    batches = []
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if areas is not None and batch.num_rows:
+            zones = batch.column("zone")
+            first, last = zones[0].as_py(), zones[-1].as_py()
+            if not any(first <= area <= last for area in areas):
+                continue
+        batches.append(batch)
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    if condition is not None:
+        table = table.filter(condition)
+    return table.select(columns) if columns else table
+
+
+def _read_table(path, areas=None, condition=None, columns=None):
+    pa = _require_pyarrow()
+    if _store_format(path) == "ipc":
+        return _read_ipc(path, areas, condition, columns)
+    return pa.dataset.dataset(str(path), format="parquet").to_table(columns=columns, filter=condition)
+
+
+def store_index(path):
+    """Zones et années présentes dans le fichier (seules ces deux colonnes sont lues)."""
+    pa = _require_pyarrow()
+    table = _read_table(path, columns=["zone", "annee"])
+    return {
+        "areas": sorted(pa.compute.unique(table.column("zone")).to_pylist()),
+        "years": sorted(pa.compute.unique(table.column("annee")).to_pylist()),
+    }
+
+
+def read_age_sex_store(path, areas=None, years=None):
+    """Lit les effectifs des zones et années demandées (toutes par défaut).
+
+    Les filtres sont transmis au lecteur Arrow : sur un fichier Parquet, seuls
+    les groupes de lignes dont les statistiques peuvent contenir les zones ou
+    années demandées sont lus. Retourne un dictionnaire avec "ages", "areas",
+    "years" et "counts" de forme (zones × années × 2 × âges) ; les âges absents
+    d'une zone valent 0.
+    """
+    pa = _require_pyarrow()
+    ds = pa.dataset
+
+    condition = None
+    if areas is not None:
+        areas = [str(area) for area in areas]
+        condition = ds.field("zone").isin(areas)
+    if years is not None:
+        year_condition = ds.field("annee").isin([int(year) for year in years])
+        condition = year_condition if condition is None else condition & year_condition
+
+    table = _read_table(path, areas, condition)
+    # Zones factorisées par Arrow puis classées, plutôt que np.unique sur des objets Python
+    zones = pa.compute.dictionary_encode(table.column("zone")).combine_chunks()
+    area_names = np.array(zones.dictionary.to_pylist(), dtype=object)
+    order = np.argsort(area_names, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    area_idx = rank[zones.indices.to_numpy()]
+    area_names = area_names[order]
+
+    year_values, year_idx = np.unique(table.column("annee").to_numpy(), return_inverse=True)
+    age = table.column("age").to_numpy().astype(np.int64)
+    n_ages = age.max() + 1 if age.size else 0
+
+    hommes = table.column("hommes").to_numpy()
+    counts = np.zeros((len(area_names), len(year_values), 2, n_ages), dtype=hommes.dtype)
+    counts[area_idx, year_idx, 0, age] = hommes
+    counts[area_idx, year_idx, 1, age] = table.column("femmes").to_numpy()
+
+    return {
+        "ages": np.arange(n_ages),
+        "areas": area_names.tolist(),
+        "years": year_values.tolist(),
+        "counts": counts,
+    }
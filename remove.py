@@ -1,14 +1,30 @@
 # remove.py - Application complète d'analyse démographique
 # Installation : pip install streamlit numpy plotly scipy pandas xlsxwriter
 # Exécution : streamlit run remove.py
+# Les calculs sont dans le paquet indice_demo, importable sans Streamlit.
 
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from scipy import stats
 import pandas as pd
-from io import BytesIO
+import os
+import time
+import uuid
+
+from indice_demo import (
+    Age, Homme, Femme, AgeIndex, AnalysisResults, DIGIT_RANGES, age_groups, benford_law, benford_test,
+    bootstrap_indices, calculate_sex_ratio, content_hash, decimate_minmax, evaluate_quality, excel_report_bytes,
+    indices_from_digit_table, iter_area_results, moving_average_tests, quality_score,
+    read_age_sex_store, read_microdata_histograms, smooth_age_groups, StageTimer, store_index,
+    terminal_digit_table, whipple_sensitivity, bin_ages, bin_labels, bin_shares, parse_edges, regular_edges,
+    sex_ratio_analysis, un_age_sex_accuracy, nigrini_battery, conformity_labels, NIGRINI_MAD_BANDS,
+    NIGRINI_TESTS, first_two_law, point_budgets
+)
+
+# Chronométrage de l'exécution à partir d'ici : l'import des modules, payé une
+# seule fois par processus, fausserait le total comparé aux étapes
+debut_execution = time.perf_counter()
 
 # ==============================================
 # CONFIGURATION DE LA PAGE
@@ -191,178 +207,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ==============================================
-# DONNÉES DÉMOGRAPHIQUES
-# ==============================================
-
-Age = np.array([
-    0.00, 1.00, 2.00, 3.00, 4.00, 5.00, 6.00, 7.00, 8.00, 9.00,
-    10.00, 11.00, 12.00, 13.00, 14.00, 15.00, 16.00, 17.00, 18.00, 19.00,
-    20.00, 21.00, 22.00, 23.00, 24.00, 25.00, 26.00, 27.00, 28.00, 29.00,
-    30.00, 31.00, 32.00, 33.00, 34.00, 35.00, 36.00, 37.00, 38.00, 39.00,
-    40.00, 41.00, 42.00, 43.00, 44.00, 45.00, 46.00, 47.00, 48.00, 49.00,
-    50.00, 51.00, 52.00, 53.00, 54.00, 55.00, 56.00, 57.00, 58.00, 59.00,
-    60.00, 61.00, 62.00, 63.00, 64.00, 65.00, 66.00, 67.00, 68.00, 69.00,
-    70.00, 71.00, 72.00, 73.00, 74.00, 75.00, 76.00, 77.00, 78.00, 79.00,
-    80.00, 81.00, 82.00, 83.00, 84.00, 85.00, 86.00, 87.00, 88.00, 89.00,
-    90.00, 91.00, 92.00, 93.00, 94.00, 95.00, 96.00, 97.00, 98.00, 99.00,
-    100.00, 101.00, 102.00, 103.00, 107.00, 108.00, 109.00, 110.00
-])
-
-Homme = np.array([
-    2637, 2258, 2575, 2830, 2884, 2856, 2940, 3028, 3199, 2582,
-    3323, 2474, 3064, 2955, 2650, 3020, 2395, 2408, 2631, 2047,
-    2793, 1552, 2106, 1821, 1690, 2174, 1509, 1402, 1534, 1097,
-    2276, 923, 1455, 1208, 1129, 1691, 1135, 1119, 1129, 825,
-    1532, 717, 1073, 747, 662, 1131, 681, 674, 690, 520,
-    1066, 439, 626, 512, 473, 568, 431, 443, 410, 344,
-    709, 303, 475, 394, 300, 403, 281, 272, 242, 195,
-    445, 183, 254, 163, 135, 171, 100, 120, 98, 49,
-    151, 52, 85, 55, 40, 38, 33, 29, 19, 19,
-    34, 8, 18, 12, 9, 12, 10, 5, 3, 43,
-    6, 1, 1, 0, 1, 1, 1, 1
-])
-
-Femme = np.array([
-    2552, 2136, 2381, 2735, 2651, 2674, 2692, 2802, 2707, 2234,
-    2984, 2083, 2727, 2518, 2432, 2604, 2372, 2257, 2575, 2106,
-    2908, 1629, 2275, 1911, 1842, 2422, 1602, 1514, 1604, 1158,
-    2441, 965, 1372, 1316, 1090, 1863, 1181, 1125, 1042, 914,
-    1579, 653, 999, 734, 636, 1009, 618, 685, 681, 591,
-    1125, 535, 656, 533, 465, 641, 450, 434, 406, 323,
-    817, 376, 506, 370, 290, 423, 271, 252, 251, 212,
-    512, 205, 267, 149, 98, 189, 101, 129, 88, 65,
-    200, 73, 89, 56, 42, 59, 19, 25, 24, 27,
-    54, 11, 26, 10, 8, 10, 4, 5, 6, 23,
-    7, 0, 3, 2, 1, 0, 0, 1
-])
-
-Total = Homme + Femme
-
-# ==============================================
-# FONCTIONS D'ANALYSE
-# ==============================================
-
-def get_first_digit(number):
-    """Extrait le premier chiffre significatif."""
-    if np.isnan(number) or number == 0:
-        return None
-    num_str = str(abs(number))
-    num_str = num_str.lstrip('-0.')
-    return int(num_str[0]) if num_str else None
-
-def calculate_whipple(ages, populations, age_min=23, age_max=62):
-    """Calcule l'indice de Whipple."""
-    mask = (ages >= age_min) & (ages <= age_max)
-    age_subset = ages[mask]
-    pop_subset = populations[mask]
-    pop_0_5 = pop_subset[(age_subset % 10 == 0) | (age_subset % 10 == 5)].sum()
-    pop_total = pop_subset.sum()
-    return (pop_0_5 / pop_total) * 100 if pop_total > 0 else np.nan
-
-def calculate_myers(ages, populations):
-    """Calcule l'indice de Myers."""
-    mask = (ages >= 10) & (ages <= 89)
-    age_subset = ages[mask]
-    pop_subset = populations[mask]
-    sum_digit = np.zeros(10)
-    for i in range(10):
-        sum_digit[i] = pop_subset[age_subset % 10 == i].sum()
-    myers_index = 0
-    for i in range(10):
-        j = (i + 1) % 10
-        weight = sum_digit[i] + sum_digit[j]
-        myers_index += abs(weight - sum(sum_digit) / 10)
-    return myers_index / (2 * sum(sum_digit)) * 100
-
-def calculate_bachi(ages, populations):
-    """Calcule l'indice de Bachi."""
-    mask = (ages >= 20) & (ages <= 89)
-    age_subset = ages[mask]
-    pop_subset = populations[mask]
-    digit_counts = np.zeros(10)
-    for i in range(10):
-        digit_counts[i] = pop_subset[age_subset % 10 == i].sum()
-    digit_percent = (digit_counts / digit_counts.sum()) * 100
-    bachi_index = 0
-    for i in range(10):
-        deviation = (digit_percent[i] - 10) / 10
-        bachi_index += deviation ** 2
-    return np.sqrt(bachi_index) * 100
-
-def calculate_un_index(whipple, myers, bachi):
-    """Calcule l'indice combiné des Nations Unies."""
-    if np.isnan(whipple) or np.isnan(myers) or np.isnan(bachi):
-        return np.nan
-    # Normalisation des indices
-    whipple_norm = min(whipple / 100, 2.0)  # Limité à 2.0
-    myers_norm = min(myers / 100, 2.0)
-    bachi_norm = min(bachi / 100, 2.0)
-    return (whipple_norm + myers_norm + bachi_norm) / 3 * 100
-
-def moving_average_2(data):
-    """Calcule la moyenne mobile à deux termes."""
-    if len(data) < 2:
-        return data
-    ma = np.zeros(len(data))
-    ma[0] = data[0]
-    for i in range(1, len(data)):
-        ma[i] = (data[i-1] + data[i]) / 2
-    return ma
-
-def test_moving_average_diff(original, smoothed, alpha=0.05):
-    """Test si la moyenne mobile diffère significativement des données brutes."""
-    if len(original) != len(smoothed):
-        return {"statistic": np.nan, "p_value": np.nan, "significant": False}
-    
-    # Test de Wilcoxon pour données appariées (non paramétrique)
-    try:
-        # Supprimer les valeurs NaN
-        mask = ~np.isnan(original) & ~np.isnan(smoothed)
-        if np.sum(mask) < 3:
-            return {"statistic": np.nan, "p_value": np.nan, "significant": False}
-        
-        statistic, p_value = stats.wilcoxon(original[mask], smoothed[mask])
-        return {
-            "statistic": statistic,
-            "p_value": p_value,
-            "significant": p_value < alpha
-        }
-    except:
-        return {"statistic": np.nan, "p_value": np.nan, "significant": False}
-
-def evaluate_quality(value, method, seuil_bon):
-    """Évalue la qualité selon la méthode."""
-    if method == "whipple":
-        if value < seuil_bon:
-            return "Excellent", "#10B981"  # Vert
-        elif value < 110:
-            return "Bon", "#3B82F6"  # Bleu
-        elif value < 125:
-            return "Acceptable", "#F59E0B"  # Orange
-        elif value < 175:
-            return "Médiocre", "#EF4444"  # Rouge
-        else:
-            return "Très médiocre", "#7F1D1D"  # Rouge foncé
-    elif method == "un_index":
-        if value < 1.5:
-            return "Très haute qualité", "#10B981"
-        elif value < 2.5:
-            return "Bonne qualité", "#3B82F6"
-        elif value < 5.0:
-            return "Qualité acceptable", "#F59E0B"
-        else:
-            return "Mauvaise qualité", "#EF4444"
-    else:  # myers ou bachi
-        if value < seuil_bon:
-            return "Excellent", "#10B981"
-        elif value < 2 * seuil_bon:
-            return "Bon", "#3B82F6"
-        elif value < 3 * seuil_bon:
-            return "Acceptable", "#F59E0B"
-        else:
-            return "Mauvais", "#EF4444"
-
 # ==============================================
 # EN-TÊTE PRINCIPALE
 # ==============================================
@@ -386,16 +230,39 @@ st.markdown("---")
 # SIDEBAR - PARAMÈTRES AVANCÉS
 # ==============================================
 
+# Plages proposées pour l'indice de Whipple (curseurs et analyse de sensibilité)
+WHIPPLE_AGE_MINS = range(20, 31)
+WHIPPLE_AGE_MAXS = range(55, 71)
+
+# Journal JSON Lines des durées par étape (chronométrage activé dans la barre latérale)
+TIMING_LOG = os.environ.get("INDICE_DEMO_TIMING_LOG", "chronometrage.jsonl")
+
 with st.sidebar:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown('<div class="metric-title">🔧 PARAMÈTRES AVANCÉS</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
+    st.markdown("### 📂 Source des données")
+    
+    with st.expander("📥 Microdonnées de recensement", expanded=False):
+        microdata_file = st.file_uploader("Fichier d'enregistrements (CSV)", type=["csv", "gz"], key="microdata")
+        col_src1, col_src2 = st.columns(2)
+        with col_src1:
+            micro_age_col = st.text_input("Colonne âge", "age", key="micro_age")
+            micro_code_h = st.text_input("Code hommes", "1", key="micro_code_h")
+        with col_src2:
+            micro_sex_col = st.text_input("Colonne sexe", "sexe", key="micro_sex")
+            micro_code_f = st.text_input("Code femmes", "2", key="micro_code_f")
+        micro_area_col = st.text_input("Colonne zone (optionnelle)", "", key="micro_area")
+    
+    with st.expander("🗄️ Base en colonnes (Parquet / Arrow)", expanded=False):
+        store_path = st.text_input("Chemin du fichier (.parquet, .arrow)", "", key="store_path")
+    
     st.markdown("### 📏 Plages d'analyse")
     
     with st.expander("🔢 Indice de Whipple", expanded=True):
-        age_min_whipple = st.slider("Âge minimum", 20, 30, 23, key="whipple_min")
-        age_max_whipple = st.slider("Âge maximum", 55, 70, 62, key="whipple_max")
+        age_min_whipple = st.slider("Âge minimum", WHIPPLE_AGE_MINS[0], WHIPPLE_AGE_MINS[-1], 23, key="whipple_min")
+        age_max_whipple = st.slider("Âge maximum", WHIPPLE_AGE_MAXS[0], WHIPPLE_AGE_MAXS[-1], 62, key="whipple_max")
     
     st.markdown("### 🎯 Seuils de qualité")
     
@@ -422,6 +289,11 @@ with st.sidebar:
         show_grid = st.checkbox("Afficher la grille", True)
         show_legend = st.checkbox("Afficher la légende", True)
     
+    with st.expander("⏱️ Performances", expanded=False):
+        profilage = st.checkbox("Chronométrer les étapes", False, key="profilage",
+                                help=f"Durées par étape affichées ici et ajoutées au journal {TIMING_LOG}")
+        panneau_chrono = st.container()
+    
     st.markdown("---")
     
     st.markdown("""
@@ -440,17 +312,248 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+# ==============================================
+# CHRONOMÉTRAGE (OPTIONNEL)
+# ==============================================
+# Calculs, construction des figures et rendu (st.plotly_chart) sont mesurés
+# séparément. Un fragment relancé seul journalise ses étapes sous le numéro de la
+# dernière exécution complète ; le panneau latéral affiche l'exécution complète.
+
+if "session_chrono" not in st.session_state:
+    st.session_state["session_chrono"] = uuid.uuid4().hex[:8]
+st.session_state["execution_chrono"] = st.session_state.get("execution_chrono", 0) + 1
+chrono = StageTimer(
+    enabled=profilage,
+    log_path=TIMING_LOG if profilage else None,
+    context={"session": st.session_state["session_chrono"], "execution": st.session_state["execution_chrono"]},
+)
+
+# ==============================================
+# CHARGEMENT DES MICRODONNÉES
+# ==============================================
+
+@st.cache_data(show_spinner="Agrégation des microdonnées...")
+def load_microdata(file_id, _source, age_col, sex_col, area_col, code_h, code_f):
+    """Agrège un fichier de microdonnées ; le cache est indexé par l'identifiant du fichier."""
+    _source.seek(0)
+    return read_microdata_histograms(
+        _source, age_col=age_col, sex_col=sex_col, area_col=area_col or None,
+        sex_codes=(code_h, code_f)
+    )
+
+zone = "Ensemble"
+if microdata_file is not None:
+    with chrono.stage("Agrégation des microdonnées"):
+        microdata = load_microdata(
+            microdata_file.file_id, microdata_file, micro_age_col, micro_sex_col,
+            micro_area_col, micro_code_h, micro_code_f
+        )
+    if not microdata["areas"]:
+        st.error("Aucun enregistrement exploitable dans le fichier de microdonnées.")
+        st.stop()
+    if len(microdata["areas"]) > 1:
+        zone = st.sidebar.selectbox("Zone analysée", ["Toutes les zones"] + microdata["areas"], key="zone")
+        counts = (microdata["counts"].sum(axis=0) if zone == "Toutes les zones"
+                  else microdata["counts"][microdata["areas"].index(zone)])
+    else:
+        counts = microdata["counts"][0]
+    Age = microdata["ages"].astype(float)
+    Homme, Femme = counts[0], counts[1]
+    if microdata["rejected"]:
+        st.sidebar.caption(f"{microdata['rejected']:,} enregistrements rejetés (âge ou sexe invalide)")
+
+@st.cache_data(show_spinner=False)
+def load_store_index(path, mtime):
+    """Zones et années d'une base en colonnes ; mtime invalide le cache si le fichier change."""
+    return store_index(path)
+
+@st.cache_data(show_spinner=False)
+def load_store_area(path, mtime, zone, year):
+    """Effectifs d'une seule zone et année, lus par filtre transmis au lecteur Arrow."""
+    return read_age_sex_store(path, areas=[zone], years=[year])
+
+if store_path:
+    if not os.path.exists(store_path):
+        st.error(f"Fichier introuvable : {store_path}")
+        st.stop()
+    store_mtime = os.path.getmtime(store_path)
+    contents = load_store_index(store_path, store_mtime)
+    if not contents["areas"]:
+        st.error("La base en colonnes ne contient aucune zone.")
+        st.stop()
+    zone = st.sidebar.selectbox("Zone analysée", contents["areas"], key="store_zone")
+    annee = st.sidebar.selectbox("Année de recensement", contents["years"][::-1], key="store_year")
+    with chrono.stage("Lecture de la base en colonnes"):
+        stored = load_store_area(store_path, store_mtime, zone, annee)
+    # Les années proposées sont celles de toute la base : une zone peut en manquer
+    if not stored["areas"] or not stored["years"]:
+        st.error(f"La base ne contient aucun effectif pour la zone {zone} en {annee}.")
+        st.stop()
+    Age = stored["ages"].astype(float)
+    Homme, Femme = stored["counts"][0, 0]
+
+# ==============================================
+# CALCULS MIS EN CACHE
+# ==============================================
+# Chaque étape est mise en cache selon l'empreinte des données (data_key) et les
+# seuls paramètres dont elle dépend : les arguments préfixés par "_" ne sont pas
+# hachés par Streamlit. Un changement de thème ou d'affichage ne recalcule rien.
+
+@st.cache_resource(show_spinner=False)
+def cached_age_index(data_key, _ages, _groups):
+    # Objet partagé en lecture seule : pas de copie à chaque exécution
+    return AgeIndex(_ages, _groups)
+
+@st.cache_data(show_spinner=False)
+def cached_digit_table(data_key, _age_index, age_min, age_max):
+    # Chiffres terminaux des plages de Whipple, Myers, Bachi et de tous les âges ; Total = H + F
+    return terminal_digit_table(_age_index, age_min, age_max, with_total=True)
+
+BENFORD_SIMULATIONS = 10_000
+
+@st.cache_data(show_spinner=False)
+def cached_benford(data_key, _values):
+    return benford_test(_values, n_sim=BENFORD_SIMULATIONS)
+
+@st.cache_data(show_spinner=False)
+def cached_nigrini(data_key, _values):
+    return nigrini_battery(_values)
+
+# Libellés des tests de la batterie de Nigrini
+TESTS_NIGRINI = {
+    "first": "Premier chiffre",
+    "second": "Deuxième chiffre",
+    "first_two": "Deux premiers chiffres",
+    "last_two": "Deux derniers chiffres",
+}
+
+# Lissages proposés : libellé -> (k, poids, centré)
+LISSAGES = {
+    "MA(2)": (2, None, False),
+    "MA(3) centrée": (3, None, True),
+    "MA(5) centrée": (5, None, True),
+    "Pondérée 1-2-1": (3, (1, 2, 1), True),
+    "Pondérée 1-2-3-2-1": (5, (1, 2, 3, 2, 1), True),
+}
+
+@st.cache_data(show_spinner=False)
+def cached_moving_average_tests(data_key, _groups, alpha, k=2, weights=None, centered=False):
+    return moving_average_tests(_groups, alpha, k, weights, centered)
+
+@st.cache_data(show_spinner=False)
+def cached_sex_ratio(data_key, _homme, _femme):
+    return calculate_sex_ratio(_homme, _femme)
+
+@st.cache_data(show_spinner=False)
+def cached_un_accuracy(data_key, _ages, _homme, _femme):
+    return un_age_sex_accuracy(_ages, _homme, _femme)
+
+@st.cache_data(show_spinner=False)
+def cached_sex_ratio_analysis(data_key, _homme, _femme, window, method):
+    return sex_ratio_analysis(_homme, _femme, window, method=method)
+
+@st.cache_data(show_spinner=False)
+def cached_whipple_sensitivity(data_key, _age_index):
+    return whipple_sensitivity(_age_index, WHIPPLE_AGE_MINS, WHIPPLE_AGE_MAXS, with_total=True)
+
+@st.cache_data(show_spinner="Calcul des intervalles bootstrap...")
+def cached_bootstrap(data_key, _ages, _groups, age_min, age_max):
+    return bootstrap_indices(_ages, _groups, n_boot=1000, age_min=age_min, age_max=age_max, seed=0)
+
+@st.cache_data(show_spinner="Construction du rapport Excel...")
+def cached_excel_report(report_key, _areas, seuils):
+    """Rapport Excel indexé par report_key (empreinte des données et paramètres) et les seuils."""
+    return excel_report_bytes(_areas, **seuils)
+
+def analyze_cached(data_key, ages, groups, age_min_whipple, age_max_whipple, alpha_ma):
+    """Équivalent de indice_demo.analyze dont chaque étape passe par le cache."""
+    homme, femme = groups[0], groups[1]
+    with chrono.stage("Index cumulé par âge"):
+        age_index = cached_age_index(data_key, ages, groups[:2])
+    with chrono.stage("Indices Whipple, Myers, Bachi, ONU"):
+        digit_table = cached_digit_table(data_key, age_index, age_min_whipple, age_max_whipple)
+        indices = indices_from_digit_table(digit_table)
+    with chrono.stage("Test de Benford (Monte Carlo)"):
+        benford = cached_benford(data_key, groups.ravel())
+    with chrono.stage("Moyennes mobiles et tests de Wilcoxon"):
+        moving_averages, ma_tests = cached_moving_average_tests(data_key, groups, alpha_ma)
+    with chrono.stage("Rapports de masculinité"):
+        sex_ratio = cached_sex_ratio(data_key, homme, femme)
+    with chrono.stage("Indice d'exactitude âge-sexe (ONU)"):
+        un_accuracy = cached_un_accuracy(data_key, ages, homme, femme)
+    return AnalysisResults(
+        ages=ages,
+        homme=homme,
+        femme=femme,
+        indices=indices,
+        benford=benford,
+        moving_averages=moving_averages,
+        ma_tests=ma_tests,
+        digit_counts=digit_table[:, DIGIT_RANGES.index("all")],
+        sex_ratio=sex_ratio,
+        age_index=age_index,
+        un_accuracy=un_accuracy,
+    )
+
+# ==============================================
+# RENDU DES SÉRIES LONGUES
+# ==============================================
+# Chaque graphique dispose d'un budget de MAX_POINTS_PER_CHART points. Au-delà de
+# SCATTERGL_THRESHOLD points au total, ses courbes passent en WebGL (Scattergl) et
+# sont décimées côté serveur : le budget est partagé entre elles, et chaque tranche
+# de points consécutifs ne conserve que son minimum et son maximum, ce qui préserve
+# l'enveloppe visible tout en plafonnant la charge JSON du graphique.
+
+SCATTERGL_THRESHOLD = 1_000
+MAX_POINTS_PER_CHART = 10_000
+# Propriétés d'une trace alignées point à point sur x et y
+POINT_ARRAYS = ("text", "hovertext", "customdata")
+
+def fit_point_budget(fig, max_points=MAX_POINTS_PER_CHART):
+    """Figure dont les courbes totalisent au plus max_points points (Scattergl décimé)."""
+    courbes = [i for i, trace in enumerate(fig.data) if trace.type == "scatter" and trace.y is not None]
+    longueurs = [len(fig.data[i].y) for i in courbes]
+    if sum(longueurs) <= SCATTERGL_THRESHOLD:
+        return fig
+    traces = list(fig.data)
+    for i, budget in zip(courbes, point_budgets(longueurs, max_points)):
+        trace = traces[i].to_plotly_json()
+        trace.pop("type")
+        y = np.asarray(trace.pop("y"), dtype=float)
+        keep = decimate_minmax(y, budget)
+        x = trace.pop("x", None)
+        x = np.arange(len(y)) if x is None else np.asarray(x)
+        for key in POINT_ARRAYS:
+            if np.ndim(trace.get(key)) == 1 and len(trace[key]) == len(y):
+                trace[key] = np.asarray(trace[key])[keep]
+        trace["line"] = dict(trace.get("line", {}))
+        trace["line"].pop("shape", None)  # Scattergl ne trace pas de splines
+        traces[i] = go.Scattergl(x=x[keep], y=y[keep], **trace)
+    return go.Figure(data=traces, layout=fig.layout)
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart chronométré, dans le budget de points : la sérialisation est une étape de rendu."""
+    with chrono.stage("st.plotly_chart", "rendu"):
+        st.plotly_chart(fit_point_budget(fig), **kwargs)
+
 # ==============================================
 # SECTION 1: VUE D'ENSEMBLE
 # ==============================================
 
 st.markdown('<h2 class="section-header">👥 Vue d\'ensemble de la population</h2>', unsafe_allow_html=True)
 
+# Analyse complète (indices, tests, chiffres terminaux, rapports de masculinité)
+groupes_pop = np.stack([Homme, Femme, Homme + Femme])
+data_key = content_hash(Age, groupes_pop)
+with chrono.stage("Analyse"):
+    resultats = analyze_cached(data_key, Age, groupes_pop, age_min_whipple, age_max_whipple, seuil_test_ma)
+Total = resultats.total
+
 # Calcul des indicateurs de base
-total_pop = Total.sum()
-pourcentage_h = Homme.sum() / total_pop * 100
-pourcentage_f = Femme.sum() / total_pop * 100
-rapport_global = Homme.sum() / Femme.sum() * 100
+total_pop = resultats.total_pop
+pourcentage_h = resultats.pourcentage_h
+pourcentage_f = resultats.pourcentage_f
+rapport_global = resultats.rapport_global
 
 # Affichage des cartes métriques
 col1, col2, col3, col4 = st.columns(4)
@@ -489,40 +592,21 @@ st.markdown("---")
 # CALCULS PRINCIPAUX
 # ==============================================
 
-# Calcul des indices démographiques
-whipple_h = calculate_whipple(Age, Homme, age_min_whipple, age_max_whipple)
-whipple_f = calculate_whipple(Age, Femme, age_min_whipple, age_max_whipple)
-whipple_t = calculate_whipple(Age, Total, age_min_whipple, age_max_whipple)
-
-myers_h = calculate_myers(Age, Homme)
-myers_f = calculate_myers(Age, Femme)
-myers_t = calculate_myers(Age, Total)
-
-bachi_h = calculate_bachi(Age, Homme)
-bachi_f = calculate_bachi(Age, Femme)
-bachi_t = calculate_bachi(Age, Total)
+# Indices démographiques (Hommes, Femmes, Total)
+whipple_h, whipple_f, whipple_t = resultats.indices["whipple"]
+myers_h, myers_f, myers_t = resultats.indices["myers"]
+bachi_h, bachi_f, bachi_t = resultats.indices["bachi"]
 
 # Indice combiné des Nations Unies
-un_h = calculate_un_index(whipple_h, myers_h, bachi_h)
-un_f = calculate_un_index(whipple_f, myers_f, bachi_f)
-un_t = calculate_un_index(whipple_t, myers_t, bachi_t)
+un_h, un_f, un_t = resultats.indices["un_index"]
 
 # Loi de Benford
-first_digits = []
-for value in np.concatenate([Homme, Femme, Total]):
-    digit = get_first_digit(value)
-    if digit and 1 <= digit <= 9:
-        first_digits.append(digit)
-
-observed_counts = np.bincount(first_digits, minlength=10)[1:10]
-observed_freq = observed_counts / observed_counts.sum()
-benford_law = np.array([np.log10(1 + 1/d) for d in range(1, 10)])
-chi2_stat, p_value_benford = stats.chisquare(observed_counts, f_exp=benford_law * observed_counts.sum())
+observed_freq = resultats.benford["observed_freq"]
+chi2_stat = resultats.benford["chi2"]
+p_value_benford = resultats.benford["p_value"]
 
 # Rapport de masculinité
-rapport_masculinite = np.zeros_like(Homme, dtype=float)
-for i in range(len(Homme)):
-    rapport_masculinite[i] = (Homme[i] / Femme[i] * 100) if Femme[i] > 0 else np.nan
+rapport_masculinite = resultats.sex_ratio
 
 # ==============================================
 # SECTION 2: INDICATEURS DE QUALITÉ
@@ -621,6 +705,43 @@ with tab_indices[2]:
     with col_t4:
         st.metric("Indice ONU", f"{un_t:.2f}", delta=eval_un)
 
+# Indice conjoint des Nations Unies sur groupes quinquennaux (0-4 à 70-74)
+st.markdown("### 🇺🇳 Indice d'exactitude âge-sexe des Nations Unies")
+exactitude = resultats.un_accuracy
+eval_exactitude, _ = evaluate_quality(exactitude["index"], "un_age_sex", None)
+col_onu1, col_onu2, col_onu3, col_onu4 = st.columns(4)
+with col_onu1:
+    st.metric("Rapports d'âge (hommes)", f"{exactitude['age_ratio_score_h']:.1f}")
+with col_onu2:
+    st.metric("Rapports d'âge (femmes)", f"{exactitude['age_ratio_score_f']:.1f}")
+with col_onu3:
+    st.metric("Rapports de masculinité", f"{exactitude['sex_ratio_score']:.1f}")
+with col_onu4:
+    st.metric("Indice conjoint", f"{exactitude['index']:.1f}", delta=eval_exactitude,
+              delta_color="normal" if eval_exactitude == "Exact" else "inverse")
+st.caption("Indice = score des rapports d'âge des hommes + celui des femmes + 3 × score des rapports "
+           "de masculinité. Moins de 20 : exact ; de 20 à 40 : inexact ; plus de 40 : très inexact.")
+
+panel_bootstrap = st.expander("📏 Intervalles de confiance bootstrap (95 %)", expanded=False,
+                              key="panel_bootstrap", on_change="rerun")
+with panel_bootstrap:
+    # Le rééchantillonnage n'est lancé qu'à l'ouverture du panneau
+    if panel_bootstrap.open:
+        st.markdown("""
+        Intervalles obtenus par rééchantillonnage multinomial des effectifs par âge
+        (1 000 réplications) : ils permettent de juger si un écart entre deux
+        niveaux de qualité est significatif.
+        """)
+        with chrono.stage("Intervalles bootstrap"):
+            intervalles = cached_bootstrap(data_key, Age, groupes_pop, age_min_whipple, age_max_whipple)
+        st.dataframe(pd.DataFrame({
+            nom: [
+                f"{intervalles[cle]['estimate'][i]:.2f} [{intervalles[cle]['low'][i]:.2f} ; {intervalles[cle]['high'][i]:.2f}]"
+                for i in range(3)
+            ]
+            for cle, nom in [("whipple", "Whipple"), ("myers", "Myers"), ("bachi", "Bachi"), ("un_index", "Indice ONU")]
+        }, index=["Hommes", "Femmes", "Total"]))
+
 st.markdown("---")
 
 # ==============================================
@@ -629,7 +750,9 @@ st.markdown("---")
 
 st.markdown('<h2 class="section-header">📊 Visualisations Interactives</h2>', unsafe_allow_html=True)
 
-# Onglets principaux
+# Onglets principaux : seul l'onglet ouvert est exécuté (on_change="rerun") et chaque
+# onglet est un fragment, si bien que ses widgets (ex. regroupement de la pyramide)
+# ne relancent que lui, sans repasser par Benford ni par les tests de Wilcoxon.
 tab_main1, tab_main2, tab_main3, tab_main4, tab_main5, tab_main6 = st.tabs([
     "📈 Loi de Benford", 
     "📊 Indices Démographiques", 
@@ -637,10 +760,12 @@ tab_main1, tab_main2, tab_main3, tab_main4, tab_main5, tab_main6 = st.tabs([
     "📉 Moyenne Mobile & Tests",
     "🏛️ Pyramide des Âges",
     "📚 Annexes Mathématiques"
-])
+], key="onglet_principal", on_change="rerun")
 
 # Tab 1: Loi de Benford
-with tab_main1:
+@st.fragment
+@chrono.timed("Onglet Loi de Benford")
+def render_benford_tab():
     col_ben1, col_ben2 = st.columns([2, 1])
     
     with col_ben1:
@@ -689,7 +814,7 @@ with tab_main1:
             plot_bgcolor='white'
         )
         
-        st.plotly_chart(fig_benford, use_container_width=True)
+        plotly_chart(fig_benford, use_container_width=True)
     
     with col_ben2:
         st.markdown("### 📋 Résultats du test")
@@ -720,9 +845,71 @@ with tab_main1:
         st.metric("Statistique du χ²", f"{chi2_stat:.2f}")
         st.metric("Degrés de liberté", "8")
         st.metric("Seuil α", f"{seuil_benford}")
+        st.metric("p-value Monte Carlo (χ²)", f"{resultats.benford['p_value_mc']:.4f}")
+        st.metric("MAD", f"{resultats.benford['mad']:.4f}",
+                  delta=f"p = {resultats.benford['p_value_mad']:.4f}", delta_color="off")
+        st.caption(f"Distributions sous H₀ simulées par {BENFORD_SIMULATIONS:,} tirages multinomiaux "
+                   f"de même effectif ; MAD critique à 95 % : {resultats.benford['mad_critical']:.4f}.")
+    
+    # Batterie de Nigrini sur les mêmes effectifs que le test du premier chiffre
+    st.markdown("### 🔎 Batterie de tests de Nigrini")
+    with chrono.stage("Batterie de Nigrini"):
+        nigrini = cached_nigrini(data_key, groupes_pop.ravel())
+    tableau_nigrini = pd.DataFrame({
+        "Test": [TESTS_NIGRINI[test] for test in NIGRINI_TESTS],
+        "Valeurs": [int(nigrini[test]["n"]) for test in NIGRINI_TESTS],
+        "MAD": [round(float(nigrini[test]["mad"]), 4) for test in NIGRINI_TESTS],
+        "Conformité (Nigrini)": [
+            str(conformity_labels(nigrini[test]["conformity"])) if test in NIGRINI_MAD_BANDS else "—"
+            for test in NIGRINI_TESTS
+        ],
+        "χ²": [round(float(nigrini[test]["chi2"]), 2) for test in NIGRINI_TESTS],
+        "ddl": [len(nigrini[test]["proportions"]) - 1 for test in NIGRINI_TESTS],
+        "p-value": [round(float(nigrini[test]["p_value"]), 4) for test in NIGRINI_TESTS],
+    })
+    st.dataframe(tableau_nigrini, hide_index=True)
+    
+    fig_nigrini = go.Figure()
+    fig_nigrini.add_trace(go.Bar(
+        x=list(range(10, 100)),
+        y=nigrini["first_two"]["proportions"] * 100,
+        name='Observé',
+        marker_color='#3B82F6',
+        hovertemplate='Chiffres: %{x}<br>Observé: %{y:.2f}%<extra></extra>'
+    ))
+    fig_nigrini.add_trace(go.Scatter(
+        x=list(range(10, 100)),
+        y=first_two_law * 100,
+        mode='lines',
+        name='Théorique (Benford)',
+        line=dict(color='#EF4444', width=2),
+        hovertemplate='Chiffres: %{x}<br>Théorique: %{y:.2f}%<extra></extra>'
+    ))
+    fig_nigrini.update_layout(
+        title="Test des deux premiers chiffres (valeurs ≥ 10)",
+        height=400,
+        template=theme,
+        showlegend=show_legend,
+        xaxis=dict(title="Deux premiers chiffres", gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)'),
+        yaxis=dict(title="Proportion (%)", gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)'),
+        plot_bgcolor='white'
+    )
+    plotly_chart(fig_nigrini, use_container_width=True)
+    
+    somme = nigrini["summation"]
+    st.caption(f"Bandes de conformité du MAD selon Nigrini (2012), établies pour de grands échantillons. "
+               f"Test des sommes : MAD = {float(somme['mad']):.4f} (parts égales de 1/90 attendues), "
+               f"plus forte somme pour les chiffres {int(somme['peak'])}. "
+               "Les tests à deux chiffres ne retiennent que les valeurs ≥ 10.")
+
+with tab_main1:
+    if tab_main1.open:
+        render_benford_tab()
 
 # Tab 2: Indices démographiques
-with tab_main2:
+@st.fragment
+@chrono.timed("Onglet Indices démographiques")
+def render_indices_tab():
     # Préparation des données
     groupes = ['Hommes', 'Femmes', 'Total']
     indices = ['Whipple', 'Myers', 'Bachi', 'Indice ONU']
@@ -779,7 +966,7 @@ with tab_main2:
         showlegend=show_legend
     )
     
-    st.plotly_chart(fig_radar, use_container_width=True)
+    plotly_chart(fig_radar, use_container_width=True)
     
     # Graphique à barres groupées
     fig_bar_grouped = go.Figure()
@@ -823,10 +1010,60 @@ with tab_main2:
         plot_bgcolor='white'
     )
     
-    st.plotly_chart(fig_bar_grouped, use_container_width=True)
+    plotly_chart(fig_bar_grouped, use_container_width=True)
+    
+    # Sensibilité de l'indice de Whipple à la plage d'âges retenue
+    st.markdown("### 🔥 Sensibilité de l'indice de Whipple")
+    
+    groupe_sensibilite = st.radio("Groupe", groupes, index=2, horizontal=True, key="whipple_sens_groupe")
+    with chrono.stage("Sensibilité de l'indice de Whipple"):
+        sensibilite = cached_whipple_sensitivity(data_key, resultats.age_index)[groupes.index(groupe_sensibilite)]
+    
+    fig_sensibilite = go.Figure()
+    
+    fig_sensibilite.add_trace(go.Heatmap(
+        z=sensibilite,
+        x=list(WHIPPLE_AGE_MAXS),
+        y=list(WHIPPLE_AGE_MINS),
+        colorscale='RdYlGn_r',
+        colorbar=dict(title="Whipple"),
+        hovertemplate='Âge min: %{y}<br>Âge max: %{x}<br>Whipple: %{z:.1f}<extra></extra>'
+    ))
+    
+    # Plage sélectionnée dans la barre latérale
+    fig_sensibilite.add_trace(go.Scatter(
+        x=[age_max_whipple],
+        y=[age_min_whipple],
+        mode='markers',
+        marker=dict(symbol='x', size=14, color='black'),
+        name='Plage retenue',
+        hoverinfo='skip'
+    ))
+    
+    fig_sensibilite.update_layout(
+        title=f"Indice de Whipple selon la plage d'âges ({groupe_sensibilite})",
+        height=450,
+        template=theme,
+        showlegend=False,
+        xaxis=dict(title="Âge maximum", tickmode='linear'),
+        yaxis=dict(title="Âge minimum", tickmode='linear')
+    )
+    
+    plotly_chart(fig_sensibilite, use_container_width=True)
+    
+    st.caption(
+        f"Sur l'ensemble des plages, l'indice varie de {np.nanmin(sensibilite):.1f} "
+        f"à {np.nanmax(sensibilite):.1f}."
+    )
+
+with tab_main2:
+    if tab_main2.open:
+        render_indices_tab()
 
 # Tab 3: Rapport de masculinité
-with tab_main3:
+@st.fragment
+@chrono.timed("Onglet Rapport de masculinité")
+def render_sex_ratio_tab():
     st.markdown("### 👨‍👩‍👧‍👦 Rapport de masculinité par âge")
     
     # Contrôles interactifs
@@ -837,29 +1074,31 @@ with tab_main3:
     
     with col_control2:
         show_confidence = st.checkbox("Intervalle de confiance", True)
+        methode_ic = st.radio("Méthode", ["Wilson", "Log-rapport"], horizontal=True, key="methode_ic_rapport")
     
     with col_control3:
         log_scale = st.checkbox("Échelle logarithmique", False)
     
-    # Préparation des données
-    rapport_valide = rapport_masculinite[~np.isnan(rapport_masculinite)]
-    ages_valides = Age[~np.isnan(rapport_masculinite)]
-    
-    # Calcul du lissage
-    if window_size > 1:
-        rapport_lisse = np.convolve(rapport_valide, np.ones(window_size)/window_size, mode='valid')
-        ages_lisse = ages_valides[window_size//2:len(ages_valides)-window_size//2]
-    else:
-        rapport_lisse = rapport_valide
-        ages_lisse = ages_valides
-    
-    # Calcul de l'intervalle de confiance (95%)
-    if show_confidence and len(rapport_valide) > 1:
-        std_error = np.std(rapport_valide) / np.sqrt(len(rapport_valide))
-        conf_lower = rapport_valide - 1.96 * std_error
-        conf_upper = rapport_valide + 1.96 * std_error
+    # Rapports, intervalles à 95 % propres à chaque âge, rapport des effectifs lissés et anomalies
+    analyse_rapport = cached_sex_ratio_analysis(
+        data_key, Homme, Femme, window_size, "wilson" if methode_ic == "Wilson" else "log"
+    )
+    valides = ~np.isnan(rapport_masculinite)
+    rapport_valide = rapport_masculinite[valides]
+    ages_valides = Age[valides]
+    
+    rapport_lisse = analyse_rapport["smoothed"]
+    ages_lisse = Age
+    
+    # Bande de confiance limitée aux âges où l'intervalle est défini
+    if show_confidence:
+        bornes_definies = ~np.isnan(analyse_rapport["low"])
+        ages_ic = Age[bornes_definies]
+        conf_lower = analyse_rapport["low"][bornes_definies]
+        conf_upper = analyse_rapport["high"][bornes_definies]
     else:
         conf_lower = conf_upper = None
+    anomalies = analyse_rapport["anomaly"]
     
     # Création du graphique
     fig_rapport = go.Figure()
@@ -867,7 +1106,7 @@ with tab_main3:
     # Intervalle de confiance
     if show_confidence and conf_lower is not None and conf_upper is not None:
         fig_rapport.add_trace(go.Scatter(
-            x=np.concatenate([ages_valides, ages_valides[::-1]]),
+            x=np.concatenate([ages_ic, ages_ic[::-1]]),
             y=np.concatenate([conf_upper, conf_lower[::-1]]),
             fill='toself',
             fillcolor='rgba(59, 130, 246, 0.2)',
@@ -906,6 +1145,17 @@ with tab_main3:
         hovertemplate='Âge: %{x} ans<br>Rapport lissé: %{y:.1f} H/100F<extra></extra>'
     ))
     
+    # Âges dont l'intervalle de confiance exclut le rapport lissé
+    if anomalies.any():
+        fig_rapport.add_trace(go.Scatter(
+            x=Age[anomalies],
+            y=rapport_masculinite[anomalies],
+            mode='markers',
+            name='Anomalies',
+            marker=dict(color='#EF4444', size=9, symbol='x'),
+            hovertemplate='Âge: %{x} ans<br>Rapport anormal: %{y:.1f} H/100F<extra></extra>'
+        ))
+    
     # Lignes de référence
     fig_rapport.add_hline(
         y=100,
@@ -937,8 +1187,36 @@ with tab_main3:
         yaxis_type="log" if log_scale else "linear"
     )
     
-    st.plotly_chart(fig_rapport, use_container_width=True)
-    
+    plotly_chart(fig_rapport, use_container_width=True)
+
+    # Toutes les zones des microdonnées superposées : des milliers de points, que le
+    # budget du graphique (fit_point_budget) ramène à MAX_POINTS_PER_CHART
+    if microdata_file is not None and not store_path and len(microdata["areas"]) > 1:
+        st.markdown("### 🗺️ Rapport de masculinité par zone")
+        rapports_zones = calculate_sex_ratio(microdata["counts"][:, 0], microdata["counts"][:, 1])
+        fig_zones = go.Figure([
+            go.Scatter(x=microdata["ages"], y=rapport, mode='lines', name=nom, opacity=0.4,
+                       line=dict(color='#6B7280', width=1), showlegend=False,
+                       hovertemplate=f'{nom}<br>Âge: %{{x}} ans<br>Rapport: %{{y:.1f}} H/100F<extra></extra>')
+            for nom, rapport in zip(microdata["areas"], rapports_zones)
+        ])
+        fig_zones.add_trace(go.Scatter(
+            x=Age, y=rapport_masculinite, mode='lines', name=zone, line=dict(color='#8B5CF6', width=3),
+            hovertemplate='Âge: %{x} ans<br>Rapport: %{y:.1f} H/100F<extra></extra>'
+        ))
+        fig_zones.add_hline(y=100, line_dash="dash", line_color="#EF4444")
+        fig_zones.update_layout(
+            height=500,
+            template=theme,
+            xaxis_title="Âge (années)",
+            yaxis_title="Rapport de masculinité (hommes pour 100 femmes)",
+            plot_bgcolor='white',
+            yaxis_type="log" if log_scale else "linear"
+        )
+        plotly_chart(fig_zones, use_container_width=True)
+        st.caption(f"{len(microdata['areas'])} zones ; au-delà de {SCATTERGL_THRESHOLD:,} points, les courbes "
+                   f"sont tracées en WebGL et décimées à {MAX_POINTS_PER_CHART:,} points au total.")
+
     # Statistiques
     col_stats1, col_stats2, col_stats3, col_stats4, col_stats5 = st.columns(5)
     
@@ -952,18 +1230,26 @@ with tab_main3:
         st.metric("Maximum", f"{np.max(rapport_valide):.1f}")
     with col_stats5:
         st.metric("Écart-type", f"{np.std(rapport_valide):.1f}")
+    
+    st.caption(f"{int(analyse_rapport['n_anomalies'])} âge(s) dont l'intervalle de confiance à 95 % "
+               f"({methode_ic}) exclut le rapport des effectifs lissés sur {window_size} ans.")
+
+with tab_main3:
+    if tab_main3.open:
+        render_sex_ratio_tab()
 
 # Tab 4: Moyenne Mobile et Tests
-with tab_main4:
-    # Calcul des moyennes mobiles
-    ma_homme = moving_average_2(Homme)
-    ma_femme = moving_average_2(Femme)
-    ma_total = moving_average_2(Total)
-    
-    # Tests statistiques
-    test_homme = test_moving_average_diff(Homme, ma_homme, seuil_test_ma)
-    test_femme = test_moving_average_diff(Femme, ma_femme, seuil_test_ma)
-    test_total = test_moving_average_diff(Total, ma_total, seuil_test_ma)
+@st.fragment
+@chrono.timed("Onglet Moyenne mobile")
+def render_moving_average_tab():
+    # Moyennes mobiles et tests statistiques
+    methode_lissage = st.selectbox("Lissage comparé aux données brutes", list(LISSAGES), key="methode_lissage")
+    with chrono.stage("Moyennes mobiles et tests de Wilcoxon"):
+        moving_averages, ma_tests = cached_moving_average_tests(
+            data_key, groupes_pop, seuil_test_ma, *LISSAGES[methode_lissage]
+        )
+    ma_homme, ma_femme, ma_total = moving_averages
+    test_homme, test_femme, test_total = ma_tests
     
     st.markdown("### 📊 Tests statistiques des moyennes mobiles")
     
@@ -981,7 +1267,7 @@ with tab_main4:
                 **Statistique W:** {test_homme['statistic']:.2f}
                 
                 **Interprétation:** 
-                La moyenne mobile MA(2) diffère significativement 
+                Le lissage {methode_lissage} diffère significativement 
                 des données brutes pour les hommes.
                 """)
             else:
@@ -996,7 +1282,7 @@ with tab_main4:
                 brutes et la moyenne mobile pour les hommes.
                 """)
         else:
-            st.warning("Test non applicable - données insuffisantes")
+            st.warning(f"Test non applicable - {test_homme.get('error') or 'données insuffisantes'}")
     
     with col_test2:
         st.markdown("#### 👩 Femmes")
@@ -1009,7 +1295,7 @@ with tab_main4:
                 **Statistique W:** {test_femme['statistic']:.2f}
                 
                 **Interprétation:** 
-                La moyenne mobile MA(2) diffère significativement 
+                Le lissage {methode_lissage} diffère significativement 
                 des données brutes pour les femmes.
                 """)
             else:
@@ -1024,7 +1310,7 @@ with tab_main4:
                 brutes et la moyenne mobile pour les femmes.
                 """)
         else:
-            st.warning("Test non applicable - données insuffisantes")
+            st.warning(f"Test non applicable - {test_femme.get('error') or 'données insuffisantes'}")
     
     with col_test3:
         st.markdown("#### 👥 Total")
@@ -1037,7 +1323,7 @@ with tab_main4:
                 **Statistique W:** {test_total['statistic']:.2f}
                 
                 **Interprétation:** 
-                La moyenne mobile MA(2) diffère significativement 
+                Le lissage {methode_lissage} diffère significativement 
                 des données brutes pour la population totale.
                 """)
             else:
@@ -1052,7 +1338,7 @@ with tab_main4:
                 brutes et la moyenne mobile pour la population totale.
                 """)
         else:
-            st.warning("Test non applicable - données insuffisantes")
+            st.warning(f"Test non applicable - {test_total.get('error') or 'données insuffisantes'}")
     
     # Graphiques comparatifs
     fig_ma_comparison = make_subplots(
@@ -1067,7 +1353,7 @@ with tab_main4:
         row=1, col=1
     )
     fig_ma_comparison.add_trace(
-        go.Scatter(x=Age, y=ma_homme, mode='lines', name='MA(2)', line=dict(color='#10B981', width=2, dash='dash')),
+        go.Scatter(x=Age, y=ma_homme, mode='lines', name=methode_lissage, line=dict(color='#10B981', width=2, dash='dash')),
         row=1, col=1
     )
     
@@ -1077,7 +1363,7 @@ with tab_main4:
         row=2, col=1
     )
     fig_ma_comparison.add_trace(
-        go.Scatter(x=Age, y=ma_femme, mode='lines', name='MA(2)', line=dict(color='#10B981', width=2, dash='dash'), showlegend=False),
+        go.Scatter(x=Age, y=ma_femme, mode='lines', name=methode_lissage, line=dict(color='#10B981', width=2, dash='dash'), showlegend=False),
         row=2, col=1
     )
     
@@ -1087,12 +1373,12 @@ with tab_main4:
         row=3, col=1
     )
     fig_ma_comparison.add_trace(
-        go.Scatter(x=Age, y=ma_total, mode='lines', name='MA(2)', line=dict(color='#10B981', width=2, dash='dash'), showlegend=False),
+        go.Scatter(x=Age, y=ma_total, mode='lines', name=methode_lissage, line=dict(color='#10B981', width=2, dash='dash'), showlegend=False),
         row=3, col=1
     )
     
     fig_ma_comparison.update_layout(
-        title="Comparaison données brutes vs moyenne mobile à 2 termes",
+        title=f"Comparaison données brutes vs lissage {methode_lissage}",
         height=700,
         template=theme,
         showlegend=True,
@@ -1102,47 +1388,116 @@ with tab_main4:
     fig_ma_comparison.update_xaxes(title_text="Âge", row=3, col=1)
     fig_ma_comparison.update_yaxes(title_text="Population", row=2, col=1)
     
-    st.plotly_chart(fig_ma_comparison, use_container_width=True)
+    plotly_chart(fig_ma_comparison, use_container_width=True)
+    
+    # Lissages démographiques classiques des groupes quinquennaux
+    st.markdown("### 🧮 Lissage des groupes quinquennaux")
+    
+    methodes_demo = {
+        "Arriaga": "arriaga",
+        "Carrier-Farrag": "carrier_farrag",
+        "Karup-King-Newton": "karup_king",
+        "Nations Unies": "united_nations",
+    }
+    methode_demo = st.selectbox("Méthode", list(methodes_demo), key="methode_demo")
+    
+    with chrono.stage("Lissage quinquennal"):
+        groupes_quinquennaux = age_groups(Age, groupes_pop)
+        groupes_lisses = smooth_age_groups(groupes_quinquennaux, methodes_demo[methode_demo])
+    labels_quinquennaux = [f"{5 * i}-{5 * i + 4}" for i in range(groupes_quinquennaux.shape[-1])]
+    
+    fig_quinquennal = go.Figure()
+    fig_quinquennal.add_trace(go.Bar(
+        x=labels_quinquennaux, y=groupes_quinquennaux[2], name='Observé', marker_color='#8B5CF6'
+    ))
+    fig_quinquennal.add_trace(go.Scatter(
+        x=labels_quinquennaux, y=groupes_lisses[2], mode='lines+markers', name=methode_demo,
+        line=dict(color='#10B981', width=3)
+    ))
+    fig_quinquennal.update_layout(
+        title=f"Population totale par groupe quinquennal : observée vs lissée ({methode_demo})",
+        height=450,
+        template=theme,
+        showlegend=show_legend,
+        xaxis_title="Groupe d'âges",
+        yaxis_title="Population",
+        plot_bgcolor='white'
+    )
+    
+    plotly_chart(fig_quinquennal, use_container_width=True)
+
+with tab_main4:
+    if tab_main4.open:
+        render_moving_average_tab()
 
 # Tab 5: Pyramide des âges
-with tab_main5:
+PYRAMIDES_PAR_PAGE = 24
+
+def small_multiples_figure(names, effectifs, labels, n_cols=4):
+    """Grille de pyramides (une par zone) ; effectifs est de forme (zones × 2 × tranches)."""
+    n_rows = -(-len(names) // n_cols)
+    fig = make_subplots(rows=n_rows, cols=n_cols, subplot_titles=list(names), shared_yaxes=True,
+                        horizontal_spacing=0.02, vertical_spacing=min(0.08, 0.5 / n_rows))
+    traces, rows, cols = [], [], []
+    for i, (homme_zone, femme_zone) in enumerate(effectifs):
+        traces += [
+            go.Bar(y=labels, x=-homme_zone, orientation='h', name='Hommes', marker_color='#3B82F6',
+                   legendgroup='Hommes', showlegend=i == 0, customdata=homme_zone,
+                   hovertemplate='Hommes: %{customdata:,.1f}<extra></extra>'),
+            go.Bar(y=labels, x=femme_zone, orientation='h', name='Femmes', marker_color='#EF4444',
+                   legendgroup='Femmes', showlegend=i == 0,
+                   hovertemplate='Femmes: %{x:,.1f}<extra></extra>'),
+        ]
+        rows += [i // n_cols + 1] * 2
+        cols += [i % n_cols + 1] * 2
+    # Un seul ajout pour toutes les traces : bien plus rapide que add_trace zone par zone
+    fig.add_traces(traces, rows=rows, cols=cols)
+    fig.update_layout(barmode='overlay', bargap=0.05, height=220 * n_rows, template=theme,
+                      showlegend=show_legend, plot_bgcolor='white', margin=dict(t=40, b=20))
+    fig.update_xaxes(showticklabels=False)
+    fig.update_yaxes(tickfont=dict(size=8))
+    fig.update_annotations(font_size=11)
+    return fig
+
+@st.fragment
+@chrono.timed("Onglet Pyramide des âges")
+def render_pyramid_tab():
     st.markdown("### 🏛️ Pyramide des âges interactive")
     
     # Contrôles
     col_pyr_control1, col_pyr_control2, col_pyr_control3 = st.columns(3)
     
     with col_pyr_control1:
-        age_group = st.selectbox("Regroupement par", [1, 5, 10], index=1, key="age_group")
+        age_group = st.selectbox("Regroupement par", [1, 5, 10, "Personnalisé"], index=1, key="age_group")
     
     with col_pyr_control2:
-        max_age = st.slider("Âge maximum", 50, 110, 100, key="max_age")
+        if age_group == "Personnalisé":
+            bornes = st.text_input("Bornes des tranches (âges)", "0, 1, 5, 15, 25, 35, 45, 55, 65, 80",
+                                   key="bornes_pyramide")
+            try:
+                edges = parse_edges(bornes)
+            except ValueError as erreur:
+                st.error(str(erreur))
+                return
+        else:
+            max_age = st.slider("Âge maximum", 50, 110, 100, key="max_age")
+            edges = regular_edges(age_group, max_age)
     
     with col_pyr_control3:
         display_mode = st.radio("Mode d'affichage", ["Nombre", "Pourcentage"], key="display_mode")
     
-    # Préparation des données
-    bins = list(range(0, max_age + age_group, age_group))
-    labels = []
-    homme_counts = []
-    femme_counts = []
-    
-    for i in range(len(bins) - 1):
-        start = bins[i]
-        end = bins[i + 1]
-        mask = (Age >= start) & (Age < end)
-        
-        labels.append(f"{start}-{end-1}")
-        homme_counts.append(Homme[mask].sum())
-        femme_counts.append(Femme[mask].sum())
+    open_ended = st.checkbox(f"Dernier groupe ouvert ({edges[-1]}+)", False, key="groupe_ouvert")
     
-    # Conversion en pourcentage si nécessaire
+    # Préparation des données : une seule agrégation (reduceat) pour les deux sexes
+    labels = bin_labels(edges, open_ended)
+    effectifs = bin_ages(Age, np.stack([Homme, Femme]), edges, open_ended)
     if display_mode == "Pourcentage":
-        total_h = sum(homme_counts)
-        total_f = sum(femme_counts)
-        if total_h > 0:
-            homme_counts = [h/total_h*100 for h in homme_counts]
-        if total_f > 0:
-            femme_counts = [f/total_f*100 for f in femme_counts]
+        effectifs = bin_shares(effectifs)
+    homme_counts, femme_counts = effectifs
+    
+    # Graduations symétriques calculées une fois à partir de l'effectif maximal
+    extent = int(effectifs.max())
+    tickvals = np.arange(-extent, extent + 1, max(1, extent // 5))
     
     # Création de la pyramide
     fig_pyramid = go.Figure()
@@ -1150,7 +1505,7 @@ with tab_main5:
     # Hommes (gauche, valeurs négatives)
     fig_pyramid.add_trace(go.Bar(
         y=labels,
-        x=[-h for h in homme_counts],
+        x=-homme_counts,
         name='Hommes',
         orientation='h',
         marker_color='#3B82F6',
@@ -1175,7 +1530,8 @@ with tab_main5:
     
     # Configuration
     fig_pyramid.update_layout(
-        title=f"Pyramide des âges (regroupement: {age_group} ans)",
+        title=("Pyramide des âges (regroupement personnalisé)" if age_group == "Personnalisé"
+               else f"Pyramide des âges (regroupement: {age_group} ans)"),
         barmode='overlay',
         height=600,
         template=theme,
@@ -1183,22 +1539,38 @@ with tab_main5:
         xaxis=dict(
             title='Population' + (' (%)' if display_mode == "Pourcentage" else ''),
             tickmode='array',
-            tickvals=list(range(-int(max(max(homme_counts), max(femme_counts))), 
-                             int(max(max(homme_counts), max(femme_counts))) + 1,
-                             max(1, int(max(max(homme_counts), max(femme_counts))/5)))),
-            ticktext=[str(abs(x)) for x in list(range(-int(max(max(homme_counts), max(femme_counts))), 
-                                                     int(max(max(homme_counts), max(femme_counts))) + 1,
-                                                     max(1, int(max(max(homme_counts), max(femme_counts))/5))))]
+            tickvals=tickvals,
+            ticktext=[str(abs(x)) for x in tickvals]
         ),
         yaxis=dict(title='Tranche d\'âge'),
         hovermode='y unified',
         plot_bgcolor='white'
     )
     
-    st.plotly_chart(fig_pyramid, use_container_width=True)
+    plotly_chart(fig_pyramid, use_container_width=True)
+    
+    # Petits multiples : toutes les zones des microdonnées agrégées en une seule opération
+    if microdata_file is not None and not store_path and len(microdata["areas"]) > 1:
+        st.markdown("### 🗺️ Pyramides par zone")
+        zones_pyramide = microdata["areas"]
+        effectifs_zones = bin_ages(microdata["ages"], microdata["counts"], edges, open_ended)
+        if display_mode == "Pourcentage":
+            effectifs_zones = bin_shares(effectifs_zones)
+        n_pages = -(-len(zones_pyramide) // PYRAMIDES_PAR_PAGE)
+        page = st.number_input(f"Page (sur {n_pages}, {PYRAMIDES_PAR_PAGE} zones par page)", 1, n_pages, 1,
+                               key="page_pyramides") - 1
+        selection = slice(page * PYRAMIDES_PAR_PAGE, (page + 1) * PYRAMIDES_PAR_PAGE)
+        plotly_chart(small_multiples_figure(zones_pyramide[selection], effectifs_zones[selection], labels),
+                     use_container_width=True)
+
+with tab_main5:
+    if tab_main5.open:
+        render_pyramid_tab()
 
 # Tab 6: Annexes Mathématiques
-with tab_main6:
+@st.fragment
+@chrono.timed("Onglet Annexes")
+def render_annexes_tab():
     st.markdown('<h2 class="section-header">📚 Annexes Mathématiques</h2>', unsafe_allow_html=True)
     
     # Introduction
@@ -1608,6 +1980,10 @@ with tab_main6:
            - Applications modernes de la loi de Benford
         """)
 
+with tab_main6:
+    if tab_main6.open:
+        render_annexes_tab()
+
 # ==============================================
 # SECTION 4: ANALYSE AVANCÉE
 # ==============================================
@@ -1617,20 +1993,12 @@ st.markdown('<h2 class="section-header">🔍 Analyse Avancée</h2>', unsafe_allo
 
 col_adv1, col_adv2 = st.columns(2)
 
-with col_adv1:
-    st.markdown("### 🔢 Analyse des chiffres terminaux")
-    
-    # Calcul des distributions
-    digit_counts_h = np.zeros(10)
-    digit_counts_f = np.zeros(10)
-    for i in range(10):
-        digit_counts_h[i] = Homme[Age % 10 == i].sum()
-        digit_counts_f[i] = Femme[Age % 10 == i].sum()
-    
-    digit_percent_h = (digit_counts_h / digit_counts_h.sum()) * 100 if digit_counts_h.sum() > 0 else np.zeros(10)
-    digit_percent_f = (digit_counts_f / digit_counts_f.sum()) * 100 if digit_counts_f.sum() > 0 else np.zeros(10)
-    digit_percent_t = ((digit_counts_h + digit_counts_f) / 
-                       (digit_counts_h.sum() + digit_counts_f.sum())) * 100 if (digit_counts_h.sum() + digit_counts_f.sum()) > 0 else np.zeros(10)
+@st.fragment
+@chrono.timed("Panneau Chiffres terminaux")
+def render_terminal_digits_panel():
+    # Distributions des chiffres terminaux
+    digit_counts_h, digit_counts_f, _ = resultats.digit_counts
+    digit_percent_h, digit_percent_f, digit_percent_t = resultats.digit_percent
     
     # Graphique
     fig_digits = go.Figure()
@@ -1662,40 +2030,23 @@ with col_adv1:
         plot_bgcolor='white'
     )
     
-    st.plotly_chart(fig_digits, use_container_width=True)
+    plotly_chart(fig_digits, use_container_width=True)
 
-with col_adv2:
-    st.markdown("### 📊 Qualité globale des données")
-    
+with col_adv1:
+    panel_digits = st.expander("🔢 Analyse des chiffres terminaux", expanded=True,
+                               key="panel_chiffres", on_change="rerun")
+    with panel_digits:
+        if panel_digits.open:
+            render_terminal_digits_panel()
+
+@st.fragment
+@chrono.timed("Panneau Qualité globale")
+def render_quality_score_panel():
     # Score global
-    score_components = []
-    
-    # Benford
-    score_components.append(1 if p_value_benford >= seuil_benford else 0)
-    
-    # Whipple
-    if whipple_t < seuil_whipple_bon:
-        score_components.append(2)
-    elif whipple_t < 110:
-        score_components.append(1)
-    else:
-        score_components.append(0)
-    
-    # Myers
-    if myers_t < seuil_myers_bon:
-        score_components.append(2)
-    elif myers_t < 2 * seuil_myers_bon:
-        score_components.append(1)
-    else:
-        score_components.append(0)
-    
-    # Bachi
-    if bachi_t < seuil_bachi_bon:
-        score_components.append(2)
-    elif bachi_t < 2 * seuil_bachi_bon:
-        score_components.append(1)
-    else:
-        score_components.append(0)
+    score_components = quality_score(
+        p_value_benford, whipple_t, myers_t, bachi_t, seuil_benford,
+        seuil_whipple_bon, seuil_myers_bon, seuil_bachi_bon
+    )
     
     total_score = sum(score_components)
     max_score = 7
@@ -1727,7 +2078,7 @@ with col_adv2:
         height=400
     )
     
-    st.plotly_chart(fig_score_radar, use_container_width=True)
+    plotly_chart(fig_score_radar, use_container_width=True)
     
     # Évaluation
     if total_score >= 6:
@@ -1739,6 +2090,13 @@ with col_adv2:
     else:
         st.error(f"**Score: {total_score}/{max_score}** - Qualité INSUFFISANTE")
 
+with col_adv2:
+    panel_score = st.expander("📊 Qualité globale des données", expanded=True,
+                              key="panel_score", on_change="rerun")
+    with panel_score:
+        if panel_score.open:
+            render_quality_score_panel()
+
 # ==============================================
 # SECTION 5: EXPORT ET RAPPORT
 # ==============================================
@@ -1762,93 +2120,25 @@ with col_exp1:
         7. **Annexes mathématiques**
         """)
         
+        multi_zones = (microdata_file is not None and not store_path and len(microdata["areas"]) > 1
+                       and st.checkbox(f"Un bloc par zone ({len(microdata['areas'])} zones)", key="rapport_zones"))
+        
         if st.button("🚀 Générer le rapport Excel", type="primary"):
-            # Création du rapport
-            output = BytesIO()
-            
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Feuille 1: Synthèse
-                synthèse_df = pd.DataFrame({
-                    'Indicateur': [
-                        'Population totale', 'Hommes', 'Femmes',
-                        'Pourcentage hommes', 'Pourcentage femmes',
-                        'Rapport H/F global', 'Indice Whipple', 'Indice Myers',
-                        'Indice Bachi', 'Indice ONU', 'p-value Benford',
-                        'Score qualité'
-                    ],
-                    'Valeur': [
-                        total_pop, Homme.sum(), Femme.sum(),
-                        f"{pourcentage_h:.1f}%", f"{pourcentage_f:.1f}%",
-                        f"{rapport_global:.1f}", f"{whipple_t:.1f}",
-                        f"{myers_t:.1f}", f"{bachi_t:.1f}", f"{un_t:.2f}",
-                        f"{p_value_benford:.4f}", f"{total_score}/{max_score}"
-                    ]
-                })
-                synthèse_df.to_excel(writer, sheet_name='Synthèse', index=False)
-                
-                # Feuille 2: Données brutes
-                donnees_df = pd.DataFrame({
-                    'Age': Age,
-                    'Hommes': Homme,
-                    'Femmes': Femme,
-                    'Total': Total,
-                    'Rapport_HF': rapport_masculinite,
-                    'MA_Hommes': ma_homme,
-                    'MA_Femmes': ma_femme,
-                    'MA_Total': ma_total
-                })
-                donnees_df.to_excel(writer, sheet_name='Données', index=False)
-                
-                # Feuille 3: Indices
-                indices_df = pd.DataFrame({
-                    'Groupe': ['Hommes', 'Femmes', 'Total'],
-                    'Whipple': [whipple_h, whipple_f, whipple_t],
-                    'Myers': [myers_h, myers_f, myers_t],
-                    'Bachi': [bachi_h, bachi_f, bachi_t],
-                    'Indice_ONU': [un_h, un_f, un_t]
-                })
-                indices_df.to_excel(writer, sheet_name='Indices', index=False)
-                
-                # Feuille 4: Tests
-                tests_df = pd.DataFrame({
-                    'Test': ['Hommes', 'Femmes', 'Total'],
-                    'Statistique': [test_homme.get('statistic', np.nan), 
-                                   test_femme.get('statistic', np.nan), 
-                                   test_total.get('statistic', np.nan)],
-                    'p_value': [test_homme.get('p_value', np.nan), 
-                               test_femme.get('p_value', np.nan), 
-                               test_total.get('p_value', np.nan)],
-                    'Significatif': [test_homme.get('significant', False), 
-                                    test_femme.get('significant', False), 
-                                    test_total.get('significant', False)]
-                })
-                tests_df.to_excel(writer, sheet_name='Tests', index=False)
-                
-                # Feuille 5: Chiffres terminaux
-                chiffres_df = pd.DataFrame({
-                    'Chiffre': range(10),
-                    'Hommes_Nombre': digit_counts_h,
-                    'Femmes_Nombre': digit_counts_f,
-                    'Total_Nombre': digit_counts_h + digit_counts_f,
-                    'Hommes_%': digit_percent_h,
-                    'Femmes_%': digit_percent_f,
-                    'Total_%': digit_percent_t
-                })
-                chiffres_df.to_excel(writer, sheet_name='Chiffres terminaux', index=False)
-                
-                # Feuille 6: Formules
-                formules_df = pd.DataFrame({
-                    'Concept': ['Loi de Benford', 'Indice Whipple', 'Indice Myers', 
-                               'Indice Bachi', 'Indice ONU', 'Moyenne Mobile', 'Test Wilcoxon'],
-                    'Formule': ['P(d) = log₁₀(1 + 1/d)', 'W = (P(0,5)/P) × 100', 
-                               'M = [Σ|(Sᵢ+Sᵢ₊₁)-N/5|]/(2N)×100', 
-                               'B = √[Σ((pᵢ-10)/10)²] × 100',
-                               'U = (Wₙ+Mₙ+Bₙ)/3 × 100', 'MA(t) = (xₜ₋₁+xₜ)/2',
-                               'W = min(Σrᵢ⁺, Σrᵢ⁻)']
-                })
-                formules_df.to_excel(writer, sheet_name='Formules', index=False)
-            
-            output.seek(0)
+            seuils = {
+                "seuil_benford": seuil_benford, "seuil_whipple_bon": seuil_whipple_bon,
+                "seuil_myers_bon": seuil_myers_bon, "seuil_bachi_bon": seuil_bachi_bon,
+            }
+            parametres = (age_min_whipple, age_max_whipple, seuil_test_ma)
+            if multi_zones:
+                areas = iter_area_results(microdata["areas"], microdata["ages"], microdata["counts"],
+                                          *parametres)
+                report_key = (content_hash(microdata["counts"]),) + parametres
+            else:
+                areas = [(zone, resultats)]
+                report_key = (data_key, zone) + parametres
+            # Octets mis en cache : un second clic (ou un autre utilisateur) obtient le fichier immédiatement
+            with chrono.stage("Rapport Excel"):
+                output = cached_excel_report(report_key, areas, seuils)
             
             # Bouton de téléchargement
             st.download_button(
@@ -1936,4 +2226,30 @@ st.markdown("""
         </div>
     </div>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ==============================================
+# PANNEAU DE CHRONOMÉTRAGE
+# ==============================================
+
+if profilage:
+    duree_totale = time.perf_counter() - debut_execution
+    # Durée hors étapes mesurées : mise en page, widgets, cartes HTML
+    mesuree = sum(etape["seconds"] for etape in chrono.records if etape["parent"] is None)
+    chrono.record("Exécution complète", "autre", duree_totale, duree_totale - mesuree)
+    
+    with panneau_chrono:
+        totaux = chrono.totals_by_kind()
+        st.metric("Exécution complète", f"{duree_totale * 1000:.0f} ms")
+        st.caption(" • ".join(f"{libelle} : {totaux.get(cle, 0.0) * 1000:.0f} ms" for cle, libelle in
+                              [("calcul", "Calculs"), ("figure", "Figures"), ("rendu", "Rendu"),
+                               ("autre", "Mise en page")]))
+        etapes = sorted(chrono.records[:-1], key=lambda etape: etape["seconds"], reverse=True)
+        st.dataframe(pd.DataFrame({
+            "Étape": [etape["name"] if etape["parent"] is None else f"{etape['parent']} › {etape['name']}"
+                      for etape in etapes],
+            "Type": [etape["kind"] for etape in etapes],
+            "Durée (ms)": [round(etape["seconds"] * 1000, 1) for etape in etapes],
+            "Propre (ms)": [round(etape["self_seconds"] * 1000, 1) for etape in etapes],
+        }), hide_index=True)
+        st.caption(f"Exécution n° {st.session_state['execution_chrono']}, journalisée dans {TIMING_LOG}.")
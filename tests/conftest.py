@@ -0,0 +1,6 @@
+"""Le paquet indice_demo est importé depuis la racine du dépôt, sans installation."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
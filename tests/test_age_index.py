@@ -0,0 +1,44 @@
+"""AgeIndex (sommes cumulées), comparé aux boucles à masques d'origine."""
+
+import numpy as np
+import pytest
+
+from indice_demo.age_index import AgeIndex
+
+
+def _masked_digit_sums(ages, populations, age_min, age_max):
+    mask = (ages >= age_min) & (ages <= age_max)
+    return np.array([populations[mask & (ages % 10 == digit)].sum() for digit in range(10)])
+
+
+@pytest.fixture
+def populations():
+    rng = np.random.default_rng(1)
+    ages = np.arange(101)
+    profile = np.exp(-ages / 35.0) * (1 + 0.6 * (ages % 10 == 0))
+    return rng.poisson(rng.lognormal(8, 1, (20, 1)) * profile / profile.sum()).astype(float)
+
+
+def test_range_and_digit_sums_match_masks(populations):
+    ages = np.arange(populations.shape[-1])
+    index = AgeIndex(ages, populations)
+    for age_min, age_max in [(0, 100), (23, 62), (10, 89), (37, 37), (95, 130), (-5, 4)]:
+        mask = (ages >= age_min) & (ages <= age_max)
+        np.testing.assert_allclose(index.range_sum(age_min, age_max), populations[:, mask].sum(axis=-1))
+        expected = np.array([_masked_digit_sums(ages, row, age_min, age_max) for row in populations])
+        np.testing.assert_allclose(index.digit_sums(age_min, age_max), expected)
+
+
+def test_digit_sums_accept_array_bounds(populations):
+    ages = np.arange(populations.shape[-1])
+    sums = AgeIndex(ages, populations).digit_sums(np.array([20, 25])[:, None], np.array([55, 60, 70])[None, :])
+    assert sums.shape == (20, 2, 3, 10)
+    np.testing.assert_allclose(sums[3, 1, 2], _masked_digit_sums(ages, populations[3], 25, 70))
+
+
+def test_bin_sums_match_masks(populations):
+    ages = np.arange(populations.shape[-1])
+    edges = np.arange(0, 105, 5)
+    expected = np.stack([populations[:, (ages >= lo) & (ages < hi)].sum(axis=-1)
+                         for lo, hi in zip(edges[:-1], edges[1:])], axis=-1)
+    np.testing.assert_allclose(AgeIndex(ages, populations).bin_sums(edges), expected)
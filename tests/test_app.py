@@ -0,0 +1,54 @@
+"""Exécution de l'application Streamlit : données fournies onglet par onglet, base en colonnes."""
+
+from pathlib import Path
+
+import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from indice_demo.store import write_age_sex_store
+
+APP = str(Path(__file__).resolve().parents[1] / "remove.py")
+TABS = [
+    "📈 Loi de Benford",
+    "📊 Indices Démographiques",
+    "👨‍👩‍👧‍👦 Rapport de Masculinité",
+    "📉 Moyenne Mobile & Tests",
+    "🏛️ Pyramide des Âges",
+    "📚 Annexes Mathématiques",
+]
+
+
+def _run(**state):
+    app = AppTest.from_file(APP, default_timeout=120)
+    for key, value in state.items():
+        app.session_state[key] = value
+    return app.run()
+
+
+@pytest.mark.parametrize("tab", TABS)
+def test_every_tab_renders(tab):
+    # Seul l'onglet ouvert est exécuté : chacun doit être ouvert à son tour
+    app = _run(onglet_principal=tab)
+    assert not app.exception, [e.value for e in app.exception]
+    assert set(TABS) <= {t.label for t in app.tabs}
+    assert app.get("plotly_chart")
+
+
+def test_store_zone_without_the_selected_year(tmp_path):
+    # La zone B n'a pas de recensement en 2010, année proposée pour toute la base
+    path = tmp_path / "base.parquet"
+    write_age_sex_store(path, ["A", "B"], [2010, 2020], np.ones((2, 2, 2, 101)))
+    table = pq.read_table(path)
+    missing = pc.and_(pc.equal(table["zone"], "B"), pc.equal(table["annee"], 2010))
+    pq.write_table(table.filter(pc.invert(missing)), path)
+
+    app = _run(store_path=str(path), store_zone="B", store_year=2010)
+    assert not app.exception, [e.value for e in app.exception]
+    assert "B en 2010" in app.error[0].value
+    app = _run(store_path=str(path), store_zone="B", store_year=2020)
+    assert not app.exception, [e.value for e in app.exception]
+    assert not any("B en" in e.value for e in app.error)
+    assert app.get("plotly_chart")
@@ -0,0 +1,71 @@
+"""Audit par lots de tableaux : âges manquants, et blocs quinquennaux de longueurs mêlées."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indice_demo import Age, Femme, Homme, moving_average_tests
+from indice_demo.batch import read_table_block, score_areas, score_table_files
+
+COLUMNS = ("Age", "Hommes", "Femmes")
+
+
+@pytest.fixture
+def grouped_tables(tmp_path):
+    # Tableaux 0-4, ..., 70-74, 75+ et 0-4, ..., 75-79, 80+ (âge = premier âge du groupe)
+    rng = np.random.default_rng(0)
+    paths = []
+    for i, last in enumerate([75, 80, 75, 80, 80]):
+        ages = np.arange(0, last + 1, 5)
+        profile = np.exp(-ages / 30.0) * 20_000
+        table = pd.DataFrame({"Age": ages, "Hommes": rng.poisson(profile), "Femmes": rng.poisson(profile)})
+        path = tmp_path / f"zone_{i}.csv"
+        table.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def _same(a, b):
+    return a == b or (isinstance(a, float) and np.isnan(a) and np.isnan(b))
+
+
+@pytest.mark.parametrize("graduation", [("sprague", True), ("beers", True), ("sprague", False)])
+def test_mixed_lengths_score_like_each_table_alone(grouped_tables, graduation):
+    rows = score_table_files(grouped_tables, COLUMNS, graduation=graduation)
+    assert [row["zone"] for row in rows] == [f"zone_{i}" for i in range(5)]
+    for path, row in zip(grouped_tables, rows):
+        alone = score_table_files([path], COLUMNS, graduation=graduation)[0]
+        assert row.keys() == alone.keys()
+        for key in row:
+            assert _same(row[key], alone[key]), key
+        total = pd.read_csv(path)[["Hommes", "Femmes"]].to_numpy().sum()
+        assert row["population"] == pytest.approx(total)
+
+
+def test_block_reader_refuses_mixed_grouped_lengths(grouped_tables):
+    counts, observed = read_table_block(grouped_tables[:2], COLUMNS)
+    assert counts.shape == (2, 2, 81)
+    np.testing.assert_array_equal(observed[0], np.isin(np.arange(81), np.arange(0, 76, 5)))
+    with pytest.raises(ValueError):
+        read_table_block(grouped_tables[:2], COLUMNS, ("sprague", True))
+
+
+def test_missing_ages_are_not_tested_as_zero_counts(tmp_path):
+    # Le tableau fourni n'a pas de ligne pour 104-106 ; le second perd aussi 30-34
+    kept = (Age < 30) | (Age > 34)
+    paths = []
+    for i, rows in enumerate([slice(None), kept]):
+        table = pd.DataFrame({"Age": Age[rows], "Hommes": Homme[rows], "Femmes": Femme[rows]})
+        paths.append(str(tmp_path / f"zone_{i}.csv"))
+        table.to_csv(paths[-1], index=False)
+
+    counts, observed = read_table_block(paths, COLUMNS)
+    rows = score_areas(["zone_0", "zone_1"], counts, observed=observed)
+    for row, from_files in zip(rows, score_table_files(paths, COLUMNS)):
+        assert all(_same(row[key], from_files[key]) for key in row)
+    for row, rows_kept in zip(rows, [slice(None), kept]):
+        homme, femme = Homme[rows_kept], Femme[rows_kept]
+        _, tests = moving_average_tests(np.stack([homme, femme, homme + femme]))
+        for j, suffix in enumerate("hft"):
+            assert row[f"wilcoxon_w_{suffix}"] == tests[j]["statistic"]
+            assert row[f"wilcoxon_p_{suffix}"] == tests[j]["p_value"]
@@ -0,0 +1,35 @@
+"""Décimation min/max et partage du budget de points d'un graphique."""
+
+import numpy as np
+import pytest
+
+from indice_demo.decimation import decimate_minmax, point_budgets
+
+
+@pytest.mark.parametrize("n, max_points", [(10_000, 500), (1_001, 1_000), (5_000, 3), (777, 64)])
+def test_decimation_keeps_bucket_extremes_and_endpoints(n, max_points):
+    y = np.random.default_rng(n).normal(size=n).cumsum()
+    keep = decimate_minmax(y, max_points)
+    assert len(keep) <= max_points
+    assert np.all(np.diff(keep) > 0)
+    assert keep[0] == 0 and keep[-1] == n - 1
+    n_buckets = (max_points - 2) // 2
+    buckets = np.arange(n) * n_buckets // n
+    for bucket in range(n_buckets):
+        members = np.flatnonzero(buckets == bucket)
+        assert members[np.argmin(y[members])] in keep
+        assert members[np.argmax(y[members])] in keep
+
+
+def test_short_series_are_kept_whole():
+    np.testing.assert_array_equal(decimate_minmax(np.arange(5.0), 5), np.arange(5))
+    with pytest.raises(ValueError):
+        decimate_minmax(np.arange(5.0), 1)
+
+
+def test_budgets_fit_the_chart_and_spare_short_series():
+    lengths = [50, 111, 10_000, 200_000, 3]
+    budgets = point_budgets(lengths, 4_000)
+    assert budgets.sum() <= 4_000
+    np.testing.assert_array_equal(budgets[[0, 1, 4]], [50, 111, 3])
+    assert budgets[2] == budgets[3] == (4_000 - 164) // 2
@@ -0,0 +1,49 @@
+"""Extraction des chiffres significatifs, comparée à l'écriture décimale (repr) des valeurs."""
+
+import numpy as np
+
+from indice_demo.digits import extract_first_digits, extract_leading_digits, extract_second_digits, get_first_digit
+
+
+def _repr_digits(value):
+    """Deux premiers chiffres significatifs d'après repr, -1 pour 0, NaN ou ±inf."""
+    if not np.isfinite(value) or value == 0:
+        return -1
+    # repr donne l'écriture décimale la plus courte, qui fait foi pour les chiffres
+    significand = repr(abs(float(value))).split("e")[0].replace(".", "").lstrip("0")
+    return int((significand + "0")[:2])
+
+
+def test_leading_digits_match_repr():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        rng.lognormal(0, 20, 20_000),
+        10.0 ** rng.uniform(-320, 308, 5_000),
+        np.arange(1, 1000, dtype=float),
+        [0.3, 0.1 + 0.2, 9.999999999999998, 99.99999999999999, 1e-310, 5e-324, 1.7976931348623157e308],
+    ])
+    expected = np.array([_repr_digits(value) for value in values])
+    np.testing.assert_array_equal(extract_leading_digits(values), expected)
+
+
+def test_scalar_first_digit_matches_vectorized_kernel():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([
+        rng.lognormal(0, 20, 2_000),
+        10.0 ** rng.uniform(-320, 308, 2_000),
+        [0.3, 0.1 + 0.2, 9.999999999999998, 99.99999999999999, 1e-310, 5e-324, 1.7976931348623157e308,
+         0.0, -456.0, np.nan, np.inf],
+    ])
+    expected = [None if digit < 0 else int(digit) for digit in extract_first_digits(values)]
+    assert [get_first_digit(value) for value in values] == expected
+
+
+def test_first_digit_rule_on_special_values():
+    values = np.array([0.0, -0.0, -456.0, -0.0071, 2.5e-320, np.nan, np.inf, -np.inf, 7.0])
+    np.testing.assert_array_equal(extract_first_digits(values), [-1, -1, 4, 7, 2, -1, -1, -1, 7])
+    np.testing.assert_array_equal(extract_second_digits(values), [-1, -1, 5, 1, 5, -1, -1, -1, 0])
+
+
+def test_shape_is_preserved():
+    values = np.arange(1, 25, dtype=float).reshape(2, 3, 4)
+    assert extract_first_digits(values).shape == (2, 3, 4)
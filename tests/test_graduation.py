@@ -0,0 +1,57 @@
+"""Multiplicateurs de Sprague et de Beers : conservation des groupes et reproduction des polynômes."""
+
+import numpy as np
+import pytest
+
+from indice_demo.graduation import GRADUATION_METHODS, graduate, graduate_dense, graduation_matrix
+
+
+@pytest.mark.parametrize("method", GRADUATION_METHODS)
+def test_each_group_keeps_its_total(method):
+    n_groups = 17
+    matrix = graduation_matrix(n_groups, method)
+    # Les 5 lignes d'un groupe somment à 1 sur ce groupe et à 0 ailleurs (coefficients à 4 décimales)
+    blocks = matrix.reshape(n_groups, 5, n_groups).sum(axis=1)
+    np.testing.assert_allclose(blocks, np.eye(n_groups), atol=1e-3 if method == "beers" else 1e-12)
+
+
+@pytest.mark.parametrize("method", GRADUATION_METHODS)
+def test_low_order_polynomials_are_reproduced(method):
+    ages = np.arange(85.0)
+    for single in (np.full(85, 3.0), 2 * ages + 1, 0.5 * ages ** 2 + ages):
+        groups = single.reshape(17, 5).sum(axis=1)
+        np.testing.assert_allclose(graduate(groups, method, clip=False), single, atol=1e-9)
+
+
+def test_published_sprague_first_panel():
+    matrix = graduation_matrix(5, "sprague")
+    np.testing.assert_array_equal(matrix[0], [0.3616, -0.2768, 0.1488, -0.0336, 0.0])
+    np.testing.assert_array_equal(matrix[12], [0.0064, -0.0336, 0.2544, -0.0336, 0.0064])
+    # Derniers groupes : premiers panneaux lus à rebours
+    np.testing.assert_array_equal(matrix[-1], matrix[0][::-1])
+
+
+def test_clip_removes_negative_counts_and_keeps_totals():
+    groups = np.array([[5000, 3000, 200, 3, 1, 0, 40, 2000, 1500, 900.0]])
+    assert graduate(groups, clip=False).min() < 0
+    single = graduate(groups)
+    assert single.min() >= 0
+    np.testing.assert_allclose(single.reshape(1, -1, 5).sum(axis=-1), groups)
+
+
+def test_open_ended_group_is_copied_and_dense_axis_is_read():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(100, 1000, (3, 2, 18)).astype(float)
+    single = graduate(groups, open_ended=True)
+    assert single.shape == (3, 2, 86)
+    np.testing.assert_array_equal(single[..., -1], groups[..., -1])
+    dense = np.zeros((3, 2, 86))
+    dense[..., ::5] = groups
+    np.testing.assert_array_equal(graduate_dense(dense, open_ended=True), single)
+
+
+def test_too_few_groups_or_unknown_method():
+    with pytest.raises(ValueError):
+        graduation_matrix(4)
+    with pytest.raises(ValueError):
+        graduation_matrix(10, "karup-king")
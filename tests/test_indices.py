@@ -0,0 +1,77 @@
+"""Indices batchés et scalaires, comparés au bit près aux formules scalaires d'origine."""
+
+import numpy as np
+import pytest
+
+from indice_demo.indices import (
+    calculate_bachi,
+    calculate_indices_batch,
+    calculate_myers,
+    calculate_un_index,
+    calculate_whipple,
+)
+
+
+def _masked_digit_sums(ages, populations, age_min, age_max):
+    mask = (ages >= age_min) & (ages <= age_max)
+    age_subset, pop_subset = ages[mask], populations[mask]
+    sum_digit = np.zeros(10)
+    for i in range(10):
+        sum_digit[i] = pop_subset[age_subset % 10 == i].sum()
+    return sum_digit
+
+
+# Formules scalaires d'origine, servant de référence
+def _whipple(ages, populations, age_min=23, age_max=62):
+    mask = (ages >= age_min) & (ages <= age_max)
+    age_subset, pop_subset = ages[mask], populations[mask]
+    pop_0_5 = pop_subset[(age_subset % 10 == 0) | (age_subset % 10 == 5)].sum()
+    pop_total = pop_subset.sum()
+    return (pop_0_5 / pop_total) * 100 if pop_total > 0 else np.nan
+
+
+def _myers(ages, populations):
+    sum_digit = _masked_digit_sums(ages, populations, 10, 89)
+    myers_index = 0
+    for i in range(10):
+        myers_index += abs(sum_digit[i] + sum_digit[(i + 1) % 10] - sum(sum_digit) / 10)
+    return myers_index / (2 * sum(sum_digit)) * 100
+
+
+def _bachi(ages, populations):
+    digit_counts = _masked_digit_sums(ages, populations, 20, 89)
+    digit_percent = digit_counts / digit_counts.sum() * 100
+    return np.sqrt(sum(((digit_percent[i] - 10) / 10) ** 2 for i in range(10))) * 100
+
+
+@pytest.fixture
+def populations():
+    rng = np.random.default_rng(1)
+    ages = np.arange(101)
+    profile = np.exp(-ages / 35.0) * (1 + 0.6 * (ages % 10 == 0))
+    return rng.poisson(rng.lognormal(8, 1, (20, 1)) * profile / profile.sum())
+
+
+@pytest.mark.parametrize("smoothed", [False, True])
+def test_batched_indices_match_scalar_formulas(populations, smoothed):
+    # Effectifs réels (lissés) : mêmes sommes dans le même ordre, donc égalité exacte
+    if smoothed:
+        populations = populations * 1.37 + 0.1
+    ages = np.arange(populations.shape[-1])
+    batch = calculate_indices_batch(ages, populations)
+    expected = {
+        "whipple": [_whipple(ages, row) for row in populations],
+        "myers": [_myers(ages, row) for row in populations],
+        "bachi": [_bachi(ages, row) for row in populations],
+    }
+    for name, values in expected.items():
+        np.testing.assert_array_equal(batch[name], values)
+    np.testing.assert_array_equal(batch["un_index"], [calculate_un_index(*row) for row in zip(*expected.values())])
+
+
+def test_scalar_functions_match_original_formulas(populations):
+    ages = np.arange(populations.shape[-1])
+    for row in populations * 0.731:
+        assert calculate_whipple(ages, row) == _whipple(ages, row)
+        assert calculate_myers(ages, row) == _myers(ages, row)
+        assert calculate_bachi(ages, row) == _bachi(ages, row)
@@ -0,0 +1,37 @@
+"""Lecture en flux des microdonnées, comparée à un comptage direct des enregistrements."""
+
+import io
+
+import numpy as np
+
+from indice_demo.ingest import read_microdata_histograms
+
+CSV = """age,sexe,zone
+30,1,A
+31.7,2,B
+,1,A
+7,3,B
+45,1,
+12,2,
+150,1,A
+30,1,A
+"""
+
+
+def test_chunk_with_only_missing_areas_is_rejected():
+    # Avec chunksize=2, le troisième bloc n'a que des zones manquantes
+    result = read_microdata_histograms(io.StringIO(CSV), area_col="zone", chunksize=2)
+    assert result["areas"] == ["A", "B"]
+    assert result["rejected"] == 5
+    expected = np.zeros((2, 2, 111), dtype=np.int64)
+    expected[0, 0, 30] = 2
+    expected[1, 1, 31] = 1
+    np.testing.assert_array_equal(result["counts"], expected)
+
+
+def test_chunksize_does_not_change_counts():
+    whole = read_microdata_histograms(io.StringIO(CSV), area_col="zone")
+    for chunksize in (1, 3, 5):
+        chunked = read_microdata_histograms(io.StringIO(CSV), area_col="zone", chunksize=chunksize)
+        np.testing.assert_array_equal(chunked["counts"], whole["counts"])
+        assert chunked["rejected"] == whole["rejected"]
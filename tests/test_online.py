@@ -0,0 +1,61 @@
+"""Accumulateur en continu, comparé à la lecture par blocs des mêmes enregistrements."""
+
+import io
+
+import numpy as np
+import pytest
+
+from indice_demo.benford import first_digit_counts
+from indice_demo.indices import calculate_indices_batch
+from indice_demo.ingest import read_microdata_histograms
+from indice_demo.online import OnlineAccumulator
+
+
+@pytest.fixture
+def records():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    areas = rng.choice(["A", "B", "C", "D"], n)
+    sexes = rng.choice(["1", "2", "3"], n, p=[0.49, 0.49, 0.02])
+    ages = np.round(rng.exponential(30, n), 1)
+    return list(zip(areas, sexes, ages))
+
+
+def _batch(records):
+    csv = "zone,sexe,age\n" + "".join(f"{area},{sex},{age}\n" for area, sex, age in records)
+    return read_microdata_histograms(io.StringIO(csv), area_col="zone", chunksize=3_000)
+
+
+def _order(state, areas):
+    return state["counts"][[state["areas"].index(area) for area in areas]]
+
+
+def test_split_and_merge_matches_batch_reader(records):
+    left, right = OnlineAccumulator(), OnlineAccumulator()
+    for record in records[:12_000]:
+        left.update(record)
+    for record in records[12_000:]:
+        right.update(record)
+    merged = left.merge(right)
+
+    batch = _batch(records)
+    assert merged.rejected == batch["rejected"]
+    counts = _order(merged.histograms(), batch["areas"])
+    np.testing.assert_array_equal(counts, batch["counts"])
+
+    # Premiers chiffres tenus à jour (et recalculés par merge) = recalcul complet
+    groups = np.concatenate([merged.counts, merged.counts.sum(axis=1, keepdims=True)], axis=1)
+    np.testing.assert_array_equal(merged.first_digits, first_digit_counts(groups))
+
+    indices = merged.indices()
+    expected = calculate_indices_batch(merged.ages, groups)
+    for key in ("whipple", "myers", "bachi", "un_index"):
+        np.testing.assert_array_equal(indices[key], expected[key])
+
+
+def test_incremental_first_digits_match_recount(records):
+    accumulator = OnlineAccumulator()
+    for record in records[:5_000]:
+        accumulator.update(record, weight=3)
+    groups = np.concatenate([accumulator.counts, accumulator.counts.sum(axis=1, keepdims=True)], axis=1)
+    np.testing.assert_array_equal(accumulator.first_digits, first_digit_counts(groups))
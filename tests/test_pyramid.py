@@ -0,0 +1,37 @@
+"""Regroupement par tranches d'âges, comparé à une somme par masque tranche par tranche."""
+
+import numpy as np
+import pytest
+
+from indice_demo.pyramid import bin_ages, bin_labels, parse_edges
+
+
+def _masked_bins(ages, populations, edges, open_ended):
+    bounds = list(zip(edges[:-1], edges[1:])) + ([(edges[-1], np.inf)] if open_ended else [])
+    return np.stack([populations[..., (ages >= lo) & (ages < hi)].sum(axis=-1) for lo, hi in bounds], axis=-1)
+
+
+@pytest.mark.parametrize("open_ended", [False, True])
+@pytest.mark.parametrize("edges", [[0, 5, 10, 15, 65, 80], [0, 1, 5, 15, 40, 41, 100], [10, 20, 30]])
+def test_unsorted_sparse_ages_match_masks(edges, open_ended):
+    rng = np.random.default_rng(len(edges))
+    # Âges non triés, avec des trous (tranches 40-40 vide) et au-delà de la dernière borne
+    ages = rng.permutation(np.concatenate([np.arange(0, 40), np.arange(45, 111, 3)]))
+    populations = rng.integers(0, 500, (6, 2, len(ages)))
+    binned = bin_ages(ages, populations, edges, open_ended)
+    assert binned.shape == (6, 2, len(edges) - 1 + open_ended)
+    np.testing.assert_array_equal(binned, _masked_bins(ages, populations, np.asarray(edges), open_ended))
+
+
+def test_open_group_collects_every_age_above_last_edge():
+    ages = np.array([90, 3, 100, 80, 79])
+    populations = np.array([1, 2, 4, 8, 16])
+    np.testing.assert_array_equal(bin_ages(ages, populations, [0, 80], open_ended=True), [18, 13])
+    np.testing.assert_array_equal(bin_ages(ages, populations, [0, 80]), [18])
+    assert bin_labels([0, 80], open_ended=True) == ["0-79", "80+"]
+
+
+def test_parse_edges_rejects_unsorted_input():
+    np.testing.assert_array_equal(parse_edges("0, 1; 5,15"), [0, 1, 5, 15])
+    with pytest.raises(ValueError):
+        parse_edges("0, 10, 5")
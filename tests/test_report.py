@@ -0,0 +1,37 @@
+"""Rapport Excel : présentation d'une zone (export d'origine) et de plusieurs zones."""
+
+import io
+
+import numpy as np
+import openpyxl
+import pytest
+
+from indice_demo.report import excel_report_bytes, iter_area_results
+
+
+@pytest.fixture
+def counts():
+    rng = np.random.default_rng(0)
+    profile = np.exp(-np.arange(101) / 35.0)
+    return rng.poisson(4000 * profile, (3, 2, 101))
+
+
+def _sheets(report):
+    return openpyxl.load_workbook(io.BytesIO(report), read_only=True)
+
+
+def test_single_area_keeps_one_sheet_per_table(counts):
+    report = excel_report_bytes(iter_area_results(["A"], np.arange(101), counts[:1]))
+    workbook = _sheets(report)
+    assert workbook.sheetnames == ["Synthèse", "Données", "Indices", "Tests", "Chiffres terminaux", "Formules"]
+    summary = list(workbook["Synthèse"].values)
+    assert summary[0] == ("Indicateur", "Valeur")
+    assert summary[1] == ("Population totale", int(counts[0].sum()))
+    assert len(list(workbook["Données"].values)) == 1 + 101
+
+
+def test_several_areas_write_summary_rows_and_zone_blocks(counts):
+    report = excel_report_bytes(iter_area_results(["A", "B", "C"], np.arange(101), counts))
+    workbook = _sheets(report)
+    assert workbook.sheetnames == ["Synthèse", "Formules", "Zones"]
+    assert [row[0] for row in workbook["Synthèse"].values][1:] == ["A", "B", "C"]
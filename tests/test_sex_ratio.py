@@ -0,0 +1,39 @@
+"""Intervalles du rapport de masculinité, comparés aux intervalles de scipy.stats."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from indice_demo.sex_ratio import sex_ratio_analysis, sex_ratio_intervals
+
+
+@pytest.fixture
+def counts():
+    rng = np.random.default_rng(0)
+    homme = rng.integers(0, 300, (4, 50))
+    femme = rng.integers(1, 300, (4, 50))
+    homme[0, :3] = 0
+    return homme, femme
+
+
+@pytest.mark.parametrize("level", [0.9, 0.95, 0.99])
+def test_wilson_matches_scipy_binomtest(counts, level):
+    homme, femme = counts
+    low, high = sex_ratio_intervals(homme, femme, level, "wilson")
+    for h, f, lo, hi in zip(homme.ravel(), femme.ravel(), low.ravel(), high.ravel()):
+        ci = stats.binomtest(int(h), int(h + f)).proportion_ci(confidence_level=level, method="wilson")
+        expected = np.array([ci.low, ci.high]) / (1 - np.array([ci.low, ci.high])) * 100
+        np.testing.assert_allclose([lo, hi], expected, rtol=1e-10, atol=1e-10)
+
+
+def test_undefined_ratios_have_no_interval_and_no_anomaly():
+    homme = np.array([[10, 0, 5, 40]])
+    femme = np.array([[0, 0, 7, 35]])
+    for method in ("wilson", "log"):
+        low, high = sex_ratio_intervals(homme, femme, method=method)
+        assert np.isnan(low[0, :2]).all() and np.isnan(high[0, :2]).all()
+        assert (low[0, 2:] < homme[0, 2:] / femme[0, 2:] * 100).all()
+    analysis = sex_ratio_analysis(homme, femme, window=1)
+    assert not analysis["anomaly"][0, :2].any()
+    with pytest.raises(ValueError):
+        sex_ratio_intervals(homme, femme, method="exact")
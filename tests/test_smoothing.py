@@ -0,0 +1,20 @@
+"""Moyennes mobiles, comparées à la boucle d'origine et au calcul général sur fenêtres glissantes."""
+
+import numpy as np
+
+from indice_demo.smoothing import moving_average, moving_average_2
+
+
+def test_moving_average_2_matches_original_loop_and_general_engine():
+    rng = np.random.default_rng(0)
+    counts = rng.normal(1000, 300, (4, 111)) * 1.37
+    for row in counts:
+        expected = np.zeros(len(row))
+        expected[0] = row[0]
+        for i in range(1, len(row)):
+            expected[i] = (row[i - 1] + row[i]) / 2
+        np.testing.assert_array_equal(moving_average_2(row), expected)
+    # Poids explicites : calcul général sur fenêtres glissantes
+    for centered in (False, True):
+        np.testing.assert_array_equal(moving_average(counts, 2, centered=centered),
+                                      moving_average(counts, weights=[1, 1], centered=centered))
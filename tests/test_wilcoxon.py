@@ -0,0 +1,38 @@
+"""Tests de Wilcoxon batchés, comparés à scipy.stats.wilcoxon ligne par ligne."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from indice_demo.smoothing import moving_average, wilcoxon_batch
+
+
+@pytest.mark.parametrize("width", [10, 40, 101])
+def test_wilcoxon_batch_matches_scipy(width):
+    rng = np.random.default_rng(width)
+    original = rng.normal(100, 10, (15, width))
+    smoothed = original + rng.normal(0.5, 3, (15, width))
+    result = wilcoxon_batch(original, smoothed)
+    for row in range(len(original)):
+        expected = stats.wilcoxon(original[row], smoothed[row])
+        assert result["statistic"][row] == pytest.approx(expected.statistic)
+        assert result["p_value"][row] == pytest.approx(expected.pvalue, rel=1e-9)
+
+
+def test_wilcoxon_batch_with_ties_and_nan_matches_scipy():
+    rng = np.random.default_rng(3)
+    counts = rng.poisson(50, (10, 101)).astype(float)
+    smoothed = moving_average(counts, 2)
+    result = wilcoxon_batch(counts, smoothed)
+    for row in range(len(counts)):
+        keep = ~np.isnan(smoothed[row])
+        expected = stats.wilcoxon(counts[row][keep], smoothed[row][keep])
+        assert result["statistic"][row] == pytest.approx(expected.statistic)
+        assert result["p_value"][row] == pytest.approx(expected.pvalue, rel=1e-9)
+
+
+def test_wilcoxon_batch_reports_rows_without_differences():
+    values = np.arange(20, dtype=float)
+    result = wilcoxon_batch(np.stack([values, values]), np.stack([values, values + 1]))
+    assert np.isnan(result["p_value"][0]) and result["error"][0] is not None
+    assert result["error"][1] is None